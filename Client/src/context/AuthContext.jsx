@@ -3,6 +3,10 @@ import axios from 'axios';
 
 export const AuthContext = createContext();
 
+// Read-your-writes token from the last write; sent back so the server
+// doesn't serve this user's next reads from a lagging replica
+let mongoAfter = null;
+
 export const AuthProvider = ({ children }) => {
   const [user, setUser] = useState(null);
   const [loading, setLoading] = useState(true);
@@ -12,6 +16,21 @@ export const AuthProvider = ({ children }) => {
     baseURL: import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000',
   });
 
+  api.interceptors.request.use((config) => {
+    if (mongoAfter) {
+      config.headers['X-Mongo-After'] = mongoAfter;
+    }
+    return config;
+  });
+
+  api.interceptors.response.use((response) => {
+    const token = response.headers['x-mongo-after'];
+    if (token) {
+      mongoAfter = token;
+    }
+    return response;
+  });
+
   useEffect(() => {
     const storedUser = localStorage.getItem('user');
     const storedFirstVisit = localStorage.getItem('firstVisit');
@@ -14,6 +14,8 @@ const VersionHistory = () => {
   const { darkMode, primaryColor } = useTheme();
   const [versions, setVersions] = useState([]);
   const [currentVersion, setCurrentVersion] = useState(null);
+  const [page, setPage] = useState(1);
+  const [hasMore, setHasMore] = useState(false);
   const [blogStatus, setBlogStatus] = useState(null);
   const [loading, setLoading] = useState(false);
   const [popup, setPopup] = useState({ show: false, message: '', type: 'success' });
@@ -40,7 +42,7 @@ const VersionHistory = () => {
   useEffect(() => {
     setLoading(true);
     Promise.all([
-      api.get(`/blogs/versions/${blogId}`),
+      api.get(`/blogs/versions/${blogId}`, { params: { page: 1 } }),
       api.get(`/blogs/${blogId}`)
     ])
       .then(([versionsResponse, blogResponse]) => {
@@ -53,6 +55,8 @@ const VersionHistory = () => {
           return dateB - dateA;
         });
         setVersions(sortedVersions);
+        setPage(1);
+        setHasMore(Boolean(versionsResponse.data.pagination?.has_next));
         setCurrentVersion(versionsResponse.data.current_version);
         setBlogStatus(blogResponse.data.status);
       })
@@ -65,6 +69,19 @@ const VersionHistory = () => {
     return () => clearTimeout(popupTimerRef.current);
   }, [blogId, api]);
 
+  const loadMoreVersions = async () => {
+    try {
+      const nextPage = page + 1;
+      const response = await api.get(`/blogs/versions/${blogId}`, { params: { page: nextPage } });
+      setVersions(prev => [...prev, ...(response.data.versions || [])]);
+      setPage(nextPage);
+      setHasMore(Boolean(response.data.pagination?.has_next));
+    } catch (error) {
+      console.error('Error fetching versions:', error);
+      showPopup(error.response?.data?.error || 'Failed to load more versions', 'error');
+    }
+  };
+
   const revertVersion = async (versionNumber) => {
     try {
       const response = await api.post(`/blogs/revert/${blogId}/${versionNumber}/`, {
@@ -146,7 +163,12 @@ const VersionHistory = () => {
                       {versions.map(version => (
                         <tr key={version.version} className={`border-t ${darkMode ? 'border-gray-700 hover:bg-gray-700' : 'border-gray-200 hover:bg-gray-50'}`}>
                           <td className="p-4">{version.version}</td>
-                          <td className="p-4">{version.title}</td>
+                          <td className="p-4">
+                            {version.title}
+                            {version.change_summary && (
+                              <span className={`block text-xs ${darkMode ? 'text-gray-400' : 'text-gray-500'}`}>{version.change_summary}</span>
+                            )}
+                          </td>
                           <td className="p-4 hidden sm:table-cell">{version.updated_by}</td>
                           <td className="p-4 hidden md:table-cell">{formatTimestamp(version.updated_at)}</td>
                           <td className="p-4 flex gap-2">
@@ -171,6 +193,17 @@ const VersionHistory = () => {
                       ))}
                     </tbody>
                   </table>
+                  {hasMore && (
+                    <div className="flex justify-center mt-4">
+                      <button
+                        className="px-4 py-2 text-white rounded transition-colors"
+                        style={{ backgroundColor: primaryColor }}
+                        onClick={loadMoreVersions}
+                      >
+                        Load older versions
+                      </button>
+                    </div>
+                  )}
                 </div>
               )}
             </div>
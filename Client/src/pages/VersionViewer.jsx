@@ -40,13 +40,13 @@ const VersionViewer = () => {
   useEffect(() => {
     setLoading(true);
     Promise.all([
-      api.get(`/blogs/versions/${blogId}`),
+      api.get(`/blogs/versions/${blogId}/${versionNumber}/`),
       api.get(`/blogs/${blogId}`)
     ])
-      .then(([versionsResponse, blogResponse]) => {
-        console.log('API Response (Versions):', versionsResponse.data);
+      .then(([versionResponse, blogResponse]) => {
+        console.log('API Response (Version):', versionResponse.data);
         console.log('API Response (Blog):', blogResponse.data);
-        const selectedVersion = versionsResponse.data.versions.find(v => v.version === parseInt(versionNumber));
+        const selectedVersion = versionResponse.data;
         if (selectedVersion) {
           console.log('Selected Version:', selectedVersion);
           setVersion({
@@ -4,6 +4,7 @@ from django.utils import timezone
 from django.core.mail import send_mail
 from django.conf import settings
 from datetime import timedelta
+from techsage import metrics, write_concern
 
 class OTP(Document):
     email = StringField(required=True, unique=False)
@@ -45,20 +46,21 @@ class OTP(Document):
 
 
         try:
-            send_mail(
-                subject='Your TechSage Verification OTP',
-                message=(
-                    f'Hello,\n\n'
-                    f'Your OTP code for TechSage account verification is: {otp_code}\n'
-                    f'This code will expire in {settings.OTP_VALIDITY_MINUTES} minutes.\n\n'
-                    f'Please do not reply to this email, as it is sent from an unmonitored address.\n'
-                    f'For support, visit https://techsage.com/support.\n\n'
-                    f'Thank you,\nTechSage Team'
-                ),
-                from_email=None, 
-                recipient_list=[email],
-                fail_silently=False,
-            )
+            with metrics.external_call('smtp'):
+                send_mail(
+                    subject='Your TechSage Verification OTP',
+                    message=(
+                        f'Hello,\n\n'
+                        f'Your OTP code for TechSage account verification is: {otp_code}\n'
+                        f'This code will expire in {settings.OTP_VALIDITY_MINUTES} minutes.\n\n'
+                        f'Please do not reply to this email, as it is sent from an unmonitored address.\n'
+                        f'For support, visit https://techsage.com/support.\n\n'
+                        f'Thank you,\nTechSage Team'
+                    ),
+                    from_email=None, 
+                    recipient_list=[email],
+                    fail_silently=False,
+                )
         except Exception as e:
             otp.delete()
             raise Exception(f"Failed to send email: {str(e)}")
@@ -75,7 +77,7 @@ class OTP(Document):
     def record_attempt(self):
         self.attempts += 1
         self.last_attempt = timezone.now()
-        self.save()
+        self.save(write_concern=write_concern.for_operation('otp.attempt'))
 
     def verify(self, submitted_code):
         if not self.is_valid():
@@ -1,6 +1,5 @@
 from mongoengine import Document, StringField, IntField, ReferenceField, ListField
 from users.models import User
-import cloudinary.uploader
 
 
 
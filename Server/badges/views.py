@@ -4,12 +4,9 @@ from rest_framework.parsers import MultiPartParser
 from rest_framework import status
 from .models import Badge
 from users.models import User
-import cloudinary.uploader
+from techsage import clients, metrics, response_cache
 import os
-from dotenv import load_dotenv
 import logging
-load_dotenv(dotenv_path=os.path.join(os.path.dirname(os.path.dirname(__file__)), '.env'))
-load_dotenv()
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)  # Ensure debug level is set
 
@@ -17,25 +14,30 @@ class BadgeAPI(APIView):
     parser_classes = (MultiPartParser,)
 
     def get(self, request, badge_id=None):
+        return response_cache.cached_json_response(
+            request, [response_cache.BADGES_TAG], lambda: self.load_badges(badge_id)
+        )
+
+    def load_badges(self, badge_id):
         try:
             if badge_id:
                 badge = Badge.objects.get(id=badge_id)
-                return Response({
+                return {
                     'id': str(badge.id),
                     'name': badge.name,
                     'image_url': badge.image_url,
                     'points_required': badge.points_required,
                     'title': badge.title
-                })
+                }
             else:
                 badges = Badge.objects.all()
-                return Response([{
+                return [{
                     'id': str(badge.id),
                     'name': badge.name,
                     'image_url': badge.image_url,
                     'points_required': badge.points_required,
                     'title': badge.title
-                } for badge in badges])
+                } for badge in badges]
         except Badge.DoesNotExist:
             return Response({'error': 'Badge not found'}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
@@ -50,18 +52,18 @@ class BadgeAPI(APIView):
 
             # Debug upload preset
             upload_preset = os.getenv('CLOUDINARY_UPLOAD_PRESET')
-            logger.debug(f"Environment variables loaded: {dict(os.environ)}")
             logger.debug(f"Attempting upload with preset: {upload_preset}")
             if not upload_preset:
                 return Response({'error': 'CLOUDINARY_UPLOAD_PRESET not configured in .env'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
             # Upload image to Cloudinary
             logger.debug(f"Uploading file: {request.FILES['image'].name}")
-            result = cloudinary.uploader.upload(
-                request.FILES['image'],
-                folder="badges",
-                upload_preset=upload_preset
-            )
+            with metrics.external_call('cloudinary'):
+                result = clients.cloudinary_uploader().upload(
+                    request.FILES['image'],
+                    folder="badges",
+                    upload_preset=upload_preset
+                )
             logger.debug(f"Upload result: {result}")
 
             badge = Badge(
@@ -72,6 +74,7 @@ class BadgeAPI(APIView):
                 public_id=result.get('public_id')
             )
             badge.save()
+            response_cache.invalidate(response_cache.BADGES_TAG)
 
             return Response({
                 'id': str(badge.id),
@@ -88,8 +91,10 @@ class BadgeAPI(APIView):
         try:
             badge = Badge.objects.get(id=badge_id)
             if badge.public_id:
-                cloudinary.uploader.destroy(badge.public_id)
+                with metrics.external_call('cloudinary'):
+                    clients.cloudinary_uploader().destroy(badge.public_id)
             badge.delete()
+            response_cache.invalidate(response_cache.BADGES_TAG)
             return Response({'message': 'Badge deleted successfully'}, status=status.HTTP_200_OK)
         except Badge.DoesNotExist:
             return Response({'error': 'Badge not found'}, status=status.HTTP_404_NOT_FOUND)
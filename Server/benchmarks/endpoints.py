@@ -0,0 +1,266 @@
+"""
+Endpoint benchmark: replays a weighted mix of API requests against the ASGI
+application in-process and reports latency percentiles, throughput and
+Mongo commands per request.
+
+The requests go through the full Django stack (middleware, views,
+renderers) but skip the network, so results are comparable across commits
+on the same machine and database. Point MONGO_URI at a local mongod seeded
+with generate_dataset.
+"""
+import asyncio
+import json
+import math
+import random
+import subprocess
+import time
+from datetime import datetime
+from urllib.parse import urlencode
+from blogs.models import Blog
+from techsage import query_budget
+from users.dataset import CATEGORIES, TAGS, WORDS
+from users.models import User
+
+
+class ASGIClient:
+    """Minimal HTTP client that calls an ASGI application directly"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def request(self, method, path, body=None):
+        path, _, query = path.partition('?')
+        payload = json.dumps(body).encode() if body is not None else b''
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': method,
+            'scheme': 'http',
+            'path': path,
+            'raw_path': path.encode(),
+            'query_string': query.encode(),
+            'root_path': '',
+            'headers': [
+                (b'host', b'benchmark'),
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(payload)).encode()),
+            ],
+            'client': ('127.0.0.1', 0),
+            'server': ('benchmark', 80),
+        }
+        sent = False
+        disconnect = asyncio.Event()
+
+        async def receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {'type': 'http.request', 'body': payload, 'more_body': False}
+            await disconnect.wait()
+            return {'type': 'http.disconnect'}
+
+        status, chunks = None, []
+
+        async def send(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            elif message['type'] == 'http.response.body':
+                chunks.append(message.get('body', b''))
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            disconnect.set()
+        return status, b''.join(chunks)
+
+
+class Fixtures:
+    """Ids and names sampled from the database to build requests from"""
+
+    def __init__(self, blog_ids, usernames):
+        if not blog_ids or not usernames:
+            raise ValueError("The database has no published blogs or users; run generate_dataset first")
+        self.blog_ids = blog_ids
+        self.usernames = usernames
+
+    @classmethod
+    def load(cls, sample_size=500):
+        blogs = Blog._get_collection().aggregate([
+            {'$match': {'is_published': True, 'is_deleted': False}},
+            {'$sample': {'size': sample_size}},
+            {'$project': {'_id': 1}},
+        ])
+        users = User._get_collection().aggregate([
+            {'$sample': {'size': sample_size}},
+            {'$project': {'username': 1}},
+        ])
+        return cls([str(doc['_id']) for doc in blogs], [doc['username'] for doc in users])
+
+
+def feed(rng, fixtures):
+    return 'GET', f"/published-blogs/?{urlencode({'page': rng.randint(1, 5)})}", None
+
+
+def category_feed(rng, fixtures):
+    return 'GET', f"/published-blogs/?{urlencode({'category': rng.choice(CATEGORIES)})}", None
+
+
+def blog_detail(rng, fixtures):
+    return 'GET', f"/blogs/{rng.choice(fixtures.blog_ids)}/", None
+
+
+def search(rng, fixtures):
+    return 'GET', f"/published-blogs/search/?{urlencode({'q': rng.choice(WORDS + TAGS)})}", None
+
+
+def comments(rng, fixtures):
+    return 'GET', f"/comments/blog/{rng.choice(fixtures.blog_ids)}/", None
+
+
+def post_comment(rng, fixtures):
+    return 'POST', '/comments/post/', {
+        'blog_id': rng.choice(fixtures.blog_ids),
+        'author': rng.choice(fixtures.usernames),
+        'content': ' '.join(rng.choice(WORDS) for _ in range(12)),
+    }
+
+
+def vote(rng, fixtures):
+    return 'POST', f"/blogs/vote/{rng.choice(fixtures.blog_ids)}/", {
+        'username': rng.choice(fixtures.usernames),
+        'type': rng.choice(['upvote', 'upvote', 'upvote', 'downvote']),
+    }
+
+
+def leaderboard(rng, fixtures):
+    return 'GET', '/all-users/?page=1&page_size=10', None
+
+
+# name -> (request builder, weight, writes)
+SCENARIOS = {
+    'feed': (feed, 25, False),
+    'category_feed': (category_feed, 10, False),
+    'blog_detail': (blog_detail, 30, False),
+    'search': (search, 8, False),
+    'comments': (comments, 12, False),
+    'post_comment': (post_comment, 3, True),
+    'vote': (vote, 7, True),
+    'leaderboard': (leaderboard, 5, False),
+}
+
+
+def plan_requests(fixtures, count, seed=0, read_only=False):
+    """A deterministic list of (scenario, method, path, body)"""
+    rng = random.Random(seed)
+    names = [name for name, (_, _, writes) in SCENARIOS.items() if not (read_only and writes)]
+    weights = [SCENARIOS[name][1] for name in names]
+    planned = []
+    for name in rng.choices(names, weights=weights, k=count):
+        planned.append((name, *SCENARIOS[name][0](rng, fixtures)))
+    return planned
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not values:
+        return None
+    index = max(math.ceil(fraction * len(values)) - 1, 0)
+    return values[min(index, len(values) - 1)]
+
+
+def summarize(samples):
+    """samples: list of (latency seconds, mongo commands, ok)"""
+    latencies = sorted(latency * 1000 for latency, _, _ in samples)
+    commands = [count for _, count, _ in samples]
+    return {
+        'requests': len(samples),
+        'errors': sum(not ok for _, _, ok in samples),
+        'mean_ms': round(sum(latencies) / len(latencies), 3),
+        'p50_ms': round(percentile(latencies, 0.50), 3),
+        'p95_ms': round(percentile(latencies, 0.95), 3),
+        'p99_ms': round(percentile(latencies, 0.99), 3),
+        'max_ms': round(latencies[-1], 3),
+        'mongo_commands_mean': round(sum(commands) / len(commands), 2),
+        'mongo_commands_max': max(commands),
+    }
+
+
+async def replay(client, planned, concurrency):
+    """Send the planned requests from ``concurrency`` workers; return samples by scenario"""
+    queue = asyncio.Queue()
+    for item in planned:
+        queue.put_nowait(item)
+    samples = {}
+
+    async def worker():
+        while True:
+            try:
+                name, method, path, body = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            with query_budget.track() as log:
+                started = time.perf_counter()
+                try:
+                    status, _ = await client.request(method, path, body)
+                    ok = status is not None and status < 500
+                except Exception:
+                    ok = False
+                latency = time.perf_counter() - started
+            samples.setdefault(name, []).append((latency, log.count, ok))
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(app, fixtures, requests=2000, concurrency=8, warmup=200, seed=0, read_only=False):
+    client = ASGIClient(app)
+    if warmup:
+        await replay(client, plan_requests(fixtures, warmup, seed + 1, read_only), concurrency)
+    planned = plan_requests(fixtures, requests, seed, read_only)
+
+    started = time.perf_counter()
+    samples = await replay(client, planned, concurrency)
+    elapsed = time.perf_counter() - started
+
+    everything = [sample for values in samples.values() for sample in values]
+    return {
+        'revision': git_revision(),
+        'created_at': datetime.utcnow().isoformat(),
+        'config': {
+            'requests': requests, 'concurrency': concurrency, 'warmup': warmup,
+            'seed': seed, 'read_only': read_only,
+        },
+        'duration_s': round(elapsed, 3),
+        'throughput_rps': round(len(everything) / elapsed, 2),
+        'overall': summarize(everything),
+        'endpoints': {name: summarize(values) for name, values in sorted(samples.items())},
+    }
+
+
+def compare(baseline, current, threshold=0.10):
+    """
+    Lines describing endpoints whose p95 latency or mean command count grew
+    by more than ``threshold`` relative to the baseline.
+    """
+    regressions = []
+    for name, now in current['endpoints'].items():
+        before = baseline.get('endpoints', {}).get(name)
+        if not before:
+            continue
+        for key in ('p95_ms', 'mongo_commands_mean'):
+            if before[key] and now[key] > before[key] * (1 + threshold):
+                regressions.append(
+                    f"{name}: {key} {before[key]} -> {now[key]} (+{(now[key] / before[key] - 1) * 100:.0f}%)"
+                )
+    return regressions
@@ -0,0 +1,251 @@
+"""
+Websocket fan-out benchmark: opens a group of clients on one live post,
+drives new-comment, like, edit or create traffic from one of them and
+measures how long each broadcast takes to reach every reader, how many
+messages never arrive, and how much process memory each connection costs.
+
+Clients talk to the ASGI application in-process through channels'
+WebsocketCommunicator, so the channel layer (Redis or the in-memory
+stand-in) is the only thing between the sender and the readers.
+
+Every broadcast is timed from the moment its triggering message was sent.
+The driver is a member of the group too, so its own copies arrive in send
+order and tell us which text belongs to which send; readers are matched
+against those texts.
+"""
+import asyncio
+import json
+import random
+import time
+from collections import defaultdict
+from datetime import datetime
+from bson import ObjectId
+from channels.testing import WebsocketCommunicator
+from benchmarks.endpoints import git_revision, percentile
+from users.dataset import WORDS
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def rss_bytes():
+    """Resident memory of this process, or None where it can't be read"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except (OSError, AttributeError):
+        return None
+
+
+def peak_rss_bytes():
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class Client:
+    """A websocket connection that records each text frame with its arrival time"""
+
+    def __init__(self, app, path):
+        self.communicator = WebsocketCommunicator(app, path)
+        self.received = []
+        self._reader = None
+
+    async def connect(self, timeout=10):
+        connected, _ = await self.communicator.connect(timeout)
+        if not connected:
+            raise ConnectionError(f"Websocket connection to {self.communicator.scope['path']} was refused")
+        self._reader = asyncio.ensure_future(self._read())
+
+    async def _read(self):
+        # Read the output queue directly: receive_output() kills the
+        # application when it times out
+        while True:
+            message = await self.communicator.output_queue.get()
+            if message['type'] == 'websocket.close':
+                return
+            if message['type'] == 'websocket.send' and message.get('text') is not None:
+                self.received.append((message['text'], time.perf_counter()))
+
+    async def send(self, payload):
+        await self.communicator.send_json_to(payload)
+        return time.perf_counter()
+
+    async def close(self):
+        if self._reader is not None:
+            self._reader.cancel()
+        try:
+            await self.communicator.disconnect(timeout=5)
+        except asyncio.TimeoutError:
+            pass
+
+
+def words(rng, count):
+    return ' '.join(rng.choice(WORDS) for _ in range(count))
+
+
+def new_comment(rng, fixtures, state, n):
+    return {'action': 'new_comment', 'author': rng.choice(fixtures.usernames), 'content': f"#{n} {words(rng, 20)}"}
+
+
+def like_comment(rng, fixtures, state, n):
+    return {'action': 'like_comment', 'comment_id': state['comment_id'], 'username': rng.choice(fixtures.usernames)}
+
+
+def edit_blog(rng, fixtures, state, n):
+    return {'title': f"Edit #{n}", 'content': words(rng, 120), 'tags': [rng.choice(WORDS)]}
+
+
+def create_blog(rng, fixtures, state, n):
+    return {'title': f"Draft #{n}", 'content': words(rng, 40)}
+
+
+async def seed_comment(driver, rng, fixtures, state, timeout):
+    """Likes need a comment to toggle; post one and take its id from the echo"""
+    await driver.send(new_comment(rng, fixtures, state, 0))
+    deadline = time.perf_counter() + timeout
+    while not driver.received:
+        if time.perf_counter() > deadline:
+            raise RuntimeError("The comment consumer did not echo the seed comment; check the blog id and usernames")
+        await asyncio.sleep(0.01)
+    state['comment_id'] = json.loads(driver.received[0][0])['comment']['id']
+
+
+# name -> (path builder, message builder, needs database fixtures, setup)
+SCENARIOS = {
+    'comment': (lambda blog_id: f'/ws/comments/{blog_id}/', new_comment, True, None),
+    'like': (lambda blog_id: f'/ws/comments/{blog_id}/', like_comment, True, seed_comment),
+    'edit': (lambda blog_id: f'/ws/blogs/update/{blog_id}/', edit_blog, False, None),
+    'create': (lambda blog_id: '/ws/blogs/create/', create_blog, False, None),
+}
+
+
+async def connect_all(app, path, count, concurrency):
+    """Open ``count`` clients, at most ``concurrency`` handshakes at a time"""
+    clients = [Client(app, path) for _ in range(count)]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def connect(client):
+        async with semaphore:
+            await client.connect()
+
+    await asyncio.gather(*(connect(client) for client in clients))
+    return clients
+
+
+async def wait_for_delivery(clients, expected, timeout):
+    """Wait until every client holds ``expected`` messages or the timeout passes"""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if all(len(client.received) >= expected for client in clients):
+            return
+        await asyncio.sleep(0.05)
+
+
+def occurrences(texts):
+    """Pair each text with how many times it was seen before, so repeats stay distinct"""
+    seen = defaultdict(int)
+    keyed = []
+    for text in texts:
+        keyed.append((text, seen[text]))
+        seen[text] += 1
+    return keyed
+
+
+def match_deliveries(send_times, driver_received, readers):
+    """
+    Latencies (seconds) of every delivery to a reader that can be tied to a
+    send, plus how many of the expected deliveries never arrived.
+    """
+    confirmed = min(len(send_times), len(driver_received))
+    sent_at = dict(zip(occurrences(text for text, _ in driver_received[:confirmed]), send_times))
+    latencies, delivered = [], 0
+    for reader in readers:
+        for key, (_, received_at) in zip(occurrences(text for text, _ in reader.received), reader.received):
+            started = sent_at.get(key)
+            if started is not None:
+                delivered += 1
+                latencies.append(received_at - started)
+    return latencies, confirmed * len(readers) - delivered
+
+
+async def measure(app, scenario, group_size, fixtures=None, events=50, rate=20.0, drain=10.0,
+                  connect_concurrency=200, seed=0):
+    """Run one scenario against a group of ``group_size`` readers plus the driver"""
+    path_for, build, _, setup = SCENARIOS[scenario]
+    rng = random.Random(seed)
+    blog_id = rng.choice(fixtures.blog_ids) if fixtures else str(ObjectId())
+    path = path_for(blog_id)
+
+    rss_before = rss_bytes()
+    started = time.perf_counter()
+    driver, = await connect_all(app, path, 1, 1)
+    readers = await connect_all(app, path, group_size, connect_concurrency)
+    connect_s = time.perf_counter() - started
+    rss_connected = rss_bytes()
+
+    try:
+        state = {}
+        if setup is not None:
+            await setup(driver, rng, fixtures, state, drain)
+            await wait_for_delivery(readers, 1, drain)
+        for client in [driver, *readers]:
+            client.received.clear()
+
+        send_times = []
+        traffic_started = time.perf_counter()
+        interval = 1 / rate if rate else 0
+        next_send = traffic_started
+        for n in range(1, events + 1):
+            await asyncio.sleep(max(next_send - time.perf_counter(), 0))
+            send_times.append(await driver.send(build(rng, fixtures, state, n)))
+            next_send += interval
+        await wait_for_delivery([driver], events, drain)
+        await wait_for_delivery(readers, len(driver.received), drain)
+        elapsed = time.perf_counter() - traffic_started
+    finally:
+        await asyncio.gather(*(client.close() for client in [driver, *readers]))
+
+    latencies, lost = match_deliveries(send_times, driver.received, readers)
+    latencies = sorted(latency * 1000 for latency in latencies)
+    expected = min(len(send_times), len(driver.received)) * group_size
+    rss_per_client = None
+    if rss_before is not None and rss_connected is not None:
+        rss_per_client = round((rss_connected - rss_before) / (group_size + 1))
+    return {
+        'scenario': scenario,
+        'group_size': group_size,
+        'connect_s': round(connect_s, 3),
+        'duration_s': round(elapsed, 3),
+        'events_sent': len(send_times),
+        'events_confirmed': len(driver.received),
+        'deliveries_expected': expected,
+        'deliveries_lost': lost,
+        'loss_rate': round(lost / expected, 5) if expected else None,
+        'p50_ms': round(percentile(latencies, 0.50), 3) if latencies else None,
+        'p95_ms': round(percentile(latencies, 0.95), 3) if latencies else None,
+        'p99_ms': round(percentile(latencies, 0.99), 3) if latencies else None,
+        'max_ms': round(latencies[-1], 3) if latencies else None,
+        'deliveries_per_s': round(len(latencies) / elapsed, 1),
+        'rss_per_client_bytes': rss_per_client,
+    }
+
+
+async def run(app, scenarios, group_sizes, fixtures=None, progress=None, **options):
+    results = []
+    for scenario in scenarios:
+        for group_size in group_sizes:
+            result = await measure(app, scenario, group_size, fixtures, **options)
+            results.append(result)
+            if progress:
+                progress(result)
+    return {
+        'revision': git_revision(),
+        'created_at': datetime.utcnow().isoformat(),
+        'config': {'scenarios': list(scenarios), 'group_sizes': list(group_sizes), **options},
+        'peak_rss_bytes': peak_rss_bytes(),
+        'results': results,
+    }
@@ -0,0 +1,69 @@
+import asyncio
+import json
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from benchmarks import endpoints
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay a weighted mix of API requests against the ASGI app and record "
+        "p50/p95/p99 latency, throughput and Mongo commands per request. "
+        "Votes and comments are written unless --read-only is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--warmup', type=int, default=200)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--read-only', action='store_true', help="Skip the vote and comment scenarios")
+        parser.add_argument('--cold', action='store_true', help="Disable the response and blog object caches")
+        parser.add_argument('--output', help="Write the results as JSON to this file")
+        parser.add_argument('--baseline', help="Compare against a previous --output file")
+        parser.add_argument('--threshold', type=float, default=0.10,
+                            help="Allowed relative growth of p95 and commands per request")
+
+    def handle(self, *args, **options):
+        if options['cold']:
+            settings.RESPONSE_CACHE_TIMEOUT = 0
+            settings.BLOG_OBJECT_CACHE_TTL = 0
+
+        from techsage.asgi import application
+
+        try:
+            fixtures = endpoints.Fixtures.load()
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        results = asyncio.run(endpoints.run(
+            application,
+            fixtures,
+            requests=options['requests'],
+            concurrency=options['concurrency'],
+            warmup=options['warmup'],
+            seed=options['seed'],
+            read_only=options['read_only']
+        ))
+
+        self.stdout.write(f"{'endpoint':<16}{'reqs':>7}{'err':>5}{'p50':>9}{'p95':>9}{'p99':>9}{'cmds':>7}")
+        for name, stats in [*results['endpoints'].items(), ('overall', results['overall'])]:
+            self.stdout.write(
+                f"{name:<16}{stats['requests']:>7}{stats['errors']:>5}{stats['p50_ms']:>9.1f}"
+                f"{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}{stats['mongo_commands_mean']:>7.1f}"
+            )
+        self.stdout.write(f"{results['throughput_rps']} requests/s over {results['duration_s']}s")
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)
+            regressions = endpoints.compare(baseline, results, options['threshold'])
+            for line in regressions:
+                self.stderr.write(line)
+            if regressions:
+                raise CommandError(f"{len(regressions)} regressions against {options['baseline']}")
+            self.stdout.write(self.style.SUCCESS(f"No regressions against {options['baseline']}"))
@@ -0,0 +1,54 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from benchmarks import micro
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the blog, comment, report and user serializers and the "
+        "save_version, update_draft and assign_badges model methods on "
+        "in-memory documents, without a database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('cases', nargs='*', help=f"Cases to run (default all): {', '.join(micro.CASES)}")
+        parser.add_argument('--rounds', type=int, default=7)
+        parser.add_argument('--round-time', type=float, default=0.1, help="Target seconds per timed round")
+        parser.add_argument('--save', action='store_true', help=f"Store the results under {micro.RESULTS_DIR}")
+        parser.add_argument('--compare', nargs='?', const='latest',
+                            help="Compare against a saved result file (default: the latest one)")
+        parser.add_argument('--threshold', type=float, default=0.10,
+                            help="Allowed relative growth of the median time per call")
+
+    def handle(self, *args, **options):
+        unknown = set(options['cases']) - set(micro.CASES)
+        if unknown:
+            raise CommandError(f"Unknown cases: {', '.join(sorted(unknown))}")
+
+        baseline_path = None
+        if options['compare']:
+            baseline_path = micro.latest() if options['compare'] == 'latest' else options['compare']
+            if baseline_path is None:
+                raise CommandError(f"No saved results in {micro.RESULTS_DIR} to compare against")
+
+        self.stdout.write(f"{'case':<22}{'min us':>12}{'median us':>12}{'stddev':>10}{'ops/s':>12}")
+        results = micro.run(options['cases'], options['rounds'], options['round_time'], progress=self.report)
+
+        if options['save']:
+            self.stdout.write(f"Saved {micro.save(results)}")
+
+        if baseline_path:
+            with open(baseline_path) as f:
+                baseline = json.load(f)
+            regressions = micro.compare(baseline, results, options['threshold'])
+            for line in regressions:
+                self.stderr.write(line)
+            if regressions:
+                raise CommandError(f"{len(regressions)} regressions against {baseline_path}")
+            self.stdout.write(self.style.SUCCESS(f"No regressions against {baseline_path}"))
+
+    def report(self, name, stats):
+        self.stdout.write(
+            f"{name:<22}{stats['min_us']:>12.1f}{stats['median_us']:>12.1f}"
+            f"{stats['stddev_us']:>10.1f}{stats['ops_per_s']:>12.1f}"
+        )
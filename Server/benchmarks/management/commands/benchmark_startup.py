@@ -0,0 +1,52 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from benchmarks import startup
+
+
+class Command(BaseCommand):
+    help = (
+        "Start fresh interpreters that load settings, apps, URLs and the ASGI "
+        "application, optionally serve one request, and time each step."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5)
+        parser.add_argument('--path', help="Serve one GET request to this path after loading, e.g. /api/blogs/published/")
+        parser.add_argument('--imports', type=int, default=0, metavar='N',
+                            help="List the N slowest imports from one extra -X importtime run")
+        parser.add_argument('--output', help="Write the results as JSON to this file")
+        parser.add_argument('--baseline', help="Compare against a previous --output file")
+        parser.add_argument('--threshold', type=float, default=0.10,
+                            help="Allowed relative growth of the median time per phase")
+
+    def handle(self, *args, **options):
+        try:
+            results = startup.run(options['runs'], options['path'], options['imports'], progress=self.progress)
+        except RuntimeError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(f"{'phase':<16}{'min ms':>10}{'median ms':>12}{'max ms':>10}")
+        for phase, stats in results['phases'].items():
+            self.stdout.write(f"{phase:<16}{stats['min_ms']:>10.1f}{stats['median_ms']:>12.1f}{stats['max_ms']:>10.1f}")
+        if results['mongo_connected_at_startup']:
+            self.stderr.write("A Mongo client was created while loading settings, apps or URLs")
+
+        for module in results.get('imports', []):
+            self.stdout.write(f"{module['self_ms']:>9.1f} ms  {module['module']}")
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)
+            regressions = startup.compare(baseline, results, options['threshold'])
+            for line in regressions:
+                self.stderr.write(line)
+            if regressions:
+                raise CommandError(f"{len(regressions)} regressions against {options['baseline']}")
+            self.stdout.write(self.style.SUCCESS(f"No regressions against {options['baseline']}"))
+
+    def progress(self, n, sample):
+        self.stdout.write(f"run {n}: {sample['total_ms']:.0f} ms")
@@ -0,0 +1,91 @@
+import asyncio
+import json
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from benchmarks import endpoints, fanout
+
+
+def int_list(value):
+    return [int(item) for item in value.split(',') if item]
+
+
+class Command(BaseCommand):
+    help = (
+        "Open growing groups of websocket clients on one post, drive comment, "
+        "like, edit or create traffic and record broadcast latency, lost "
+        "messages and memory per connection. The comment and like scenarios "
+        "write to the database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scenarios', default='edit,comment,like',
+                            help=f"Comma-separated, from: {', '.join(fanout.SCENARIOS)}")
+        parser.add_argument('--sizes', type=int_list, default=[100, 500, 1000, 2500, 5000],
+                            help="Comma-separated group sizes (readers per post)")
+        parser.add_argument('--events', type=int, default=50, help="Broadcasts per scenario and group size")
+        parser.add_argument('--rate', type=float, default=20.0, help="Broadcasts per second; 0 sends back to back")
+        parser.add_argument('--drain', type=float, default=10.0,
+                            help="Seconds to wait for outstanding deliveries before counting them lost")
+        parser.add_argument('--connect-concurrency', type=int, default=200)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--layer', choices=['redis', 'memory'], default='redis',
+                            help="Use the configured Redis channel layer or an in-memory stand-in")
+        parser.add_argument('--capacity', type=int, default=100,
+                            help="Per-channel capacity of the in-memory layer")
+        parser.add_argument('--output', help="Write the results as JSON to this file")
+
+    def handle(self, *args, **options):
+        scenarios = [name for name in options['scenarios'].split(',') if name]
+        unknown = set(scenarios) - set(fanout.SCENARIOS)
+        if unknown:
+            raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+        fixtures = None
+        if any(fanout.SCENARIOS[name][2] for name in scenarios):
+            try:
+                fixtures = endpoints.Fixtures.load(sample_size=50)
+            except ValueError as e:
+                raise CommandError(str(e))
+
+        layers = None
+        if options['layer'] == 'memory':
+            layers = {'default': {
+                'BACKEND': 'channels.layers.InMemoryChannelLayer',
+                'CONFIG': {'capacity': options['capacity']},
+            }}
+
+        from techsage.asgi import application
+
+        self.stdout.write(
+            f"{'scenario':<10}{'readers':>8}{'connect':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'lost':>9}{'KiB/conn':>10}"
+        )
+        with override_settings(**({'CHANNEL_LAYERS': layers} if layers else {})):
+            results = asyncio.run(fanout.run(
+                application,
+                scenarios,
+                options['sizes'],
+                fixtures,
+                progress=self.report,
+                events=options['events'],
+                rate=options['rate'],
+                drain=options['drain'],
+                connect_concurrency=options['connect_concurrency'],
+                seed=options['seed']
+            ))
+        results['config']['layer'] = options['layer']
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+
+    def report(self, result):
+        def ms(value):
+            return f"{value:>9.1f}" if value is not None else f"{'-':>9}"
+
+        memory = result['rss_per_client_bytes']
+        self.stdout.write(
+            f"{result['scenario']:<10}{result['group_size']:>8}{result['connect_s']:>8.1f}s"
+            f"{ms(result['p50_ms'])}{ms(result['p95_ms'])}{ms(result['p99_ms'])}"
+            f"{result['loss_rate'] if result['loss_rate'] is not None else '-':>9}"
+            f"{memory / 1024 if memory is not None else 0:>10.1f}"
+        )
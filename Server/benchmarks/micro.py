@@ -0,0 +1,286 @@
+"""
+Microbenchmarks for serializers and hot model methods.
+
+Each case builds in-memory documents, patches out the database calls the
+code under test would make (user lookups, saves, count queries) and hands
+back a zero-argument callable, so only CPU time is measured. The runner
+calibrates a loop count per case, times several rounds and reports
+per-call statistics in microseconds; results are saved as JSON under
+RESULTS_DIR and compared against an earlier run.
+"""
+import gc
+import json
+import statistics
+import time
+from contextlib import ExitStack, contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest import mock
+from bson import ObjectId
+from django.conf import settings
+from badges.models import Badge
+from blogs import readers
+from blogs.models import Blog
+from comments.models import Comment
+from reports.models import BlogReport
+from users.dataset import CATEGORIES, TAGS, WORDS
+from users.models import User
+from benchmarks.endpoints import git_revision
+
+RESULTS_DIR = Path(settings.BASE_DIR) / '.benchmarks' / 'micro'
+
+BATCH_SIZE = 50
+NOW = datetime(2025, 3, 1, 12, 0)
+
+
+def text(n, offset=0):
+    return ' '.join(WORDS[(offset + i) % len(WORDS)] for i in range(n))
+
+
+def make_users(count):
+    return [
+        User(
+            id=ObjectId(), username=f'user{i}', email=f'user{i}@example.com', password='x',
+            avatar_url=f'https://res.cloudinary.com/demo/avatars/user{i}.jpg', bio=text(30, i),
+            points=i * 37, created_at=NOW, updated_at=NOW,
+            badges=[{'name': 'bronze', 'title': 'Bronze', 'points_required': 100}],
+        )
+        for i in range(count)
+    ]
+
+
+def make_blog_docs(users, count=BATCH_SIZE):
+    """Raw documents shaped like the aggregate output the plans consume"""
+    docs = []
+    for i in range(count):
+        content = text(400, i)
+        docs.append({
+            '_id': ObjectId(),
+            'title': text(8, i),
+            'thumbnail_url': f'https://res.cloudinary.com/demo/blogs/{i}.jpg',
+            'authors': [users[i % len(users)].id, users[(i + 1) % len(users)].id],
+            'categories': [CATEGORIES[i % len(CATEGORIES)]],
+            'tags': [TAGS[i % len(TAGS)], TAGS[(i + 3) % len(TAGS)]],
+            'is_draft': False,
+            'is_published': True,
+            'is_deleted': False,
+            'created_at': NOW - timedelta(hours=i),
+            'published_at': NOW - timedelta(hours=i),
+            'content': content,
+            'excerpt_text': content[:200],
+            'content_length': len(content),
+            'upvotes_size': i * 3,
+            'downvotes_size': i,
+            'change_seq': i,
+        })
+    return docs
+
+
+def author_cards(users):
+    return {user.id: {'username': user.username, 'avatar': user.avatar_url} for user in users}
+
+
+def make_blog(users, versions=20):
+    blog = Blog(
+        id=ObjectId(), title=text(8), content=text(1500), authors=users[:2],
+        categories=CATEGORIES[:2], tags=TAGS[:3], is_draft=True, is_published=False,
+        created_at=NOW,
+    )
+    for i in range(versions):
+        blog.save_version(users[0].username)
+    return blog
+
+
+@contextmanager
+def plan_serialize(plan):
+    users = make_users(20)
+    docs = make_blog_docs(users)
+    # The plans fetch author cards in one query; serve them from memory
+    with mock.patch.object(readers, 'load_users', return_value=author_cards(users)):
+        yield lambda: plan.serialize(docs)
+
+
+@contextmanager
+def list_blogs():
+    with plan_serialize(readers.LIST_PLAN) as run:
+        yield run
+
+
+@contextmanager
+def published_blogs():
+    with plan_serialize(readers.PUBLISHED_PLAN) as run:
+        yield run
+
+
+@contextmanager
+def comment_to_json():
+    users = make_users(20)
+    blog = Blog(id=ObjectId(), title=text(8))
+    comments = [
+        Comment(
+            id=ObjectId(), blog=blog, author=users[i % len(users)], content=text(60, i),
+            likes=users[:i % 7], created_at=NOW, updated_at=NOW, reviewed_by=users[0] if i % 2 else None,
+        )
+        for i in range(BATCH_SIZE)
+    ]
+    yield lambda: [comment.to_json() for comment in comments]
+
+
+@contextmanager
+def report_to_json():
+    users = make_users(20)
+    blogs = [Blog(id=ObjectId(), title=text(8, i), thumbnail_url=f'https://example.com/{i}.jpg') for i in range(10)]
+    reports = [
+        BlogReport(
+            id=ObjectId(), blog=blogs[i % len(blogs)], reported_by=users[i % len(users)], reason='other',
+            details=text(40, i), created_at=NOW, reviewed_by=users[1] if i % 3 == 0 else None,
+            reviewed_at=NOW if i % 3 == 0 else None,
+        )
+        for i in range(BATCH_SIZE)
+    ]
+    yield lambda: [report.to_json() for report in reports]
+
+
+@contextmanager
+def user_to_json():
+    users = make_users(BATCH_SIZE)
+    # blog_count is a count query per user; keep it out of the CPU timing
+    with mock.patch.object(User, 'calculate_publications', return_value=12):
+        yield lambda: [user.to_json() for user in users]
+
+
+@contextmanager
+def blog_save_version():
+    users = make_users(2)
+    blog = make_blog(users)
+
+    def run():
+        blog.save_version(users[0].username)
+        del blog.versions[-1]
+
+    yield run
+
+
+@contextmanager
+def blog_update_draft():
+    users = make_users(2)
+    blog = make_blog(users)
+    data = {'title': text(10), 'content': text(1500, 7), 'categories[]': CATEGORIES[:3], 'tags[]': TAGS[:5]}
+
+    def run():
+        blog.update_draft(data, users[0].username)
+        del blog.versions[-1]
+
+    with mock.patch.object(Blog, 'save'):
+        yield run
+
+
+@contextmanager
+def badge_assign_badges():
+    badges = [
+        Badge(id=ObjectId(), name=name, title=name.title(), image_url=f'https://example.com/{name}.png',
+              points_required=points)
+        for name, points in [('ruby', 0), ('bronze', 100), ('silver', 500), ('gold', 2000), ('diamond', 10000)]
+    ]
+    user, = make_users(1)
+    user.points = 2500
+    with ExitStack() as stack:
+        objects = stack.enter_context(mock.patch.object(Badge, 'objects'))
+        objects.order_by.return_value = badges
+        stack.enter_context(mock.patch.object(User, 'save'))
+        yield lambda: Badge.assign_badges(user)
+
+
+# name -> case; a case is a context manager that yields the callable to time
+CASES = {
+    'list_blogs': list_blogs,
+    'published_blogs': published_blogs,
+    'comment_to_json': comment_to_json,
+    'report_to_json': report_to_json,
+    'user_to_json': user_to_json,
+    'blog_save_version': blog_save_version,
+    'blog_update_draft': blog_update_draft,
+    'badge_assign_badges': badge_assign_badges,
+}
+
+
+def calibrate(func, round_time):
+    """Loops per round so that one round takes about ``round_time`` seconds"""
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= round_time / 10 or loops >= 1_000_000:
+            return max(int(loops * round_time / max(elapsed, 1e-9)), 1)
+        loops *= 10
+
+
+def measure(func, rounds=7, round_time=0.1):
+    """Per-call timings in microseconds over ``rounds`` timed rounds"""
+    func()
+    loops = calibrate(func, round_time)
+    timings = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            started = time.perf_counter()
+            for _ in range(loops):
+                func()
+            timings.append((time.perf_counter() - started) / loops * 1e6)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return {
+        'loops': loops,
+        'rounds': rounds,
+        'min_us': round(min(timings), 3),
+        'median_us': round(statistics.median(timings), 3),
+        'mean_us': round(statistics.fmean(timings), 3),
+        'stddev_us': round(statistics.stdev(timings), 3) if rounds > 1 else 0.0,
+        'ops_per_s': round(1e6 / statistics.median(timings), 1),
+    }
+
+
+def run(names=None, rounds=7, round_time=0.1, progress=None):
+    results = {}
+    for name in names or CASES:
+        with CASES[name]() as func:
+            results[name] = measure(func, rounds, round_time)
+        if progress:
+            progress(name, results[name])
+    return {
+        'revision': git_revision(),
+        'created_at': datetime.utcnow().isoformat(),
+        'config': {'rounds': rounds, 'round_time': round_time, 'batch_size': BATCH_SIZE},
+        'cases': results,
+    }
+
+
+def save(results, directory=RESULTS_DIR):
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.utcnow().strftime('%Y%m%d-%H%M%S')
+    path = directory / f"{stamp}-{results['revision'] or 'unknown'}.json"
+    path.write_text(json.dumps(results, indent=2))
+    return path
+
+
+def latest(directory=RESULTS_DIR):
+    """The most recently saved result file, or None"""
+    paths = sorted(directory.glob('*.json')) if directory.exists() else []
+    return paths[-1] if paths else None
+
+
+def compare(baseline, current, threshold=0.10):
+    """Lines describing cases whose median time grew by more than ``threshold``"""
+    regressions = []
+    for name, now in current['cases'].items():
+        before = baseline.get('cases', {}).get(name)
+        if before and now['median_us'] > before['median_us'] * (1 + threshold):
+            regressions.append(
+                f"{name}: median {before['median_us']}us -> {now['median_us']}us "
+                f"(+{(now['median_us'] / before['median_us'] - 1) * 100:.0f}%)"
+            )
+    return regressions
@@ -0,0 +1,132 @@
+"""
+Process start-up benchmark: launches fresh interpreters that load the
+project the way a worker or a management command does and times each step,
+from interpreter start to the first request being served.
+
+Each run is a new process, so nothing is warm except the OS file cache.
+The child reports its own phase timings as JSON on stdout; the parent adds
+interpreter start-up and shut-down (wall time minus the child's own
+total). With
+``imports`` the child also runs under ``-X importtime`` and the slowest
+modules are listed. Loading settings, apps and URLs must not create a Mongo
+client; the ASGI phase includes the worker warm-up that does.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from django.conf import settings
+from benchmarks.endpoints import git_revision
+
+PHASES = ['interpreter', 'settings', 'setup', 'urls', 'asgi', 'first_request']
+
+CHILD = r'''
+import json, os, sys, time
+started = time.perf_counter()
+phases = {}
+
+def mark(name):
+    global started
+    now = time.perf_counter()
+    phases[name] = (now - started) * 1000
+    started = now
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'techsage.settings')
+from django.conf import settings
+settings.INSTALLED_APPS
+mark('settings')
+import django
+django.setup()
+mark('setup')
+from django.urls import get_resolver
+get_resolver().url_patterns
+mark('urls')
+from techsage import clients
+connected = clients.mongo_connected()
+from techsage.asgi import application
+mark('asgi')
+if sys.argv[1]:
+    from django.test import Client
+    Client().get(sys.argv[1])
+    mark('first_request')
+print(json.dumps({'phases': phases, 'mongo_connected': connected}))
+'''
+
+
+def parse_importtime(stderr, top=15):
+    """The ``top`` slowest modules by self time from -X importtime output"""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len('import time:'):].split('|'))
+        modules.append({'module': name, 'self_ms': int(self_us) / 1000, 'cumulative_ms': int(cumulative_us) / 1000})
+    return sorted(modules, key=lambda module: module['self_ms'], reverse=True)[:top]
+
+
+def launch(path=None, imports=0):
+    """
+    Start one child process and return its phase timings in milliseconds,
+    plus the ``imports`` slowest modules when asked for
+    """
+    command = [sys.executable, *(['-X', 'importtime'] if imports else []), '-c', CHILD, path or '']
+    started = time.perf_counter()
+    completed = subprocess.run(command, cwd=settings.BASE_DIR, env=os.environ, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - started) * 1000
+    if completed.returncode:
+        raise RuntimeError(f"Start-up run failed:\n{completed.stderr[-2000:]}")
+    report = json.loads(completed.stdout.strip().splitlines()[-1])
+    phases = report['phases']
+    phases['interpreter'] = wall_ms - sum(phases.values())
+    result = {'phases': phases, 'total_ms': wall_ms, 'mongo_connected': report['mongo_connected']}
+    if imports:
+        result['imports'] = parse_importtime(completed.stderr, imports)
+    return result
+
+
+def summarize(samples):
+    summary = {}
+    for phase in [*PHASES, 'total']:
+        values = [s['total_ms'] if phase == 'total' else s['phases'].get(phase) for s in samples]
+        values = [value for value in values if value is not None]
+        if values:
+            summary[phase] = {
+                'min_ms': round(min(values), 1),
+                'median_ms': round(statistics.median(values), 1),
+                'max_ms': round(max(values), 1),
+            }
+    return summary
+
+
+def run(runs=5, path=None, imports=0, progress=None):
+    samples = []
+    for n in range(runs):
+        samples.append(launch(path))
+        if progress:
+            progress(n + 1, samples[-1])
+    results = {
+        'revision': git_revision(),
+        'created_at': datetime.utcnow().isoformat(),
+        'config': {'runs': runs, 'path': path, 'python': sys.version.split()[0]},
+        'phases': summarize(samples),
+        'mongo_connected_at_startup': any(s['mongo_connected'] for s in samples),
+    }
+    if imports:
+        results['imports'] = launch(path, imports)['imports']
+    return results
+
+
+def compare(baseline, current, threshold=0.10):
+    """Lines describing phases whose median grew by more than ``threshold``"""
+    regressions = []
+    for phase, now in current['phases'].items():
+        before = baseline.get('phases', {}).get(phase)
+        if before and now['median_ms'] > before['median_ms'] * (1 + threshold):
+            regressions.append(
+                f"{phase}: median {before['median_ms']}ms -> {now['median_ms']}ms "
+                f"(+{(now['median_ms'] / before['median_ms'] - 1) * 100:.0f}%)"
+            )
+    return regressions
@@ -0,0 +1,37 @@
+from benchmarks import endpoints
+
+FIXTURES = endpoints.Fixtures(['0' * 24, '1' * 24], ['alice', 'bob'])
+
+
+def test_plan_is_deterministic_and_respects_read_only():
+    planned = endpoints.plan_requests(FIXTURES, 200, seed=7)
+    assert planned == endpoints.plan_requests(FIXTURES, 200, seed=7)
+    assert {name for name, *_ in planned} == set(endpoints.SCENARIOS)
+
+    read_only = endpoints.plan_requests(FIXTURES, 200, seed=7, read_only=True)
+    assert all(method == 'GET' for _, method, _, _ in read_only)
+
+
+def test_percentiles():
+    values = list(range(1, 101))
+    assert endpoints.percentile(values, 0.50) == 50
+    assert endpoints.percentile(values, 0.95) == 95
+    assert endpoints.percentile(values, 0.99) == 99
+    assert endpoints.percentile([], 0.5) is None
+
+
+def test_compare_flags_growth_over_threshold():
+    baseline = {'endpoints': {
+        'feed': {'p95_ms': 10.0, 'mongo_commands_mean': 3.0},
+        'vote': {'p95_ms': 20.0, 'mongo_commands_mean': 6.0},
+    }}
+    current = {'endpoints': {
+        'feed': {'p95_ms': 10.5, 'mongo_commands_mean': 5.0},
+        'vote': {'p95_ms': 30.0, 'mongo_commands_mean': 6.0},
+        'search': {'p95_ms': 99.0, 'mongo_commands_mean': 9.0},
+    }}
+    regressions = endpoints.compare(baseline, current, threshold=0.10)
+    assert regressions == [
+        'feed: mongo_commands_mean 3.0 -> 5.0 (+67%)',
+        'vote: p95_ms 20.0 -> 30.0 (+50%)',
+    ]
@@ -0,0 +1,28 @@
+import asyncio
+from types import SimpleNamespace
+from django.test.utils import override_settings
+from benchmarks import fanout
+
+IN_MEMORY_LAYER = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+def test_repeated_texts_are_matched_in_order():
+    driver = [('a', 1.0), ('b', 2.0), ('a', 3.0)]
+    readers = [
+        SimpleNamespace(received=[('a', 1.5), ('b', 2.5), ('a', 3.5)]),
+        SimpleNamespace(received=[('a', 1.25), ('a', 3.25), ('unrelated', 9.0)]),
+    ]
+    latencies, lost = fanout.match_deliveries([0.5, 1.5, 2.5], driver, readers)
+    assert sorted(latencies) == [0.75, 0.75, 1.0, 1.0, 1.0]
+    assert lost == 1
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYER)
+def test_edit_broadcast_reaches_every_reader():
+    from techsage.asgi import application
+
+    result = asyncio.run(fanout.measure(application, 'edit', 20, events=5, rate=0, drain=5))
+    assert result['events_confirmed'] == 5
+    assert result['deliveries_expected'] == 100
+    assert result['deliveries_lost'] == 0
+    assert result['p99_ms'] is not None
@@ -0,0 +1,26 @@
+import pytest
+from badges.models import Badge
+from benchmarks import micro
+
+
+@pytest.mark.parametrize('name', list(micro.CASES))
+def test_case_runs_without_database(name):
+    with micro.CASES[name]() as func:
+        func()
+    # Patches are undone once the case exits
+    assert type(Badge.__dict__['objects']).__name__ == 'QuerySetManager'
+
+
+def test_results_round_trip_and_compare(tmp_path):
+    results = micro.run(['blog_save_version'], rounds=2, round_time=0.01)
+    stats = results['cases']['blog_save_version']
+    assert stats['min_us'] <= stats['median_us']
+
+    path = micro.save(results, tmp_path)
+    assert micro.latest(tmp_path) == path
+
+    slower = {'cases': {'blog_save_version': {**stats, 'median_us': stats['median_us'] * 2}}}
+    assert micro.compare(results, slower) == [
+        f"blog_save_version: median {stats['median_us']}us -> {stats['median_us'] * 2}us (+100%)"
+    ]
+    assert micro.compare(slower, results) == []
@@ -0,0 +1,26 @@
+from benchmarks import startup
+
+
+def test_loading_the_project_creates_no_mongo_client():
+    result = startup.launch()
+    assert result['mongo_connected'] is False
+    assert set(result['phases']) == {'interpreter', 'settings', 'setup', 'urls', 'asgi'}
+
+
+def test_parse_importtime_orders_by_self_time():
+    stderr = '\n'.join([
+        'import time: self [us] | cumulative | imported package',
+        'import time:       120 |        120 |   _io',
+        'import time:      3400 |       5200 | mongoengine',
+        'import time:      1800 |       1800 |     pymongo.pool',
+    ])
+    assert startup.parse_importtime(stderr, top=2) == [
+        {'module': 'mongoengine', 'self_ms': 3.4, 'cumulative_ms': 5.2},
+        {'module': 'pymongo.pool', 'self_ms': 1.8, 'cumulative_ms': 1.8},
+    ]
+
+
+def test_compare_flags_slower_phases():
+    baseline = {'phases': {'settings': {'median_ms': 100.0}, 'urls': {'median_ms': 50.0}}}
+    current = {'phases': {'settings': {'median_ms': 105.0}, 'urls': {'median_ms': 80.0}}}
+    assert startup.compare(baseline, current) == ['urls: median 50.0ms -> 80.0ms (+60%)']
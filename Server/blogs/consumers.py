@@ -1,10 +1,11 @@
 import json
 from channels.generic.websocket import AsyncWebsocketConsumer
+from techsage.metrics import ConsumerMetricsMixin
 from channels.db import database_sync_to_async
 from django.contrib.auth.models import User
 from blogs.models import Blog
 
-class BlogCreateConsumer(AsyncWebsocketConsumer):
+class BlogCreateConsumer(ConsumerMetricsMixin, AsyncWebsocketConsumer):
     async def connect(self):
         self.group_name = 'blog_create'
         await self.channel_layer.group_add(self.group_name, self.channel_name)
@@ -27,7 +28,7 @@ class BlogCreateConsumer(AsyncWebsocketConsumer):
                 return
 
             # Broadcast to group
-            await self.channel_layer.group_send(
+            await self.group_send(
                 self.group_name,
                 {
                     'type': 'blog_update',
@@ -53,7 +54,7 @@ class BlogCreateConsumer(AsyncWebsocketConsumer):
             'thumbnail_url': event.get('thumbnail_url'),
         }))
 
-class BlogUpdateConsumer(AsyncWebsocketConsumer):
+class BlogUpdateConsumer(ConsumerMetricsMixin, AsyncWebsocketConsumer):
     async def connect(self):
         self.blog_id = self.scope['url_route']['kwargs']['blog_id']
         self.group_name = f'blog_update_{self.blog_id}'
@@ -77,7 +78,7 @@ class BlogUpdateConsumer(AsyncWebsocketConsumer):
                 return
 
             # Broadcast to group
-            await self.channel_layer.group_send(
+            await self.group_send(
                 self.group_name,
                 {
                     'type': 'blog_update',
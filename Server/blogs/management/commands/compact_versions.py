@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from blogs.versioning import compact_versions
+
+COLLECTIONS = {
+    'blogs': ['blogs'],
+    'versioned_blogs': ['versioned_blogs'],
+    'all': ['blogs', 'versioned_blogs'],
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Thin out old blog versions according to the retention policy. "
+        "Runs in batches and resumes from the last checkpoint if interrupted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--collection', choices=COLLECTIONS.keys(), default='all')
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument('--restart', action='store_true',
+                            help="Ignore the saved checkpoint and start from the first document")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Report what would be removed without writing anything")
+
+    def handle(self, *args, **options):
+        for collection_name in COLLECTIONS[options['collection']]:
+            stats = compact_versions(
+                collection_name,
+                batch_size=options['batch_size'],
+                restart=options['restart'],
+                dry_run=options['dry_run']
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f"{collection_name}: scanned {stats['documents']} documents, "
+                f"updated {stats['updated']}, removed {stats['versions_removed']} versions"
+                + (" (dry run)" if options['dry_run'] else "")
+            ))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from blogs.trending import rebase
+
+
+class Command(BaseCommand):
+    help = (
+        "Move every trending score onto the current epoch. Run it shortly "
+        "after each TRENDING_REBASE_HOURS boundary, e.g. hourly from cron."
+    )
+
+    def handle(self, *args, **options):
+        updated = rebase()
+        self.stdout.write(self.style.SUCCESS(f"Rebased the trending score of {updated} blogs"))
@@ -1,7 +1,135 @@
+import os
+import threading
+import time
 from datetime import datetime
+from django.conf import settings
 from mongoengine import Document, fields, EmbeddedDocument, ValidationError, CASCADE
+from pymongo import ReturnDocument
 from users.models import User
-import cloudinary.uploader
+from techsage import clients, metrics
+
+class ChangeCounter(Document):
+    """Global sequence behind the change feeds"""
+    name = fields.StringField(primary_key=True)
+    seq = fields.IntField(default=0)
+
+    meta = {
+        'collection': 'change_counters'
+    }
+
+def _reserve_change_seqs(count):
+    doc = ChangeCounter._get_collection().find_one_and_update(
+        {'_id': 'changes'},
+        {'$inc': {'seq': count}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return doc['seq']
+
+class _ChangeSeqBlock:
+    """Sequence numbers this process reserved ahead, and until when it may hand them out"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pid = None
+        self.next = 1
+        self.last = 0
+        self.expires = 0.0
+
+    def take(self):
+        with self.lock:
+            now = time.monotonic()
+            # A forked worker must not reuse its parent's block
+            if self.next > self.last or now >= self.expires or self.pid != os.getpid():
+                size = settings.CHANGE_SEQ_BLOCK_SIZE
+                self.last = _reserve_change_seqs(size)
+                self.next = self.last - size + 1
+                self.expires = now + settings.CHANGE_SEQ_BLOCK_SECONDS
+                self.pid = os.getpid()
+            seq = self.next
+            self.next += 1
+            return seq
+
+_change_seq_block = _ChangeSeqBlock()
+
+def next_change_seq(count=1):
+    """
+    Reserve ``count`` sequence numbers and return the highest one. Single
+    numbers come from a per-process block, so most saves skip the counter
+    round trip. A block is only used for CHANGE_SEQ_BLOCK_SECONDS: the
+    change feeds rely on every number landing within CHANGES_SETTLE_SECONDS
+    of its reservation (see blogs/sync.py).
+    """
+    if count > 1 or settings.CHANGE_SEQ_BLOCK_SIZE <= 1:
+        return _reserve_change_seqs(count)
+    return _change_seq_block.take()
+
+class Tombstone(Document):
+    """Marks a hard-deleted document so change feeds can report it"""
+    collection_name = fields.StringField(required=True)
+    doc_id = fields.ObjectIdField(required=True)
+    scope = fields.ObjectIdField()
+    change_seq = fields.IntField(required=True)
+    changed_at = fields.DateTimeField(default=datetime.utcnow)
+
+    meta = {
+        'collection': 'tombstones',
+        'indexes': [
+            ('collection_name', 'change_seq'),
+            ('collection_name', 'scope', 'change_seq')
+        ]
+    }
+
+class ChangeTracked(Document):
+    """
+    Base for documents exposed through the change feeds. Every save stamps
+    the next global sequence number and every delete leaves a tombstone.
+    ``change_scope_field`` names the reference feeds can be filtered by.
+    """
+    change_seq = fields.IntField()
+    changed_at = fields.DateTimeField()
+
+    change_scope_field = None
+
+    meta = {
+        'abstract': True
+    }
+
+    def save(self, *args, **kwargs):
+        self.change_seq = next_change_seq()
+        self.changed_at = datetime.utcnow()
+        return super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        doc = self.to_mongo()
+        super().delete(*args, **kwargs)
+        record_tombstones(type(self), [doc])
+
+def record_tombstones(document, docs):
+    """Insert tombstones for raw ``docs`` removed from ``document``'s collection"""
+    if not docs:
+        return
+    last_seq = next_change_seq(len(docs))
+    now = datetime.utcnow()
+    scope_field = document.change_scope_field
+    Tombstone._get_collection().insert_many([
+        {
+            'collection_name': document._get_collection_name(),
+            'doc_id': doc['_id'],
+            'scope': doc.get(scope_field) if scope_field else None,
+            'change_seq': last_seq - len(docs) + i + 1,
+            'changed_at': now
+        }
+        for i, doc in enumerate(docs)
+    ], ordered=False)
+
+def delete_tracked(queryset):
+    """Bulk delete a queryset of change-tracked documents, leaving tombstones"""
+    document = queryset._document
+    fields_needed = ['id'] + ([document.change_scope_field] if document.change_scope_field else [])
+    docs = list(queryset.only(*fields_needed).as_pymongo())
+    queryset.delete()
+    record_tombstones(document, docs)
 
 class BlogVersion(EmbeddedDocument):
     title = fields.StringField(required=True)
@@ -13,7 +141,7 @@ class BlogVersion(EmbeddedDocument):
     categories = fields.ListField(fields.StringField())
     tags = fields.ListField(fields.StringField())
 
-class Blog(Document):
+class Blog(ChangeTracked):
     title = fields.StringField(required=True)
     content = fields.StringField(required=True)
     authors = fields.ListField(fields.ReferenceField(User))
@@ -38,17 +166,26 @@ class Blog(Document):
     reviewed_by = fields.ReferenceField(User, null=True)
     upvote_count = fields.IntField(default=0)
     downvote_count = fields.IntField(default=0)
+    # Maintained by blogs/trending.py, never by save()
+    trending_score = fields.FloatField(default=0.0)
+    trending_epoch = fields.IntField()
     
     meta = {
         'collection': 'blogs',
         'ordering': ['-created_at'],
+        # Compound indexes follow the hot query shapes: equality fields
+        # first, then the sort key. See blogs/tests/test_indexes.py.
         'indexes': [
-            'is_draft',
-            'is_published',
-            'is_deleted',
+            ('is_published', 'is_deleted', '-published_at'),
+            ('categories', 'is_published', 'is_deleted', '-published_at'),
+            ('categories', 'is_deleted', '-created_at'),
+            ('authors', 'is_published', 'is_deleted', '-published_at'),
+            ('authors', 'is_deleted', '-created_at'),
+            ('is_deleted', '-created_at'),
+            ('is_published', 'is_deleted', '-trending_score'),
+            ('categories', 'is_published', 'is_deleted', '-trending_score'),
             'tags',
-            'is_reviewed',
-            'categories'
+            'change_seq'
         ]
     }
 
@@ -78,6 +215,20 @@ class Blog(Document):
         self.versions.append(version)
         self.current_version = len(self.versions)
 
+    def has_unversioned_changes(self):
+        """Check whether the blog differs from its latest saved version"""
+        if not self.versions:
+            return True
+        latest = self.versions[-1]
+        return (
+            latest.title != self.title or
+            latest.content != self.content or
+            latest.thumbnail_url != self.thumbnail_url or
+            latest.is_draft != self.is_draft or
+            list(latest.categories) != list(self.categories) or
+            list(latest.tags) != list(self.tags)
+        )
+
     def revert_to_version(self, version_number, username):
         try:
             version = self.versions[version_number - 1]
@@ -103,6 +254,9 @@ class Blog(Document):
         self.is_published = True
         self.published_at = datetime.utcnow()
         self.published_by = username
+        # Keep a published snapshot of whatever autosaves left unversioned
+        if self.has_unversioned_changes():
+            self.save_version(username)
         self.save()
         
     def unpublish(self, username):
@@ -122,7 +276,8 @@ class Blog(Document):
         """Permanently delete blog"""
         if self.thumbnail_url:
             public_id = self.thumbnail_url.split('/')[-1].split('.')[0]
-            cloudinary.uploader.destroy(public_id)
+            with metrics.external_call('cloudinary'):
+                clients.cloudinary_uploader().destroy(public_id)
         self.delete()
 
     def add_author(self, user):
@@ -156,8 +311,8 @@ class Blog(Document):
             self.categories = data.getlist('categories[]', []) if hasattr(data, 'getlist') else (data.get('categories[]', []) if isinstance(data.get('categories[]'), list) else [data.get('categories[]', '')] if data.get('categories[]') else [])
         if 'tags[]' in data:
             self.tags = data.getlist('tags[]', []) if hasattr(data, 'getlist') else (data.get('tags[]', []) if isinstance(data.get('tags[]'), list) else [data.get('tags[]', '')] if data.get('tags[]') else [])
-        self.save()
         self.save_version(username)
+        self.save()
         return self
     
 class Vote(Document):
@@ -168,6 +323,19 @@ class Vote(Document):
     
     meta = {
         'indexes': [
-            {'fields': ['blog', 'user'], 'unique': True}
+            {'fields': ['blog', 'user'], 'unique': True},
+            ('user', '-created_at')
         ]
+    }
+
+class VersionCompaction(Document):
+    """Resumable progress of the version compaction job for one collection"""
+    collection_name = fields.StringField(required=True, unique=True)
+    last_id = fields.ObjectIdField()
+    started_at = fields.DateTimeField()
+    completed_at = fields.DateTimeField()
+    versions_removed = fields.IntField(default=0)
+
+    meta = {
+        'collection': 'version_compactions'
     }
\ No newline at end of file
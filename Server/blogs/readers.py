@@ -0,0 +1,601 @@
+import re
+from datetime import datetime, timedelta, timezone
+from bson import ObjectId
+import pytz
+from django.conf import settings
+from techsage import mongo_async, read_routing, response_cache
+from techsage.object_cache import MISSING, AsyncSingleFlight, LFUCache, SingleFlight
+from users.models import User
+from .models import Blog
+
+DHAKA_TZ = pytz.timezone('Asia/Dhaka')
+TIMEZONE_LABEL = "Asia/Dhaka (UTC+6)"
+
+# Bangladesh has stayed on a fixed UTC+6 offset since its 2009 DST trial
+# ended, so anything newer skips the pytz transition lookup.
+_DHAKA_FIXED = timezone(timedelta(hours=6))
+_DHAKA_FIXED_SINCE = datetime(2010, 1, 1)
+
+ITER_BATCH_SIZE = 100
+
+
+def to_dhaka(value):
+    """Render a naive UTC datetime from Mongo as an Asia/Dhaka ISO string"""
+    if value is None:
+        return None
+    if value >= _DHAKA_FIXED_SINCE:
+        return value.replace(tzinfo=timezone.utc).astimezone(_DHAKA_FIXED).isoformat()
+    return value.replace(tzinfo=pytz.utc).astimezone(DHAKA_TZ).isoformat()
+
+
+class FieldPlan:
+    """
+    A precompiled serializer: an ordered tuple of (output key, getter) pairs
+    plus the $project stage the getters need. Getters receive the raw
+    document and a dict of referenced users keyed by ObjectId.
+    """
+
+    def __init__(self, *fields, user_refs=()):
+        self.getters = tuple((key, getter) for key, _, getter in fields)
+        self.projection = {}
+        for _, projection, _ in fields:
+            self.projection.update(projection)
+        self.user_refs = user_refs
+
+    def serialize(self, docs, reads=read_routing.PRIMARY):
+        users = load_users(self._referenced_users(docs), reads) if self.user_refs else {}
+        return self._apply(docs, users)
+
+    async def aserialize(self, docs, reads=read_routing.PRIMARY):
+        users = await aload_users(self._referenced_users(docs), reads) if self.user_refs else {}
+        return self._apply(docs, users)
+
+    def _apply(self, docs, users):
+        getters = self.getters
+        return [{key: getter(doc, users) for key, getter in getters} for doc in docs]
+
+    def _referenced_users(self, docs):
+        ids = set()
+        for doc in docs:
+            for ref in self.user_refs:
+                value = doc.get(ref)
+                if isinstance(value, list):
+                    ids.update(value)
+                elif value is not None:
+                    ids.add(value)
+        return ids
+
+
+def value(key, source=None, default=None):
+    source = source or key
+    return key, {source: 1}, lambda doc, users: doc.get(source, default)
+
+
+def listing(key, source=None):
+    source = source or key
+    return key, {source: 1}, lambda doc, users: doc.get(source) or []
+
+
+def timestamp(key, source=None):
+    source = source or key
+    return key, {source: 1}, lambda doc, users: to_dhaka(doc.get(source))
+
+
+def utc_timestamp(key, source=None):
+    """The stored naive UTC datetime in ISO format, without the Dhaka conversion"""
+    source = source or key
+    return key, {source: 1}, lambda doc, users: doc[source].isoformat() if doc.get(source) else None
+
+
+def constant(key, result):
+    return key, {}, lambda doc, users: result
+
+
+def object_id():
+    return 'id', {}, lambda doc, users: str(doc['_id'])
+
+
+def authors():
+    return 'authors', {'authors': 1}, lambda doc, users: [
+        users[author_id] for author_id in doc.get('authors', ()) if author_id in users
+    ]
+
+
+def author_names():
+    return 'authors', {'authors': 1}, lambda doc, users: [
+        users[author_id]['username'] for author_id in doc.get('authors', ()) if author_id in users
+    ]
+
+
+def reviewer():
+    def get(doc, users):
+        reviewer_id = doc.get('reviewed_by')
+        return users[reviewer_id]['username'] if reviewer_id in users else None
+    return 'reviewed_by', {'reviewed_by': 1}, get
+
+
+def list_size(key, source):
+    return (
+        key,
+        {f'{source}_size': {'$size': {'$ifNull': [f'${source}', []]}}},
+        lambda doc, users: doc.get(f'{source}_size', 0)
+    )
+
+
+def vote_stats():
+    upvotes = list_size('upvotes', 'upvotes')
+    downvotes = list_size('downvotes', 'downvotes')
+    return (
+        'stats',
+        {**upvotes[1], **downvotes[1]},
+        lambda doc, users: {"upvotes": upvotes[2](doc, users), "downvotes": downvotes[2](doc, users)}
+    )
+
+
+def excerpt(length):
+    def get(doc, users):
+        text = doc.get('excerpt_text', '')
+        return text[:length] + "..." if doc.get('content_length', 0) > length else text
+    return 'excerpt', {
+        'excerpt_text': {'$substrCP': [{'$ifNull': ['$content', '']}, 0, length]},
+        'content_length': {'$strLenCP': {'$ifNull': ['$content', '']}},
+    }, get
+
+
+def list_status():
+    return 'status', {'is_draft': 1, 'is_published': 1}, lambda doc, users: (
+        "draft" if doc.get('is_draft', True) else "published" if doc.get('is_published') else "deleted"
+    )
+
+
+def publish_status():
+    return 'status', {'is_published': 1}, lambda doc, users: (
+        "published" if doc.get('is_published') else "draft"
+    )
+
+
+def lifecycle_status():
+    return 'status', {'is_deleted': 1, 'is_published': 1}, lambda doc, users: (
+        "deleted" if doc.get('is_deleted') else "published" if doc.get('is_published') else "draft"
+    )
+
+
+LIST_PLAN = FieldPlan(
+    object_id(),
+    value('title', default=''),
+    value('content', default=''),
+    authors(),
+    value('thumbnail_url'),
+    listing('categories'),
+    listing('tags'),
+    timestamp('created_at'),
+    timestamp('updated_at'),
+    list_status(),
+    vote_stats(),
+    value('version', 'current_version', 1),
+    timestamp('published_at'),
+    constant('timezone', TIMEZONE_LABEL),
+    user_refs=('authors',),
+)
+
+# Listing fields plus the flags and sequence a syncing client needs;
+# changed_at is raw and popped by the change feed
+CHANGES_PLAN = FieldPlan(
+    object_id(),
+    value('title', default=''),
+    value('content', default=''),
+    authors(),
+    value('thumbnail_url'),
+    listing('categories'),
+    listing('tags'),
+    timestamp('created_at'),
+    timestamp('updated_at'),
+    list_status(),
+    vote_stats(),
+    value('version', 'current_version', 1),
+    timestamp('published_at'),
+    value('is_draft', default=True),
+    value('is_published', default=False),
+    value('is_deleted', default=False),
+    value('change_seq', default=0),
+    value('changed_at'),
+    constant('timezone', TIMEZONE_LABEL),
+    user_refs=('authors',),
+)
+
+JOB_PLAN = FieldPlan(
+    object_id(),
+    value('title', default=''),
+    value('content', default=''),
+    authors(),
+    value('thumbnail_url'),
+    listing('tags'),
+    timestamp('created_at'),
+    timestamp('updated_at'),
+    constant('timezone', TIMEZONE_LABEL),
+    user_refs=('authors',),
+)
+
+PUBLISHED_PLAN = FieldPlan(
+    object_id(),
+    value('title', default=''),
+    value('excerpt', 'content', ''),
+    value('content', default=''),
+    authors(),
+    value('thumbnail_url'),
+    listing('categories'),
+    listing('tags'),
+    timestamp('published_at'),
+    timestamp('updated_at'),
+    value('is_reviewed', default=False),
+    reviewer(),
+    value('upvote_count', default=0),
+    value('downvote_count', default=0),
+    vote_stats(),
+    user_refs=('authors', 'reviewed_by'),
+)
+
+DETAIL_PLAN = FieldPlan(
+    object_id(),
+    value('title', default=''),
+    value('content', default=''),
+    value('thumbnail_url'),
+    authors(),
+    listing('categories'),
+    listing('tags'),
+    timestamp('created_at'),
+    timestamp('updated_at'),
+    publish_status(),
+    timestamp('published_at'),
+    value('upvotes', 'upvote_count', 0),
+    value('downvotes', 'downvote_count', 0),
+    constant('has_upvoted', False),
+    constant('has_downvoted', False),
+    constant('is_saved', False),
+    value('versions', 'current_version', 1),
+    value('is_draft', default=True),
+    value('is_published', default=False),
+    constant('timezone', TIMEZONE_LABEL),
+    user_refs=('authors',),
+)
+
+SEARCH_PLAN = FieldPlan(
+    object_id(),
+    value('title', default=''),
+    author_names(),
+    excerpt(100),
+    listing('categories'),
+    listing('tags'),
+    value('thumbnail_url'),
+    publish_status(),
+    timestamp('created_at'),
+    constant('timezone', TIMEZONE_LABEL),
+    user_refs=('authors',),
+)
+
+
+# The isolated endpoints keep the shapes they had before the plans: raw
+# UTC timestamps, vote counts from the vote lists, no viewer flags, and
+# trashed blogs reported as deleted
+ISOLATED_PUBLISHED_PLAN = FieldPlan(
+    object_id(),
+    value('title', default=''),
+    excerpt(200),
+    value('content', default=''),
+    authors(),
+    value('thumbnail_url'),
+    listing('categories'),
+    listing('tags'),
+    utc_timestamp('published_at'),
+    vote_stats(),
+    user_refs=('authors',),
+)
+
+# Unlike the other isolated endpoints, the legacy feed always showed Dhaka time
+LEGACY_PUBLISHED_PLAN = FieldPlan(
+    object_id(),
+    value('title', default=''),
+    value('content', default=''),
+    excerpt(200),
+    authors(),
+    value('thumbnail_url'),
+    listing('categories'),
+    listing('tags'),
+    timestamp('published_at'),
+    vote_stats(),
+    user_refs=('authors',),
+)
+
+ISOLATED_DETAIL_PLAN = FieldPlan(
+    object_id(),
+    value('title', default=''),
+    value('content', default=''),
+    value('thumbnail_url'),
+    authors(),
+    listing('categories'),
+    listing('tags'),
+    utc_timestamp('created_at'),
+    utc_timestamp('updated_at'),
+    publish_status(),
+    utc_timestamp('published_at'),
+    list_size('upvotes', 'upvotes'),
+    list_size('downvotes', 'downvotes'),
+    value('versions', 'current_version', 1),
+    value('is_draft', default=True),
+    value('is_published', default=False),
+    user_refs=('authors',),
+)
+
+ISOLATED_LIST_PLAN = FieldPlan(
+    object_id(),
+    value('title', default=''),
+    value('content', default=''),
+    authors(),
+    value('thumbnail_url'),
+    listing('categories'),
+    listing('tags'),
+    timestamp('created_at'),
+    timestamp('updated_at'),
+    lifecycle_status(),
+    vote_stats(),
+    value('version', 'current_version', 1),
+    timestamp('published_at'),
+    constant('timezone', TIMEZONE_LABEL),
+    user_refs=('authors',),
+)
+
+ISOLATED_SEARCH_PLAN = FieldPlan(
+    object_id(),
+    value('title', default=''),
+    author_names(),
+    excerpt(100),
+    listing('categories'),
+    listing('tags'),
+    value('thumbnail_url'),
+    publish_status(),
+    utc_timestamp('created_at'),
+    user_refs=('authors',),
+)
+
+
+def search_match(text, status=None):
+    """
+    Case-insensitive substring match on title, content, tags or categories,
+    as MongoEngine's icontains builds it, optionally narrowed to published
+    blogs or drafts.
+    """
+    pattern = {'$regex': re.escape(text), '$options': 'i'}
+    match = {
+        '$or': [{'title': pattern}, {'content': pattern}, {'tags': pattern}, {'categories': pattern}],
+        'is_deleted': False,
+    }
+    if status == 'published':
+        match.update(is_published=True, is_draft=False)
+    elif status == 'draft':
+        match.update(is_draft=True, is_published=False)
+    return match
+
+
+def load_users(user_ids, reads=read_routing.PRIMARY):
+    """Fetch the public author card for a set of user ids in one query"""
+    if not user_ids:
+        return {}
+    with reads.open(User) as (collection, session):
+        docs = list(collection.find(
+            {'_id': {'$in': list(user_ids)}},
+            {'username': 1, 'avatar_url': 1},
+            session=session
+        ))
+    return {
+        doc['_id']: {"username": doc.get('username'), "avatar": doc.get('avatar_url')}
+        for doc in docs
+    }
+
+
+async def aload_users(user_ids, reads=read_routing.PRIMARY):
+    if not user_ids:
+        return {}
+    docs = await mongo_async.collection(User, reads).find(
+        {'_id': {'$in': list(user_ids)}},
+        {'username': 1, 'avatar_url': 1}
+    )
+    return {
+        doc['_id']: {"username": doc.get('username'), "avatar": doc.get('avatar_url')}
+        for doc in docs
+    }
+
+
+def get_user_id(username):
+    """Resolve a username to its ObjectId without loading the user"""
+    doc = User._get_collection().find_one({'username': username}, {'_id': 1})
+    return doc['_id'] if doc else None
+
+
+async def aget_user_id(username):
+    doc = await mongo_async.collection(User).find_one({'username': username}, {'_id': 1})
+    return doc['_id'] if doc else None
+
+
+def _viewer_flags_pipeline(username, blog_id):
+    return [
+        {'$match': {'username': username}},
+        {'$limit': 1},
+        {'$project': {
+            '_id': 0,
+            'has_upvoted': {'$in': [blog_id, {'$ifNull': ['$upvoted_blogs', []]}]},
+            'has_downvoted': {'$in': [blog_id, {'$ifNull': ['$downvoted_blogs', []]}]},
+            'is_saved': {'$in': [blog_id, {'$ifNull': ['$saved_blogs', []]}]},
+        }},
+    ]
+
+
+def get_viewer_flags(username, blog_id):
+    """Whether a user has voted on or saved a blog, computed by the database"""
+    return next(User._get_collection().aggregate(_viewer_flags_pipeline(username, blog_id)), None)
+
+
+async def aget_viewer_flags(username, blog_id):
+    pipeline = _viewer_flags_pipeline(username, blog_id)
+    docs = await mongo_async.collection(User).aggregate(pipeline)
+    return docs[0] if docs else None
+
+
+class BlogQuery:
+    """
+    A lazily evaluated raw query over the blogs collection that yields
+    serialized dicts. It supports count() and slicing, so it can be handed
+    straight to Django's Paginator, and iterating it walks the cursor in
+    batches so memory stays bounded. ``reads`` says where its queries go.
+    """
+
+    def __init__(self, match, plan, sort=None, reads=read_routing.PRIMARY):
+        self.match = match
+        self.plan = plan
+        self.sort = sort
+        self.reads = reads
+
+    def _pipeline(self, skip=0, limit=None):
+        pipeline = [{'$match': self.match}]
+        if self.sort:
+            pipeline.append({'$sort': dict(self.sort)})
+        if skip:
+            pipeline.append({'$skip': skip})
+        if limit is not None:
+            pipeline.append({'$limit': limit})
+        pipeline.append({'$project': self.plan.projection})
+        return pipeline
+
+    def count(self):
+        with self.reads.open(Blog) as (collection, session):
+            return collection.count_documents(self.match, session=session)
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start = item.start or 0
+            if item.stop is not None and item.stop <= start:
+                return []
+            limit = item.stop - start if item.stop is not None else None
+            return self.fetch(skip=start, limit=limit)
+        results = self.fetch(skip=item, limit=1)
+        if not results:
+            raise IndexError("BlogQuery index out of range")
+        return results[0]
+
+    def fetch(self, skip=0, limit=None):
+        with self.reads.open(Blog) as (collection, session):
+            docs = list(collection.aggregate(self._pipeline(skip, limit), session=session))
+        return self.plan.serialize(docs, self.reads)
+
+    def first(self):
+        results = self.fetch(limit=1)
+        return results[0] if results else None
+
+    async def acount(self):
+        return await mongo_async.collection(Blog, self.reads).count_documents(self.match)
+
+    async def afetch(self, skip=0, limit=None):
+        docs = await mongo_async.collection(Blog, self.reads).aggregate(self._pipeline(skip, limit))
+        return await self.plan.aserialize(docs, self.reads)
+
+    async def afirst(self):
+        results = await self.afetch(limit=1)
+        return results[0] if results else None
+
+    def __iter__(self):
+        with self.reads.open(Blog) as (collection, session):
+            cursor = collection.aggregate(self._pipeline(), batchSize=ITER_BATCH_SIZE, session=session)
+            batch = []
+            for doc in cursor:
+                batch.append(doc)
+                if len(batch) == ITER_BATCH_SIZE:
+                    yield from self.plan.serialize(batch, self.reads)
+                    batch = []
+            if batch:
+                yield from self.plan.serialize(batch, self.reads)
+
+
+def get_blog(blog_id, plan=DETAIL_PLAN, **filters):
+    """Fetch and serialize a single blog by id, or None if it does not match"""
+    return BlogQuery({'_id': ObjectId(blog_id), **filters}, plan).first()
+
+
+async def aget_blog(blog_id, plan=DETAIL_PLAN, **filters):
+    return await BlogQuery({'_id': ObjectId(blog_id), **filters}, plan).afirst()
+
+
+_blog_cache = None
+_blog_loads = SingleFlight()
+_blog_aloads = AsyncSingleFlight()
+
+
+def blog_object_cache():
+    global _blog_cache
+    if _blog_cache is None:
+        _blog_cache = LFUCache(settings.BLOG_OBJECT_CACHE_ENTRIES, settings.BLOG_OBJECT_CACHE_TTL)
+    return _blog_cache
+
+
+def get_cached_blog(blog_id):
+    """
+    Detail payload for a non-deleted blog, or None. Hot blogs are answered
+    from a per-process LFU cache with a short TTL; entries are dropped as
+    soon as a write in this process invalidates the blog's tag, and other
+    processes' writes show up once the TTL lapses. Concurrent misses for
+    the same blog share one load through the response cache.
+    """
+    if settings.BLOG_OBJECT_CACHE_TTL <= 0:
+        return _load_blog(blog_id)
+    tag = response_cache.blog_tag(blog_id)
+    entry = blog_object_cache().get(blog_id)
+    if entry is not MISSING and entry[0] == response_cache.get_cache().local_version(tag):
+        return dict(entry[1])
+    blog = _blog_loads.do(blog_id, lambda: _load_and_remember(blog_id, tag))
+    # Callers add viewer flags, so each gets its own copy
+    return dict(blog) if blog is not None else None
+
+
+def _load_blog(blog_id):
+    return response_cache.cached_payload(
+        f'blog-detail:{blog_id}',
+        [response_cache.blog_tag(blog_id)],
+        lambda: get_blog(blog_id, is_deleted=False)
+    )
+
+
+def _load_and_remember(blog_id, tag):
+    version = response_cache.get_cache().local_version(tag)
+    blog = _load_blog(blog_id)
+    if blog is not None:
+        blog_object_cache().set(blog_id, (version, blog))
+    return blog
+
+
+async def aget_cached_blog(blog_id):
+    """get_cached_blog for async views, sharing the same LFU cache"""
+    if settings.BLOG_OBJECT_CACHE_TTL <= 0:
+        return await _aload_blog(blog_id)
+    tag = response_cache.blog_tag(blog_id)
+    entry = blog_object_cache().get(blog_id)
+    if entry is not MISSING and entry[0] == response_cache.get_cache().local_version(tag):
+        return dict(entry[1])
+    blog = await _blog_aloads.do(blog_id, lambda: _aload_and_remember(blog_id, tag))
+    return dict(blog) if blog is not None else None
+
+
+async def _aload_blog(blog_id):
+    return await response_cache.acached_payload(
+        f'blog-detail:{blog_id}',
+        [response_cache.blog_tag(blog_id)],
+        lambda: aget_blog(blog_id, is_deleted=False)
+    )
+
+
+async def _aload_and_remember(blog_id, tag):
+    version = response_cache.get_cache().local_version(tag)
+    blog = await _aload_blog(blog_id)
+    if blog is not None:
+        blog_object_cache().set(blog_id, (version, blog))
+    return blog
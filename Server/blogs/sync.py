@@ -0,0 +1,150 @@
+"""
+Delta sync for client caches.
+
+Blogs, comments and author requests are stamped with a global sequence
+number on every save (see ChangeTracked) and leave a Tombstone when they
+are hard deleted. A client bootstraps by asking for a token, fetches its
+lists as usual, and from then on asks for everything changed after the
+token it last received.
+
+Sequence numbers are reserved shortly before the write lands (a process
+holds a block of them for at most CHANGE_SEQ_BLOCK_SECONDS), so a write can
+become visible after one with a higher number has already been read. The
+returned token therefore never moves past changes younger than
+CHANGES_SETTLE_SECONDS; those are sent again on the next call, and clients
+apply items idempotently by id.
+"""
+from datetime import datetime, timedelta
+from django.conf import settings
+from collab.models import AuthorRequest
+from comments.models import Comment
+from comments.readers import COMMENT_CHANGES_PLAN
+from .models import Blog, Tombstone
+from . import readers
+
+
+class Feed:
+    """How one collection is read and serialized for the change feed"""
+
+    def __init__(self, document, fetch):
+        self.document = document
+        self.fetch = fetch
+
+    @property
+    def collection_name(self):
+        return self.document._get_collection_name()
+
+
+def fetch_blogs(since, scope, limit):
+    match = {'change_seq': {'$gt': since}}
+    docs = readers.BlogQuery(match, readers.CHANGES_PLAN, sort=[('change_seq', 1)]).fetch(limit=limit)
+    return [(doc['change_seq'], doc.pop('changed_at'), doc) for doc in docs]
+
+
+def fetch_comments(since, scope, limit):
+    match = {'change_seq': {'$gt': since}}
+    if scope is not None:
+        match['blog'] = scope
+    rows = Comment._get_collection().aggregate([
+        {'$match': match},
+        {'$sort': {'change_seq': 1}},
+        {'$limit': limit},
+        {'$project': COMMENT_CHANGES_PLAN.projection},
+    ])
+    docs = COMMENT_CHANGES_PLAN.serialize(list(rows))
+    return [(doc['change_seq'], doc.pop('changed_at'), doc) for doc in docs]
+
+
+def fetch_requests(since, scope, limit):
+    query = AuthorRequest.objects(change_seq__gt=since)
+    if scope is not None:
+        query = query.filter(requested_author=scope)
+    return [
+        (req.change_seq, req.changed_at, {**req.to_json(), 'status': req.status, 'change_seq': req.change_seq})
+        for req in query.order_by('change_seq').limit(limit)
+    ]
+
+
+FEEDS = {
+    'blogs': Feed(Blog, fetch_blogs),
+    'comments': Feed(Comment, fetch_comments),
+    'requests': Feed(AuthorRequest, fetch_requests),
+}
+
+
+def fetch_tombstones(feed, since, scope, limit):
+    match = {'collection_name': feed.collection_name, 'change_seq': {'$gt': since}}
+    if scope is not None:
+        match['scope'] = scope
+    cursor = Tombstone._get_collection().find(
+        match, {'doc_id': 1, 'change_seq': 1, 'changed_at': 1}
+    ).sort('change_seq', 1).limit(limit)
+    return [(doc['change_seq'], doc['changed_at'], str(doc['doc_id'])) for doc in cursor]
+
+
+def merge_page(since, items, tombstones, limit, settled_before):
+    """
+    Merge (seq, changed_at, payload) entries from the live collection and
+    the tombstones into one page ordered by sequence. The token advances to
+    the last entry that is older than ``settled_before`` and not preceded
+    by a younger one.
+    """
+    entries = sorted(
+        [(seq, changed_at, False, payload) for seq, changed_at, payload in items] +
+        [(seq, changed_at, True, payload) for seq, changed_at, payload in tombstones],
+        key=lambda entry: entry[0]
+    )
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    token = since
+    for seq, changed_at, _, _ in entries:
+        if changed_at is None or changed_at > settled_before:
+            break
+        token = seq
+
+    return {
+        "items": [payload for _, _, deleted, payload in entries if not deleted],
+        "deleted": [payload for _, _, deleted, payload in entries if deleted],
+        "next": token,
+        "has_more": has_more,
+    }
+
+
+def get_changes(feed, since, scope=None):
+    limit = settings.CHANGES_PAGE_SIZE
+    settled_before = datetime.utcnow() - timedelta(seconds=settings.CHANGES_SETTLE_SECONDS)
+    # One extra row from each side tells whether another page follows
+    items = feed.fetch(since, scope, limit + 1)
+    tombstones = fetch_tombstones(feed, since, scope, limit + 1)
+    return merge_page(since, items, tombstones, limit, settled_before)
+
+
+def current_token(feed, scope=None):
+    """
+    Token for a client about to download a full list: the newest settled
+    change, held back below anything still settling so the first sync
+    picks it up.
+    """
+    settled_before = datetime.utcnow() - timedelta(seconds=settings.CHANGES_SETTLE_SECONDS)
+    live_match = {'change_seq': {'$gt': 0}}
+    tombstone_match = {'collection_name': feed.collection_name, 'change_seq': {'$gt': 0}}
+    if scope is not None:
+        live_match[feed.document.change_scope_field] = scope
+        tombstone_match['scope'] = scope
+
+    settled, unsettled = 0, None
+    for collection, match in (
+        (feed.document._get_collection(), live_match),
+        (Tombstone._get_collection(), tombstone_match),
+    ):
+        # Newest first; only the unsettled tail is walked
+        cursor = collection.find(match, {'change_seq': 1, 'changed_at': 1}).sort('change_seq', -1)
+        for doc in cursor:
+            if doc.get('changed_at') and doc['changed_at'] <= settled_before:
+                settled = max(settled, doc['change_seq'])
+                break
+            unsettled = doc['change_seq'] if unsettled is None else min(unsettled, doc['change_seq'])
+    if unsettled is not None:
+        return min(settled, unsettled - 1)
+    return settled
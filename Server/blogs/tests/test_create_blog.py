@@ -0,0 +1,58 @@
+from unittest import mock
+import pytest
+from bson import ObjectId
+from rest_framework.test import APIRequestFactory
+from blogs import views
+from blogs.models import Blog
+from techsage import edge_cache, response_cache
+from users.models import User
+
+
+@pytest.fixture(autouse=True)
+def local_caches(settings, monkeypatch):
+    settings.RESPONSE_CACHE_TIMEOUT = 60
+    settings.RESPONSE_CACHE_REDIS_URL = ''
+    settings.EDGE_PURGE_BACKEND = 'techsage.edge_cache.LoggingPurgeBackend'
+    monkeypatch.setattr(response_cache, '_cache', None)
+    monkeypatch.setattr(edge_cache, '_backend', None)
+
+
+@pytest.fixture
+def saved_blogs(monkeypatch):
+    def save(blog, *args, **kwargs):
+        blog.id = blog.id or ObjectId()
+        return blog
+    monkeypatch.setattr(Blog, 'save', save)
+    author = User(username='alice')
+    users = mock.Mock(DoesNotExist=User.DoesNotExist)
+    users.objects.get.return_value = author
+    monkeypatch.setattr(views, 'User', users)
+    monkeypatch.setattr(views.trending, 'record', mock.Mock())
+
+
+def create_blog():
+    request = APIRequestFactory().post('/blogs/create/', {
+        'username': 'alice', 'title': 'Hello', 'content': 'World', 'categories[]': ['tech'], 'is_draft': 'false'
+    })
+    return views.CreateBlog.as_view()(request)
+
+
+def test_publishing_through_create_refreshes_cached_feeds(saved_blogs):
+    builds = []
+    feed = lambda: builds.append(1) or {'blogs': len(builds)}
+    response_cache.cached_payload('feed', [response_cache.category_tag('tech')], feed)
+
+    assert create_blog().status_code == 201
+    assert response_cache.cached_payload('feed', [response_cache.category_tag('tech')], feed) == {'blogs': 2}
+
+
+def test_publishing_through_create_purges_the_edge(saved_blogs):
+    response = create_blog()
+    assert list(edge_cache.get_backend().purged) == [
+        sorted([f"blog:{response.data['id']}", 'blogs', 'author:alice', 'category:tech'])
+    ]
+
+
+def test_publishing_through_create_scores_the_blog(saved_blogs):
+    response = create_blog()
+    views.trending.record.assert_called_once_with(ObjectId(response.data['id']), 'publish')
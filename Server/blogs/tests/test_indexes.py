@@ -0,0 +1,143 @@
+"""
+Explain-plan checks for the hot query shapes. They need a real mongod
+(EXPLAIN_MONGO_URI, default localhost) and are skipped without one. Each
+shape must be answered from an index: no COLLSCAN and no in-memory SORT.
+"""
+import os
+from datetime import datetime, timedelta
+import pytest
+from bson import ObjectId
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+from blogs.models import Blog, Vote
+from comments.models import Comment
+
+EXPLAIN_MONGO_URI = os.getenv('EXPLAIN_MONGO_URI', 'mongodb://localhost:27017')
+EXPLAIN_DB_NAME = 'techsage_explain_test'
+
+AUTHOR = ObjectId()
+BLOG = ObjectId()
+USER = ObjectId()
+
+# (document, filter, sort) as issued by ListBlogs, JobBlogs, PublishedBlogs,
+# TrendingBlogs, the change feed, the comment views and vote lookups
+HOT_QUERIES = {
+    'list_blogs': (Blog, {'is_deleted': False}, [('created_at', -1)]),
+    'list_blogs_trash': (Blog, {'is_deleted': True}, [('created_at', -1)]),
+    'list_blogs_drafts': (Blog, {'is_draft': True, 'is_published': False, 'is_deleted': False}, [('created_at', -1)]),
+    'list_blogs_author': (Blog, {'is_deleted': False, 'authors': AUTHOR}, [('created_at', -1)]),
+    'list_blogs_category': (Blog, {'is_deleted': False, 'categories': 'tech'}, [('created_at', -1)]),
+    'job_blogs': (Blog, {'categories': 'job', 'is_published': True, 'is_deleted': False}, [('created_at', -1)]),
+    'published_blogs': (Blog, {'is_published': True, 'is_draft': False, 'is_deleted': False}, [('published_at', -1)]),
+    'published_blogs_category': (
+        Blog, {'is_published': True, 'is_draft': False, 'is_deleted': False, 'categories': 'tech'}, [('published_at', -1)]
+    ),
+    'published_blogs_author': (
+        Blog, {'is_published': True, 'is_draft': False, 'is_deleted': False, 'authors': {'$in': [AUTHOR]}},
+        [('published_at', -1)]
+    ),
+    'trending_blogs': (Blog, {'is_published': True, 'is_draft': False, 'is_deleted': False}, [('trending_score', -1)]),
+    'trending_blogs_category': (
+        Blog, {'is_published': True, 'is_draft': False, 'is_deleted': False, 'categories': 'tech'}, [('trending_score', -1)]
+    ),
+    'blog_changes': (Blog, {'change_seq': {'$gt': 10}}, [('change_seq', 1)]),
+    'blog_comments': (Comment, {'blog': BLOG, 'is_deleted': False}, [('created_at', -1)]),
+    'all_comments': (Comment, {'is_deleted': False}, [('created_at', -1)]),
+    'all_comments_reviewed': (Comment, {'is_deleted': False, 'is_reviewed': False}, [('created_at', -1)]),
+    'user_comment_count': (Comment, {'author': USER, 'is_deleted': False}, None),
+    'user_votes': (Vote, {'user': USER}, [('created_at', -1)]),
+    'blog_vote': (Vote, {'blog': BLOG, 'user': USER}, None),
+}
+
+
+def create_indexes(db, document):
+    collection = db[document._get_collection_name()]
+    for spec in document._meta['index_specs']:
+        options = {key: value for key, value in spec.items() if key != 'fields'}
+        collection.create_index(spec['fields'], **options)
+    return collection
+
+
+def seed(db):
+    now = datetime.utcnow()
+    authors = [AUTHOR] + [ObjectId() for _ in range(9)]
+    blogs = [BLOG] + [ObjectId() for _ in range(499)]
+    db[Blog._get_collection_name()].insert_many([
+        {
+            '_id': blog_id,
+            'title': f'Blog {i}',
+            'content': 'x',
+            'authors': [authors[i % len(authors)]],
+            'categories': [['tech', 'job', 'science'][i % 3]],
+            'tags': [f'tag{i % 20}'],
+            'is_draft': i % 4 == 0,
+            'is_published': i % 4 != 0,
+            'is_deleted': i % 25 == 0,
+            'is_reviewed': i % 2 == 0,
+            'created_at': now - timedelta(hours=i),
+            'published_at': now - timedelta(hours=i),
+            'change_seq': i + 1,
+            'trending_score': float(i % 37),
+        }
+        for i, blog_id in enumerate(blogs)
+    ])
+    users = [USER] + [ObjectId() for _ in range(49)]
+    db[Comment._get_collection_name()].insert_many([
+        {
+            'blog': blogs[i % 50],
+            'author': users[i % len(users)],
+            'content': 'x',
+            'is_deleted': i % 10 == 0,
+            'is_reviewed': i % 3 == 0,
+            'created_at': now - timedelta(minutes=i),
+            'change_seq': 1000 + i,
+        }
+        for i in range(2000)
+    ])
+    db[Vote._get_collection_name()].insert_many([
+        {'blog': blogs[i % len(blogs)], 'user': users[i // len(blogs)], 'vote_type': 'upvote', 'created_at': now}
+        for i in range(1000)
+    ])
+
+
+@pytest.fixture(scope='module')
+def db():
+    client = MongoClient(EXPLAIN_MONGO_URI, serverSelectionTimeoutMS=500)
+    try:
+        client.admin.command('ping')
+    except PyMongoError:
+        pytest.skip('explain-plan tests need a local mongod')
+    client.drop_database(EXPLAIN_DB_NAME)
+    database = client[EXPLAIN_DB_NAME]
+    for document in (Blog, Comment, Vote):
+        create_indexes(database, document)
+    seed(database)
+    yield database
+    client.drop_database(EXPLAIN_DB_NAME)
+    client.close()
+
+
+def plan_stages(plan):
+    """Every stage name in an explain plan tree (classic or SBE layout)"""
+    stages = []
+    if isinstance(plan, dict):
+        if 'stage' in plan:
+            stages.append(plan['stage'])
+        for value in plan.values():
+            stages.extend(plan_stages(value))
+    elif isinstance(plan, list):
+        for value in plan:
+            stages.extend(plan_stages(value))
+    return stages
+
+
+@pytest.mark.parametrize('name', sorted(HOT_QUERIES))
+def test_hot_query_uses_index(db, name):
+    document, query, sort = HOT_QUERIES[name]
+    cursor = db[document._get_collection_name()].find(query)
+    if sort:
+        cursor = cursor.sort(sort)
+    winning_plan = cursor.explain()['queryPlanner']['winningPlan']
+    stages = plan_stages(winning_plan)
+    assert 'COLLSCAN' not in stages, f"{name} scans the collection: {winning_plan}"
+    assert 'SORT' not in stages, f"{name} sorts in memory: {winning_plan}"
@@ -0,0 +1,149 @@
+import json
+from datetime import datetime
+from bson import ObjectId
+from rest_framework.test import APIRequestFactory
+from blogs import isolated_views, readers
+
+ALICE = ObjectId('65f000000000000000000001')
+BLOG_ID = ObjectId('65f0000000000000000000b1')
+TRASHED_ID = ObjectId('65f0000000000000000000b2')
+
+BLOG = {
+    '_id': BLOG_ID, 'title': 'Hiring', 'content': 'x' * 250, 'authors': [ALICE, ObjectId()],
+    'thumbnail_url': 'thumb.png', 'categories': ['job'], 'tags': ['python'],
+    'created_at': datetime(2024, 1, 1, 18, 30), 'updated_at': datetime(2024, 1, 2, 9, 0),
+    'published_at': datetime(2024, 1, 1, 20, 0), 'upvotes': [ObjectId(), ObjectId()], 'downvotes': [],
+    # The counters lag the vote lists; the isolated endpoints always counted the lists
+    'upvote_count': 7, 'downvote_count': 1, 'current_version': 3,
+    'is_draft': False, 'is_published': True, 'is_deleted': False,
+}
+TRASHED = {
+    '_id': TRASHED_ID, 'title': 'Old', 'content': 'gone', 'authors': [ALICE],
+    'created_at': datetime(2024, 1, 1), 'is_draft': True, 'is_published': False, 'is_deleted': True,
+}
+USERS = {ALICE: {"username": "alice", "avatar": "alice.png"}}
+AUTHOR_CARDS = [{"username": "alice", "avatar": "alice.png"}]
+
+
+def project(doc, projection):
+    """Evaluate the plan's $project stage the way the server would"""
+    result = {'_id': doc['_id']}
+    for key, spec in projection.items():
+        if spec == 1:
+            if key in doc:
+                result[key] = doc[key]
+        elif '$size' in spec:
+            result[key] = len(doc.get(key[:-len('_size')]) or [])
+        elif '$substrCP' in spec:
+            result[key] = doc.get('content', '')[:spec['$substrCP'][2]]
+        elif '$strLenCP' in spec:
+            result[key] = len(doc.get('content', ''))
+    return result
+
+
+def serve(monkeypatch, *docs):
+    def fetch(self, skip=0, limit=None):
+        stop = skip + limit if limit is not None else None
+        projected = [project(doc, self.plan.projection) for doc in docs[skip:stop]]
+        return self.plan._apply(projected, USERS)
+
+    monkeypatch.setattr(readers.BlogQuery, 'fetch', fetch)
+    monkeypatch.setattr(readers.BlogQuery, 'count', lambda self: len(docs))
+
+
+def call(view, path='/', **kwargs):
+    response = view.as_view()(APIRequestFactory().get(path), **kwargs)
+    assert response.status_code == 200
+    return response.data
+
+
+def assert_snapshot(data, expected):
+    # Compared as JSON so the key order is part of the snapshot
+    assert json.dumps(data) == json.dumps(expected)
+
+
+def test_published_blogs_snapshot(monkeypatch):
+    serve(monkeypatch, BLOG)
+    assert_snapshot(call(isolated_views.IsolatedPublishedBlogs), {
+        "success": True,
+        "blogs": [{
+            "id": str(BLOG_ID), "title": "Hiring", "excerpt": "x" * 200 + "...", "content": "x" * 250,
+            "authors": AUTHOR_CARDS, "thumbnail_url": "thumb.png", "categories": ["job"], "tags": ["python"],
+            "published_at": "2024-01-01T20:00:00", "stats": {"upvotes": 2, "downvotes": 0},
+        }],
+        "total": 1,
+    })
+
+
+def test_get_blog_snapshot(monkeypatch):
+    serve(monkeypatch, BLOG)
+    assert_snapshot(call(isolated_views.IsolatedGetBlog, blog_id=str(BLOG_ID)), {
+        "id": str(BLOG_ID), "title": "Hiring", "content": "x" * 250, "thumbnail_url": "thumb.png",
+        "authors": AUTHOR_CARDS, "categories": ["job"], "tags": ["python"],
+        "created_at": "2024-01-01T18:30:00", "updated_at": "2024-01-02T09:00:00", "status": "published",
+        "published_at": "2024-01-01T20:00:00", "upvotes": 2, "downvotes": 0, "versions": 3,
+        "is_draft": False, "is_published": True,
+    })
+
+
+def test_job_blogs_snapshot(monkeypatch):
+    serve(monkeypatch, BLOG)
+    assert_snapshot(call(isolated_views.IsolatedJobBlogs), {
+        "success": True,
+        "count": 1,
+        "results": [{
+            "id": str(BLOG_ID), "title": "Hiring", "content": "x" * 250, "authors": AUTHOR_CARDS,
+            "thumbnail_url": "thumb.png", "tags": ["python"],
+            "created_at": "2024-01-02T00:30:00+06:00", "updated_at": "2024-01-02T15:00:00+06:00",
+            "timezone": "Asia/Dhaka (UTC+6)",
+        }],
+    })
+
+
+def test_list_blogs_snapshot(monkeypatch):
+    serve(monkeypatch, BLOG, TRASHED)
+    assert_snapshot(call(isolated_views.IsolatedListBlogs), {
+        "success": True,
+        "count": 2,
+        "results": [{
+            "id": str(BLOG_ID), "title": "Hiring", "content": "x" * 250, "authors": AUTHOR_CARDS,
+            "thumbnail_url": "thumb.png", "categories": ["job"], "tags": ["python"],
+            "created_at": "2024-01-02T00:30:00+06:00", "updated_at": "2024-01-02T15:00:00+06:00",
+            "status": "published", "stats": {"upvotes": 2, "downvotes": 0}, "version": 3,
+            "published_at": "2024-01-02T02:00:00+06:00", "timezone": "Asia/Dhaka (UTC+6)",
+        }, {
+            "id": str(TRASHED_ID), "title": "Old", "content": "gone", "authors": AUTHOR_CARDS,
+            "thumbnail_url": None, "categories": [], "tags": [],
+            "created_at": "2024-01-01T06:00:00+06:00", "updated_at": None,
+            "status": "deleted", "stats": {"upvotes": 0, "downvotes": 0}, "version": 1,
+            "published_at": None, "timezone": "Asia/Dhaka (UTC+6)",
+        }],
+    })
+
+
+def test_search_snapshot(monkeypatch):
+    serve(monkeypatch, BLOG)
+    assert_snapshot(call(isolated_views.IsolatedBlogSearch, '/?q=hiring'), {
+        "success": True,
+        "results": [{
+            "id": str(BLOG_ID), "title": "Hiring", "authors": ["alice"], "excerpt": "x" * 100 + "...",
+            "categories": ["job"], "tags": ["python"], "thumbnail_url": "thumb.png", "status": "published",
+            "created_at": "2024-01-01T18:30:00",
+        }],
+        "count": 1,
+    })
+
+
+def test_legacy_published_blogs_snapshot(monkeypatch):
+    serve(monkeypatch, BLOG)
+    assert_snapshot(call(isolated_views.IsolatedPublishedBlogsLegacy), {
+        "success": True,
+        "blogs": [{
+            "id": str(BLOG_ID), "title": "Hiring", "content": "x" * 250, "excerpt": "x" * 200 + "...",
+            "authors": AUTHOR_CARDS, "thumbnail_url": "thumb.png", "categories": ["job"], "tags": ["python"],
+            "published_at": "2024-01-02T02:00:00+06:00", "stats": {"upvotes": 2, "downvotes": 0},
+        }],
+        "total": 1,
+        "page": 1,
+        "has_more": False,
+    })
@@ -0,0 +1,67 @@
+from datetime import datetime
+import pytz
+from bson import ObjectId
+from blogs.readers import (
+    ISOLATED_PUBLISHED_PLAN, FieldPlan, authors, constant, excerpt, object_id, search_match, timestamp, to_dhaka,
+    value
+)
+
+
+def test_to_dhaka_matches_pytz():
+    for moment in (datetime(2024, 3, 1, 18, 30), datetime(2009, 7, 1, 12, 0), datetime(2000, 1, 1)):
+        expected = moment.replace(tzinfo=pytz.utc).astimezone(pytz.timezone('Asia/Dhaka')).isoformat()
+        assert to_dhaka(moment) == expected
+
+
+def test_to_dhaka_none():
+    assert to_dhaka(None) is None
+
+
+def test_plan_merges_projections():
+    plan = FieldPlan(object_id(), value('title'), excerpt(10), constant('timezone', 'x'))
+    assert set(plan.projection) == {'title', 'excerpt_text', 'content_length'}
+
+
+def test_plan_serializes_raw_documents():
+    author_id = ObjectId()
+    plan = FieldPlan(object_id(), value('title', default=''), authors(), timestamp('created_at'))
+    doc = {'_id': ObjectId(), 'authors': [author_id, ObjectId()], 'created_at': datetime(2024, 1, 1)}
+    users = {author_id: {"username": "alice", "avatar": None}}
+    [result] = [{key: getter(doc, users) for key, getter in plan.getters}]
+    assert result == {
+        'id': str(doc['_id']),
+        'title': '',
+        'authors': [{"username": "alice", "avatar": None}],
+        'created_at': '2024-01-01T06:00:00+06:00',
+    }
+
+
+def test_excerpt_truncates_long_content():
+    _, _, get = excerpt(5)
+    assert get({'excerpt_text': 'hello', 'content_length': 11}, {}) == 'hello...'
+    assert get({'excerpt_text': 'hi', 'content_length': 2}, {}) == 'hi'
+
+
+def test_isolated_plan_keeps_the_original_shape():
+    doc = {
+        '_id': ObjectId(), 'title': 't', 'content': 'x' * 250, 'excerpt_text': 'x' * 200, 'content_length': 250,
+        'published_at': datetime(2024, 1, 1), 'upvotes_size': 1, 'downvotes_size': 0,
+    }
+    [result] = ISOLATED_PUBLISHED_PLAN._apply([doc], {})
+    assert result['excerpt'] == 'x' * 200 + '...'
+    assert result['content'] == 'x' * 250
+    assert result['published_at'] == '2024-01-01T00:00:00'
+    assert list(result) == [
+        'id', 'title', 'excerpt', 'content', 'authors', 'thumbnail_url', 'categories', 'tags', 'published_at', 'stats'
+    ]
+
+
+def test_search_match_escapes_the_query():
+    match = search_match('c++ (intro)', status='published')
+    pattern = {'$regex': r'c\+\+\ \(intro\)', '$options': 'i'}
+    assert match == {
+        '$or': [{'title': pattern}, {'content': pattern}, {'tags': pattern}, {'categories': pattern}],
+        'is_deleted': False,
+        'is_published': True,
+        'is_draft': False,
+    }
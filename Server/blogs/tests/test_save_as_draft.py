@@ -0,0 +1,27 @@
+from unittest import mock
+from bson import ObjectId
+from rest_framework.test import APIRequestFactory
+from blogs import views
+from blogs.models import Blog
+from users.models import User
+
+
+def test_unpublishing_flushes_the_previous_listings(monkeypatch):
+    author = User(id=ObjectId(), username='alice')
+    blog = Blog(id=ObjectId(), title='t', content='c', authors=[author], categories=['old'],
+                is_draft=False, is_published=True)
+    monkeypatch.setattr(Blog, 'save', lambda self, *args, **kwargs: self)
+    monkeypatch.setattr(views, 'Blog', mock.Mock(**{'objects.get.return_value': blog}))
+    monkeypatch.setattr(views, 'User', mock.Mock(**{'objects.return_value.first.return_value': author}))
+    invalidate = mock.Mock()
+    monkeypatch.setattr(views.response_cache, 'invalidate', invalidate)
+
+    request = APIRequestFactory().post(
+        f'/blogs/draft/{blog.id}/', {'username': 'alice', 'categories[]': ['new']}
+    )
+    response = views.SaveAsDraft.as_view()(request, blog_id=str(blog.id))
+
+    assert response.status_code == 200
+    [tags] = [call.args for call in invalidate.call_args_list]
+    # The blog was listed under its old category until this save
+    assert {'blogs', 'author:alice', 'category:old', f'blog:{blog.id}'} <= set(tags)
@@ -0,0 +1,51 @@
+from datetime import datetime
+from unittest import mock
+from blogs import models
+from blogs.sync import merge_page
+
+OLD = datetime(2024, 1, 1)
+NEW = datetime(2024, 1, 2)
+CUTOFF = datetime(2024, 1, 1, 12)
+
+
+def test_merge_orders_items_and_tombstones():
+    page = merge_page(0, [(1, OLD, 'a'), (3, OLD, 'c')], [(2, OLD, 'b')], 10, CUTOFF)
+    assert page == {"items": ['a', 'c'], "deleted": ['b'], "next": 3, "has_more": False}
+
+
+def test_token_stops_before_unsettled_change():
+    page = merge_page(5, [(6, OLD, 'a'), (7, NEW, 'b'), (8, OLD, 'c')], [], 10, CUTOFF)
+    assert page["items"] == ['a', 'b', 'c']
+    assert page["next"] == 6
+
+
+def test_token_kept_when_nothing_settled():
+    assert merge_page(5, [(6, NEW, 'a')], [], 10, CUTOFF)["next"] == 5
+
+
+def test_page_limit_sets_has_more():
+    page = merge_page(0, [(1, OLD, 'a'), (4, OLD, 'd')], [(2, OLD, 'b'), (3, OLD, 'c')], 3, CUTOFF)
+    assert page["items"] == ['a']
+    assert page["deleted"] == ['b', 'c']
+    assert page["next"] == 3
+    assert page["has_more"]
+
+
+def test_change_seqs_come_from_short_lived_blocks(settings, monkeypatch):
+    settings.CHANGE_SEQ_BLOCK_SIZE = 3
+    settings.CHANGE_SEQ_BLOCK_SECONDS = 1
+    counter = iter([3, 6, 20, 9])
+    reserve = mock.Mock(side_effect=lambda count: next(counter))
+    monkeypatch.setattr(models, '_reserve_change_seqs', reserve)
+    monkeypatch.setattr(models, '_change_seq_block', models._ChangeSeqBlock())
+    clock = [100.0]
+    monkeypatch.setattr(models.time, 'monotonic', lambda: clock[0])
+
+    assert [models.next_change_seq() for _ in range(4)] == [1, 2, 3, 4]
+    # Batches reserve their own range
+    assert models.next_change_seq(5) == 20
+    assert models.next_change_seq() == 5
+    # Unused numbers are dropped once the block is too old to settle in time
+    clock[0] += 1
+    assert models.next_change_seq() == 7
+    assert reserve.call_args_list == [mock.call(3), mock.call(3), mock.call(5), mock.call(3)]
@@ -0,0 +1,50 @@
+import math
+from unittest import mock
+import pytest
+from blogs import trending
+
+
+@pytest.fixture(autouse=True)
+def trending_settings(settings):
+    settings.TRENDING_HALF_LIFE_HOURS = 12.0
+    settings.TRENDING_REBASE_HOURS = 24
+    settings.TRENDING_VIEW_FLUSH_SECONDS = 10
+
+
+def test_increments_decay_with_the_half_life():
+    epoch = trending.current_epoch(1_700_000_000)
+    early = trending.increment(1.0, epoch + 3600)
+    late = trending.increment(1.0, epoch + 13 * 3600)
+    # An event 12 hours later is worth twice as much, i.e. the earlier one has halved
+    assert late / early == pytest.approx(2.0)
+    assert trending.increment(-1.0, epoch) == -1.0
+
+
+def test_epoch_is_the_start_of_the_rebase_period():
+    period = 24 * 3600
+    assert trending.current_epoch(5 * period) == 5 * period
+    assert trending.current_epoch(6 * period - 1) == 5 * period
+
+
+def test_rescaling_carries_the_score_to_the_new_epoch():
+    stage = trending.rescaled_score(86400, 2.5)[0]['$set']
+    assert stage['trending_epoch'] == 86400
+    decayed, amount = stage['trending_score']['$add']
+    assert amount == 2.5
+    assert '$exp' in decayed['$multiply'][1]
+    # exp((old - new) / tau) over one rebase period is 2 ** -(24 / 12)
+    factor = math.exp((0 - 86400) / trending.tau())
+    assert factor == pytest.approx(0.25)
+
+
+def test_view_buffer_flushes_counts_in_one_batch():
+    buffer = trending.ViewBuffer()
+    with mock.patch.object(trending, 'record_many') as record_many, \
+            mock.patch.object(trending.mongo_async, 'get_executor') as get_executor:
+        buffer.add('a')
+        buffer.add('a')
+        buffer.add('b')
+        get_executor.assert_not_called()
+        assert buffer.flush() == 3
+    record_many.assert_called_once_with({'a': 2, 'b': 1}, 'view', 'blog.view')
+    assert not buffer._counts
@@ -0,0 +1,196 @@
+import pytest
+from datetime import datetime, timedelta
+from blogs.versioning import (
+    diff_text, estimate_edit_distance, select_versions_to_keep, should_cut_version, summarize_change
+)
+
+
+def _meta(**overrides):
+    meta = {
+        'title': 'Intro',
+        'categories': ['python'],
+        'tags': ['django'],
+        'thumbnail_url': None,
+        'is_draft': True,
+        'size': 100,
+    }
+    meta.update(overrides)
+    return meta
+
+
+def test_summary_first_version():
+    assert summarize_change(None, _meta()) == "Initial version"
+
+
+def test_summary_no_changes():
+    assert summarize_change(_meta(), _meta()) == "No changes"
+
+
+def test_summary_lists_changed_fields():
+    summary = summarize_change(_meta(), _meta(title='Intro v2', tags=[], size=80))
+    assert summary == "title, tags, content -20 chars"
+
+
+def test_summary_status_change():
+    assert summarize_change(_meta(), _meta(is_draft=False)) == "status"
+
+
+@pytest.mark.parametrize("mode", ["line", "word"])
+def test_diff_identical(mode):
+    diff = diff_text("same\ntext", "same\ntext", mode)
+    assert diff['added'] == 0
+    assert diff['removed'] == 0
+    assert all(chunk['op'] == 'equal' for chunk in diff['chunks'])
+
+
+def test_line_diff():
+    diff = diff_text("a\nb\nc\n", "a\nB\nc\nd\n", "line")
+    assert diff['removed'] == 1
+    assert diff['added'] == 2
+    assert {'op': 'delete', 'text': 'b\n'} in diff['chunks']
+    assert {'op': 'insert', 'text': 'B\n'} in diff['chunks']
+
+
+def test_word_diff_reconstructs_both_sides():
+    old = "<p>Hello world, again</p>"
+    new = "<p>Hello brave world</p>"
+    diff = diff_text(old, new, "word")
+    rebuilt_old = ''.join(c['text'] for c in diff['chunks'] if c['op'] != 'insert')
+    rebuilt_new = ''.join(c['text'] for c in diff['chunks'] if c['op'] != 'delete')
+    assert rebuilt_old == old
+    assert rebuilt_new == new
+
+
+def test_diff_handles_missing_text():
+    diff = diff_text(None, "new", "word")
+    assert diff['chunks'] == [{'op': 'insert', 'text': 'new'}]
+
+
+def test_edit_distance():
+    assert estimate_edit_distance("abc", "abc") == 0
+    assert estimate_edit_distance("", "hello") == 5
+    assert estimate_edit_distance("hello", "help") == 2
+    assert estimate_edit_distance(None, "x") == 1
+
+
+def _version(**overrides):
+    version = {
+        'title': 'Intro',
+        'content': 'x' * 50,
+        'categories': ['python'],
+        'tags': [],
+        'thumbnail_url': None,
+        'updated_at': datetime(2024, 1, 1, 12, 0),
+    }
+    version.update(overrides)
+    return version
+
+
+NOW = datetime(2024, 1, 1, 12, 1)
+
+
+@pytest.fixture(autouse=True)
+def autosave_thresholds(settings):
+    settings.AUTOSAVE_VERSION_INTERVAL_SECONDS = 600
+    settings.AUTOSAVE_VERSION_MIN_CHARS = 20
+
+
+def test_first_version_is_cut():
+    assert should_cut_version(None, _version(), NOW)
+
+
+def test_unchanged_draft_is_not_cut():
+    assert not should_cut_version(_version(), _version(), NOW + timedelta(hours=1))
+
+
+def test_small_recent_edit_is_coalesced():
+    assert not should_cut_version(_version(), _version(content='x' * 55), NOW)
+
+
+def test_large_edit_is_cut():
+    assert should_cut_version(_version(), _version(content='x' * 80), NOW)
+
+
+def test_small_edit_after_interval_is_cut():
+    assert should_cut_version(_version(), _version(content='x' * 55), NOW + timedelta(minutes=10))
+
+
+def test_metadata_change_is_debounced():
+    draft = _version(tags=['django'])
+    assert not should_cut_version(_version(), draft, NOW)
+    assert should_cut_version(_version(), draft, NOW + timedelta(minutes=10))
+
+
+@pytest.fixture
+def retention(settings):
+    settings.VERSION_RETENTION_KEEP_ALL_HOURS = 24
+    settings.VERSION_RETENTION_HOURLY_DAYS = 30
+
+
+def _aged(now, is_draft=True, **age):
+    return {'updated_at': now - timedelta(**age), 'is_draft': is_draft}
+
+
+def test_retention_keeps_recent_versions(retention):
+    versions = [_aged(NOW, minutes=m) for m in (50, 40, 30)]
+    assert select_versions_to_keep(versions, NOW) == [0, 1, 2]
+
+
+def test_retention_thins_to_hourly_then_daily(retention):
+    versions = [
+        _aged(NOW, days=40, hours=3),
+        _aged(NOW, days=40, hours=1),
+        _aged(NOW, days=2, minutes=50),
+        _aged(NOW, days=2, minutes=10),
+        _aged(NOW, minutes=5),
+    ]
+    assert select_versions_to_keep(versions, NOW) == [1, 3, 4]
+
+
+def test_retention_keeps_published_and_latest(retention):
+    versions = [
+        _aged(NOW, is_draft=False, days=40, hours=3),
+        _aged(NOW, days=40, hours=1),
+        _aged(NOW, days=40),
+    ]
+    assert select_versions_to_keep(versions, NOW) == [0, 1, 2]
+
+
+def test_diff_cache_follows_versions_across_renumbering(monkeypatch):
+    from blogs import versioning
+    history = [
+        {'title': 't', 'content': 'one', 'updated_at': NOW - timedelta(hours=3)},
+        {'title': 't', 'content': 'two', 'updated_at': NOW - timedelta(hours=2)},
+        {'title': 't', 'content': 'three', 'updated_at': NOW - timedelta(hours=1)},
+    ]
+    identity = lambda v: versioning._identity({'at': v['updated_at'], 'length': len(v['content'])})
+    monkeypatch.setattr(versioning, 'get_version_identities', lambda _, *ns: [identity(history[n - 1]) for n in ns])
+    monkeypatch.setattr(versioning, 'get_versions', lambda _, *ns: [history[n - 1] for n in ns])
+
+    before = versioning.get_version_diff('b', 1, 2)
+    # Compaction drops the first version, so 1 and 2 now name other versions
+    del history[0]
+    after = versioning.get_version_diff('b', 1, 2)
+    assert before != after
+    assert after['content']['chunks'][-1] == {'op': 'insert', 'text': 'three'}
+
+
+def test_compaction_stamps_rewritten_blogs_for_delta_sync(retention, monkeypatch):
+    from unittest import mock
+    from blogs import versioning
+    thinned = {'_id': 1, 'versions': [_aged(NOW, days=40, hours=h) for h in (3, 2, 1)]}
+    untouched = {'_id': 2, 'versions': [_aged(NOW, minutes=5), _aged(NOW, minutes=1)]}
+    collection = mock.MagicMock()
+    collection.aggregate.side_effect = [[thinned, untouched], []]
+    monkeypatch.setattr(versioning, 'get_db', lambda: {'blogs': collection})
+    monkeypatch.setattr(versioning, 'VersionCompaction', mock.MagicMock())
+    monkeypatch.setattr(versioning, 'next_change_seq', mock.Mock(return_value=41))
+
+    versioning.compact_versions('blogs', now=NOW)
+
+    versioning.next_change_seq.assert_called_once_with(1)
+    [request] = collection.bulk_write.call_args[0][0]
+    update = request._doc[0]['$set']
+    assert update['current_version'] == len(select_versions_to_keep(thinned['versions'], NOW)) < 3
+    assert update['change_seq'] == 41
+    assert update['changed_at'] is not None
@@ -0,0 +1,145 @@
+"""
+Trending score for published blogs.
+
+A blog's score is the sum of its engagement events, each weighted by kind
+and decayed exponentially since it happened (TRENDING_HALF_LIFE_HOURS):
+
+    score(now) = sum(weight * exp(-(now - t) / tau))
+
+Every score shares the factor exp(-now / tau), so the stored value is
+sum(weight * exp((t - epoch) / tau)) and each event is a single
+increment; ordering by the stored value is ordering by the decayed score,
+and the top of the feed is read straight off the index, no scan.
+
+To keep the numbers bounded the epoch moves forward every
+TRENDING_REBASE_HOURS. It is derived from the clock, so every process
+agrees on it. A blog stored under an older epoch is rescaled by its next
+event (the update pipeline does it atomically), and the update_trending
+command rescales the rest right after each boundary.
+
+Views are counted in memory and flushed in batches without
+acknowledgement (the 'blog.view' write tier). Views served by the edge
+cache never reach us and aren't counted.
+"""
+import math
+import threading
+import time
+from collections import Counter
+from bson import ObjectId
+from django.conf import settings
+from pymongo import UpdateOne
+from techsage import mongo_async, write_concern
+from .models import Blog
+
+WEIGHTS = {
+    'publish': 1.0,
+    'view': 0.1,
+    'comment': 2.0,
+    'upvote': 3.0,
+    'downvote': -1.0,
+}
+
+
+def tau():
+    """Decay time constant in seconds"""
+    return settings.TRENDING_HALF_LIFE_HOURS * 3600 / math.log(2)
+
+
+def current_epoch(now):
+    """Start of the rebase period holding ``now`` (Unix seconds)"""
+    period = settings.TRENDING_REBASE_HOURS * 3600
+    return math.floor(now / period) * period
+
+
+def increment(weight, now):
+    """What an event of ``weight`` at ``now`` adds to the stored score"""
+    return weight * math.exp((now - current_epoch(now)) / tau())
+
+
+def rescaled_score(epoch, amount=0.0):
+    """
+    Update pipeline that moves a document's score to ``epoch`` and adds
+    ``amount``. Documents without a score start from zero.
+    """
+    return [{'$set': {
+        'trending_score': {'$add': [
+            {'$multiply': [
+                {'$ifNull': ['$trending_score', 0.0]},
+                {'$exp': {'$divide': [{'$subtract': [{'$ifNull': ['$trending_epoch', epoch]}, epoch]}, tau()]}},
+            ]},
+            amount,
+        ]},
+        'trending_epoch': epoch,
+    }}]
+
+
+def record(blog_id, kind, count=1):
+    """Add ``count`` events of ``kind`` to a blog's score"""
+    record_many({blog_id: count}, kind)
+
+
+def record_many(counts, kind, operation='blog.trending'):
+    """
+    Add events of one ``kind`` to several blogs in one round trip, with the
+    write concern of ``operation``
+    """
+    if not counts:
+        return
+    now = time.time()
+    epoch = current_epoch(now)
+    step = increment(WEIGHTS[kind], now)
+    requests = [
+        UpdateOne({'_id': ObjectId(blog_id)}, rescaled_score(epoch, step * count))
+        for blog_id, count in counts.items()
+    ]
+    collection = Blog._get_collection().with_options(write_concern=write_concern.pymongo_write_concern(operation))
+    collection.bulk_write(requests, ordered=False)
+
+
+def record_vote(blog_id, vote_type, removed=False, changed_from=None):
+    """Score a vote being cast, withdrawn or switched"""
+    if changed_from:
+        record(blog_id, changed_from, -1)
+    record(blog_id, vote_type, -1 if removed else 1)
+
+
+def rebase():
+    """Move every score still on an older epoch to the current one"""
+    epoch = current_epoch(time.time())
+    result = Blog._get_collection().update_many(
+        {'trending_epoch': {'$lt': epoch}}, rescaled_score(epoch)
+    )
+    return result.modified_count
+
+
+class ViewBuffer:
+    """
+    Counts blog views in memory and writes them as one unacknowledged bulk
+    update at most every TRENDING_VIEW_FLUSH_SECONDS. A crash loses at most
+    one interval of views.
+    """
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+        self._flushed_at = time.monotonic()
+
+    def add(self, blog_id):
+        with self._lock:
+            self._counts[blog_id] += 1
+            due = time.monotonic() - self._flushed_at >= settings.TRENDING_VIEW_FLUSH_SECONDS
+            if due:
+                self._flushed_at = time.monotonic()
+        if due:
+            # Off the request path: the flush is a database round trip
+            mongo_async.get_executor().submit(self.flush)
+
+    def flush(self):
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+            self._flushed_at = time.monotonic()
+        record_many(counts, 'view', 'blog.view')
+        return sum(counts.values())
+
+
+views = ViewBuffer()
@@ -0,0 +1,460 @@
+import difflib
+import re
+from collections import Counter
+from datetime import datetime, timedelta
+from bson import ObjectId
+from django.conf import settings
+from django.core.cache import cache
+from mongoengine.connection import get_db
+from pymongo import UpdateOne
+from techsage import write_concern
+from .models import Blog, BlogVersion, VersionCompaction, next_change_seq
+
+DEFAULT_HISTORY_PAGE_SIZE = 20
+MAX_HISTORY_PAGE_SIZE = 100
+DIFF_CACHE_TIMEOUT = 60 * 60
+DIFF_MODES = ('line', 'word')
+
+# Fields compared between neighbouring versions to build the change summary
+SUMMARY_FIELDS = (
+    ('title', 'title'),
+    ('categories', 'categories'),
+    ('tags', 'tags'),
+    ('thumbnail_url', 'thumbnail'),
+    ('is_draft', 'status'),
+)
+
+_WORD_RE = re.compile(r'\s+|\w+|[^\w\s]')
+
+
+def _version_metadata(var):
+    """Aggregation expression projecting one version without its content"""
+    return {
+        'title': f'$${var}.title',
+        'updated_at': f'$${var}.updated_at',
+        'updated_by': f'$${var}.updated_by',
+        'is_draft': f'$${var}.is_draft',
+        'thumbnail_url': f'$${var}.thumbnail_url',
+        'categories': f'$${var}.categories',
+        'tags': f'$${var}.tags',
+        'size': {'$strLenCP': {'$ifNull': [f'$${var}.content', '']}},
+    }
+
+
+def summarize_change(previous, current):
+    """Describe what changed between two version metadata dicts"""
+    if previous is None:
+        return "Initial version"
+    changes = [label for field, label in SUMMARY_FIELDS
+               if previous.get(field) != current.get(field)]
+    delta = current['size'] - previous['size']
+    if delta:
+        changes.append(f"content {delta:+d} chars")
+    return ", ".join(changes) if changes else "No changes"
+
+
+def get_version_history(blog_id, page=1, per_page=DEFAULT_HISTORY_PAGE_SIZE):
+    """
+    Return one page of version metadata, newest first, without any content.
+    Sizes are computed by the database so version bodies never leave it.
+    Returns None if the blog does not exist.
+    """
+    per_page = max(1, min(per_page, MAX_HISTORY_PAGE_SIZE))
+    page = max(1, page)
+    skip = (page - 1) * per_page
+
+    pipeline = [
+        {'$match': {'_id': ObjectId(blog_id)}},
+        {'$project': {
+            'current_version': 1,
+            'history': {'$map': {
+                'input': {'$ifNull': ['$versions', []]},
+                'as': 'v',
+                'in': _version_metadata('v'),
+            }},
+        }},
+        # Slice the page plus the version just before it, so the oldest
+        # entry on the page can still be summarized against its predecessor.
+        {'$project': {
+            'current_version': 1,
+            'total': {'$size': '$history'},
+            'history': {'$let': {
+                'vars': {'end': {'$subtract': [{'$size': '$history'}, skip]}},
+                'in': {'$let': {
+                    'vars': {'start': {'$max': [{'$subtract': ['$$end', per_page + 1]}, 0]}},
+                    'in': {'$cond': [
+                        {'$gt': ['$$end', 0]},
+                        {'$slice': ['$history', '$$start',
+                                    {'$max': [{'$subtract': ['$$end', '$$start']}, 1]}]},
+                        [],
+                    ]},
+                }},
+            }},
+        }},
+    ]
+    doc = next(Blog._get_collection().aggregate(pipeline), None)
+    if doc is None:
+        return None
+
+    total = doc['total']
+    end = max(total - skip, 0)
+    start = max(end - per_page - 1, 0)
+    page_start = max(end - per_page, 0)
+
+    versions = []
+    for offset, meta in enumerate(doc['history']):
+        index = start + offset
+        if index < page_start:
+            continue
+        previous = doc['history'][offset - 1] if offset > 0 else None
+        meta['version'] = index + 1
+        meta['change_summary'] = summarize_change(previous, meta)
+        meta['size_delta'] = meta['size'] - previous['size'] if previous else meta['size']
+        versions.append(meta)
+    versions.reverse()
+
+    total_pages = (total + per_page - 1) // per_page
+    return {
+        'current_version': doc.get('current_version', total),
+        'versions': versions,
+        'pagination': {
+            'current_page': page,
+            'per_page': per_page,
+            'total_pages': total_pages,
+            'total_versions': total,
+            'has_next': page < total_pages,
+            'has_previous': page > 1,
+        },
+    }
+
+
+def get_versions(blog_id, *version_numbers):
+    """
+    Fetch full versions by 1-based number in a single round trip.
+    Returns None if the blog does not exist, otherwise a list with None
+    in place of any version number that is out of range.
+    """
+    projection = {
+        f'v{n}': {'$arrayElemAt': [{'$ifNull': ['$versions', []]}, n - 1]}
+        for n in version_numbers if n >= 1
+    }
+    projection['total'] = {'$size': {'$ifNull': ['$versions', []]}}
+    pipeline = [
+        {'$match': {'_id': ObjectId(blog_id)}},
+        {'$project': projection},
+    ]
+    doc = next(Blog._get_collection().aggregate(pipeline), None)
+    if doc is None:
+        return None
+    return [doc.get(f'v{n}') if 1 <= n <= doc['total'] else None for n in version_numbers]
+
+
+def _tokenize(text, mode):
+    if mode == 'word':
+        return _WORD_RE.findall(text)
+    return text.splitlines(keepends=True)
+
+
+def diff_text(old, new, mode='line'):
+    """
+    Diff two strings at line or word granularity.
+    Returns a list of {"op", "text"} chunks plus added/removed token counts.
+    """
+    old_tokens = _tokenize(old or '', mode)
+    new_tokens = _tokenize(new or '', mode)
+    matcher = difflib.SequenceMatcher(None, old_tokens, new_tokens, autojunk=False)
+
+    chunks = []
+    added = removed = 0
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            chunks.append({'op': 'equal', 'text': ''.join(old_tokens[i1:i2])})
+            continue
+        if tag in ('delete', 'replace'):
+            chunks.append({'op': 'delete', 'text': ''.join(old_tokens[i1:i2])})
+            removed += i2 - i1
+        if tag in ('insert', 'replace'):
+            chunks.append({'op': 'insert', 'text': ''.join(new_tokens[j1:j2])})
+            added += j2 - j1
+    return {'chunks': chunks, 'added': added, 'removed': removed}
+
+
+def get_version_identities(blog_id, *version_numbers):
+    """
+    A key per version number that stays with the version itself. Compaction
+    renumbers versions but never edits one, so a version is told apart by
+    its timestamp and content length. Same None conventions as get_versions.
+    """
+    projection = {
+        f'v{n}': {'$let': {
+            'vars': {'v': {'$arrayElemAt': [{'$ifNull': ['$versions', []]}, n - 1]}},
+            'in': {'at': '$$v.updated_at', 'length': {'$strLenCP': {'$ifNull': ['$$v.content', '']}}},
+        }}
+        for n in version_numbers if n >= 1
+    }
+    projection['total'] = {'$size': {'$ifNull': ['$versions', []]}}
+    pipeline = [
+        {'$match': {'_id': ObjectId(blog_id)}},
+        {'$project': projection},
+    ]
+    doc = next(Blog._get_collection().aggregate(pipeline), None)
+    if doc is None:
+        return None
+    return [_identity(doc[f'v{n}']) if 1 <= n <= doc['total'] else None for n in version_numbers]
+
+
+def _identity(version):
+    at = version.get('at')
+    return f"{at.isoformat() if at else ''}/{version['length']}"
+
+
+def get_version_diff(blog_id, a, b, mode='line'):
+    """
+    Diff version ``a`` against version ``b`` of a blog, caching the result.
+    Returns None if the blog does not exist and raises IndexError if either
+    version number is out of range.
+
+    The cache is per process, so entries are keyed by version identity
+    rather than number and never need invalidating: after a compaction the
+    new numbers simply map to other keys.
+    """
+    identities = get_version_identities(blog_id, a, b)
+    if identities is None:
+        return None
+    if None in identities:
+        raise IndexError("Invalid version number")
+    key = f'blog_diff:{blog_id}:{identities[0]}:{identities[1]}:{mode}'
+    result = cache.get(key)
+    if result is not None:
+        return result
+
+    versions = get_versions(blog_id, a, b)
+    if versions is None:
+        return None
+    old, new = versions
+    if old is None or new is None:
+        raise IndexError("Invalid version number")
+
+    result = {
+        'title': diff_text(old.get('title', ''), new.get('title', ''), 'word'),
+        'content': diff_text(old.get('content', ''), new.get('content', ''), mode),
+    }
+    cache.set(key, result, DIFF_CACHE_TIMEOUT)
+    return result
+
+
+def get_draft_state(blog_id):
+    """
+    Load what an autosave needs in one round trip: the draft's own fields,
+    the number of versions and the latest version, without the rest of the
+    history or the vote lists. Returns None if no such draft exists.
+    """
+    pipeline = [
+        {'$match': {'_id': ObjectId(blog_id), 'is_draft': True}},
+        {'$project': {
+            'title': 1,
+            'content': 1,
+            'thumbnail_url': 1,
+            'categories': 1,
+            'tags': 1,
+            'authors': 1,
+            'version_count': {'$size': {'$ifNull': ['$versions', []]}},
+            'last_version': {'$arrayElemAt': [{'$ifNull': ['$versions', []]}, -1]},
+        }},
+    ]
+    return next(Blog._get_collection().aggregate(pipeline), None)
+
+
+def estimate_edit_distance(old, new):
+    """
+    Linear-time lower bound on the number of characters edited between two
+    strings, good enough to decide whether a change is worth a new version.
+    """
+    old = old or ''
+    new = new or ''
+    if old == new:
+        return 0
+    common = sum((Counter(old) & Counter(new)).values())
+    return max(max(len(old), len(new)) - common, 1)
+
+
+def should_cut_version(last_version, draft, now=None):
+    """
+    Decide whether an autosave should append a new version. A version is cut
+    when the draft differs from the latest version and either enough text
+    changed or enough time passed since that version was taken.
+    """
+    if not last_version:
+        return True
+    now = now or datetime.utcnow()
+
+    distance = (
+        estimate_edit_distance(last_version.get('title'), draft.get('title')) +
+        estimate_edit_distance(last_version.get('content'), draft.get('content'))
+    )
+    metadata_changed = any(
+        (last_version.get(field) or None) != (draft.get(field) or None)
+        for field in ('categories', 'tags', 'thumbnail_url')
+    )
+    if not distance and not metadata_changed:
+        return False
+    if distance >= settings.AUTOSAVE_VERSION_MIN_CHARS:
+        return True
+
+    updated_at = last_version.get('updated_at')
+    if updated_at is None:
+        return True
+    return (now - updated_at).total_seconds() >= settings.AUTOSAVE_VERSION_INTERVAL_SECONDS
+
+
+def save_draft(blog_id, draft, changes, username, force=False):
+    """
+    Apply ``changes`` to a draft loaded with get_draft_state using a single
+    partial update. A version is appended only when should_cut_version says
+    so, or always when ``force`` is set (explicit saves).
+    Returns True if a new version was cut.
+    """
+    now = datetime.utcnow()
+    draft.update(changes)
+
+    updates = {f'set__{field}': value for field, value in changes.items()}
+    updates['set__updated_at'] = now
+    # Autosaves skip Blog.save(), so stamp the change feed sequence here
+    updates['set__change_seq'] = next_change_seq()
+    updates['set__changed_at'] = now
+
+    cut = force or should_cut_version(draft.get('last_version'), draft, now)
+    if cut:
+        updates['push__versions'] = BlogVersion(
+            title=draft.get('title'),
+            content=draft.get('content'),
+            thumbnail_url=draft.get('thumbnail_url'),
+            updated_at=now,
+            updated_by=username,
+            is_draft=True,
+            categories=draft.get('categories', []),
+            tags=draft.get('tags', [])
+        )
+        draft['version_count'] += 1
+        updates['set__current_version'] = draft['version_count']
+
+    # Explicit saves keep the default; autosave ticks are cheap to lose
+    operation = 'blog.save_draft' if force else 'blog.autosave'
+    Blog.objects(id=blog_id, is_draft=True).update_one(
+        write_concern=write_concern.for_operation(operation), **updates
+    )
+    return cut
+
+
+def select_versions_to_keep(versions, now=None):
+    """
+    Apply the retention policy to version metadata (oldest first) and return
+    the sorted indices to keep. Recent versions are all kept, older ones are
+    thinned to the newest per hour and then per day. The latest version and
+    published snapshots are never dropped.
+    """
+    now = now or datetime.utcnow()
+    keep_all = timedelta(hours=settings.VERSION_RETENTION_KEEP_ALL_HOURS)
+    hourly = timedelta(days=settings.VERSION_RETENTION_HOURLY_DAYS)
+
+    keep = set()
+    buckets = {}
+    latest = len(versions) - 1
+    for index, version in enumerate(versions):
+        updated_at = version.get('updated_at')
+        if index == latest or updated_at is None or not version.get('is_draft', True):
+            keep.add(index)
+            continue
+        age = now - updated_at
+        if age < keep_all:
+            keep.add(index)
+        elif age < hourly:
+            buckets[('hour', updated_at.replace(minute=0, second=0, microsecond=0))] = index
+        else:
+            buckets[('day', updated_at.date())] = index
+    keep.update(buckets.values())
+    return sorted(keep)
+
+
+def compact_versions(collection_name, batch_size=200, restart=False, dry_run=False, now=None):
+    """
+    Thin the ``versions`` array of every document in ``collection_name``
+    according to select_versions_to_keep. Documents are walked in ``_id``
+    order in batches; only version metadata is read and each batch is
+    rewritten with one bulk write. Progress is checkpointed after every
+    batch so an interrupted run resumes where it stopped.
+    Returns a dict of counters for the run.
+    """
+    collection = get_db()[collection_name]
+    progress = VersionCompaction.objects(collection_name=collection_name).first()
+    if progress is None:
+        progress = VersionCompaction(collection_name=collection_name)
+    if restart or progress.completed_at or progress.last_id is None:
+        progress.last_id = None
+        progress.started_at = datetime.utcnow()
+        progress.completed_at = None
+        progress.versions_removed = 0
+
+    stats = {'documents': 0, 'updated': 0, 'versions_removed': 0}
+    while True:
+        match = {'versions.1': {'$exists': True}}
+        if progress.last_id:
+            match['_id'] = {'$gt': progress.last_id}
+        batch = list(collection.aggregate([
+            {'$match': match},
+            {'$sort': {'_id': 1}},
+            {'$limit': batch_size},
+            {'$project': {'versions': {'$map': {
+                'input': '$versions',
+                'as': 'v',
+                'in': {'updated_at': '$$v.updated_at', 'is_draft': '$$v.is_draft'},
+            }}}},
+        ]))
+        if not batch:
+            break
+
+        rewrites = []
+        removed = 0
+        for doc in batch:
+            keep = select_versions_to_keep(doc['versions'], now)
+            if len(keep) < len(doc['versions']):
+                rewrites.append((doc, keep))
+                removed += len(doc['versions']) - len(keep)
+
+        stats['documents'] += len(batch)
+        stats['versions_removed'] += removed
+        if rewrites and not dry_run:
+            # Blogs are change tracked: stamp the rewrite so delta-sync
+            # clients pick up the new version numbers
+            tracked = collection_name == Blog._get_collection_name()
+            seq = next_change_seq(len(rewrites)) - len(rewrites) if tracked else None
+            requests = []
+            for doc, keep in rewrites:
+                update = {
+                    'versions': {'$map': {
+                        'input': keep,
+                        'as': 'i',
+                        'in': {'$arrayElemAt': ['$versions', '$$i']},
+                    }},
+                    'current_version': len(keep),
+                }
+                if tracked:
+                    seq += 1
+                    update.update(change_seq=seq, changed_at=datetime.utcnow())
+                # Only rewrite if no version was appended since we read the metadata
+                requests.append(UpdateOne(
+                    {'_id': doc['_id'], 'versions': {'$size': len(doc['versions'])}},
+                    [{'$set': update}]
+                ))
+            result = collection.bulk_write(requests, ordered=False)
+            stats['updated'] += result.modified_count
+
+        progress.last_id = batch[-1]['_id']
+        if not dry_run:
+            progress.versions_removed += removed
+            progress.save()
+
+    if not dry_run:
+        progress.completed_at = datetime.utcnow()
+        progress.save()
+    return stats
@@ -4,9 +4,9 @@ from rest_framework.response import Response
 from rest_framework import status
 from mongoengine import ValidationError
 from django.shortcuts import render
-import cloudinary.uploader
+import cloudinary.exceptions
 from .models import Blog
-from .models import Vote
+from .models import Vote, delete_tracked
 from users.models import User
 from comments.models import Comment
 import pytz
@@ -16,6 +16,13 @@ from mongoengine import DoesNotExist, NotUniqueError
 from reports.models import BlogReport
 from django.utils import timezone
 import mongoengine
+from bson import ObjectId
+from bson.errors import InvalidId
+from . import readers, sync, trending, versioning
+from django.views import View
+from django.conf import settings
+from techsage.renderers import FastJsonResponse, streaming_json_response
+from techsage import clients, conditional, edge_cache, metrics, read_routing, response_cache, write_concern
 
 def blog_test_view(request):
     return render(request, "blog_update_test.html")
@@ -39,7 +46,8 @@ class CreateBlog(APIView):
             
             thumbnail_url = None
             if 'thumbnail' in request.FILES:
-                upload_result = cloudinary.uploader.upload(request.FILES['thumbnail'])
+                with metrics.external_call('cloudinary'):
+                    upload_result = clients.cloudinary_uploader().upload(request.FILES['thumbnail'])
                 thumbnail_url = upload_result['secure_url']
             
             is_draft = str(data.get('is_draft', 'true')).lower() == 'true'
@@ -63,6 +71,9 @@ class CreateBlog(APIView):
                 blog.publish(username)
             
             blog.save()
+            if blog.is_published:
+                trending.record(blog.id, 'publish')
+            response_cache.invalidate(*response_cache.blog_tags(blog))
             
             dhaka_tz = pytz.timezone('Asia/Dhaka')  # Define Asia/Dhaka timezone
             created_at_dhaka = blog.created_at.replace(tzinfo=pytz.utc).astimezone(dhaka_tz)  # Convert to Asia/Dhaka
@@ -93,68 +104,34 @@ class CreateBlog(APIView):
 
 class ListBlogs(APIView):
     def get(self, request):
-        dhaka_tz = pytz.timezone('Asia/Dhaka')
         status_filter = request.GET.get('status', None)
         author_filter = request.GET.get('author', None) 
         category_filter = request.GET.get('category', None)
 
-        query = Blog.objects.all()
-        
         if status_filter == 'draft':
-            query = query.filter(is_draft=True, is_published=False, is_deleted=False)
+            match = {'is_draft': True, 'is_published': False, 'is_deleted': False}
         elif status_filter == 'published':
-            query = query.filter(is_published=True, is_deleted=False)
+            match = {'is_published': True, 'is_deleted': False}
         elif status_filter == 'trash':
-            query = query.filter(is_deleted=True)
+            match = {'is_deleted': True}
         else: 
-            query = query.filter(is_deleted=False)
+            match = {'is_deleted': False}
         
         if author_filter:
-            try:
-                author = User.objects.get(username=author_filter)
-                query = query.filter(authors__in=[author]) 
-            except User.DoesNotExist:
+            author_id = readers.get_user_id(author_filter)
+            if author_id is None:
                 return Response({"error": "Author not found"}, status=status.HTTP_404_NOT_FOUND)
+            match['authors'] = author_id
         
         if category_filter:
-            query = query.filter(categories__in=[category_filter])
+            match['categories'] = category_filter
         
         try:
-            blogs = query.order_by('-created_at')
-            blogs_list = []
-            for blog in blogs:
-                created_at_dhaka = blog.created_at.replace(tzinfo=pytz.utc).astimezone(dhaka_tz)
-                updated_at_dhaka = blog.updated_at.replace(tzinfo=pytz.utc).astimezone(dhaka_tz)
-                published_at_dhaka = blog.published_at.replace(tzinfo=pytz.utc).astimezone(dhaka_tz) if blog.published_at else None
-                
-                blog_data = {
-                    "id": str(blog.id),
-                    "title": blog.title,
-                    "content": blog.content,
-                    "authors": [{
-                        "username": author.username,
-                        "avatar": getattr(author, 'avatar_url', None)
-                    } for author in blog.authors],
-                    "thumbnail_url": blog.thumbnail_url,
-                    "categories": blog.categories,
-                    "tags": blog.tags,
-                    "created_at": created_at_dhaka.isoformat(),
-                    "updated_at": updated_at_dhaka.isoformat(),
-                    "status": "draft" if blog.is_draft else "published" if blog.is_published else "deleted",
-                    "stats": {
-                        "upvotes": len(blog.upvotes),
-                        "downvotes": len(blog.downvotes)
-                    },
-                    "version": blog.current_version,
-                    "published_at": published_at_dhaka.isoformat() if published_at_dhaka else None,
-                    "timezone": "Asia/Dhaka (UTC+6)"
-                }
-                blogs_list.append(blog_data)
-            
-            return Response({
-                "count": len(blogs_list),
-                "results": blogs_list
-            })
+            blogs = readers.BlogQuery(
+                match, readers.LIST_PLAN, sort=[('created_at', -1)], reads=read_routing.secondary_reads()
+            )
+            # Unfiltered listings can cover the whole collection, so stream them
+            return streaming_json_response(request, blogs, envelope={"count": blogs.count()})
             
         except Exception as e:
             return Response({
@@ -164,39 +141,18 @@ class ListBlogs(APIView):
 
 class JobBlogs(APIView):
     def get(self, request):
-        dhaka_tz = pytz.timezone('Asia/Dhaka')
+        return response_cache.cached_streaming_response(
+            request, [response_cache.category_tag('job')], lambda: self.list_jobs(request)
+        )
+
+    def list_jobs(self, request):
         try:
-            blogs = Blog.objects(
-                categories__in=["job"],
-                is_published=True,
-                is_deleted=False
-            ).order_by('-created_at')
-            
-            blogs_list = []
-            for blog in blogs:
-                created_at_dhaka = blog.created_at.replace(tzinfo=pytz.utc).astimezone(dhaka_tz)
-                updated_at_dhaka = blog.updated_at.replace(tzinfo=pytz.utc).astimezone(dhaka_tz)
-                
-                blog_data = {
-                    "id": str(blog.id),
-                    "title": blog.title,
-                    "content": blog.content,
-                    "authors": [{
-                        "username": author.username,
-                        "avatar": getattr(author, 'avatar_url', None)
-                    } for author in blog.authors],
-                    "thumbnail_url": blog.thumbnail_url,
-                    "tags": blog.tags,
-                    "created_at": created_at_dhaka.isoformat(),
-                    "updated_at": updated_at_dhaka.isoformat(),
-                    "timezone": "Asia/Dhaka (UTC+6)"
-                }
-                blogs_list.append(blog_data)
-            
-            return Response({
-                "count": len(blogs_list),
-                "results": blogs_list
-            })
+            blogs = readers.BlogQuery(
+                {'categories': 'job', 'is_published': True, 'is_deleted': False},
+                readers.JOB_PLAN,
+                sort=[('created_at', -1)]
+            )
+            return streaming_json_response(request, blogs, envelope={"count": blogs.count()})
             
         except Exception as e:
             return Response({
@@ -222,13 +178,16 @@ class UpdateBlog(APIView):
                 return Response({"error": "You are not authorized to edit this blog"}, 
                                status=status.HTTP_403_FORBIDDEN)
             
+            previous_tags = response_cache.blog_tags(blog)
             blog.save_version(username)
             
             if 'thumbnail' in request.FILES:
                 if blog.thumbnail_url:
                     public_id = blog.thumbnail_url.split('/')[-1].split('.')[0]
-                    cloudinary.uploader.destroy(public_id)
-                upload_result = cloudinary.uploader.upload(request.FILES['thumbnail'])
+                    with metrics.external_call('cloudinary'):
+                        clients.cloudinary_uploader().destroy(public_id)
+                with metrics.external_call('cloudinary'):
+                    upload_result = clients.cloudinary_uploader().upload(request.FILES['thumbnail'])
                 blog.thumbnail_url = upload_result['secure_url']
             
             if 'title' in data:
@@ -249,6 +208,7 @@ class UpdateBlog(APIView):
                     blog.unpublish(username)
             
             blog.save()
+            response_cache.invalidate(*previous_tags, *response_cache.blog_tags(blog))
             
             return Response({
                 "message": "Blog updated successfully",
@@ -284,6 +244,8 @@ class PublishBlog(APIView):
                               status=403)
             
             blog.publish(username)
+            trending.record(blog.id, 'publish')
+            response_cache.invalidate(*response_cache.blog_tags(blog))
             
             for author in blog.authors:
                 author.update(inc__total_publications=1)
@@ -321,7 +283,9 @@ class UnpublishBlog(APIView):
                 for author in blog.authors:
                     author.update(dec__total_publications=1)
             
+            previous_tags = response_cache.blog_tags(blog)
             blog.unpublish(username)
+            response_cache.invalidate(*previous_tags)
             return Response({"message": "Blog unpublished and moved to drafts"})
             
         except Blog.DoesNotExist:
@@ -345,7 +309,9 @@ class DeleteBlog(APIView):
                                status=status.HTTP_403_FORBIDDEN)
             
             # Use soft delete instead of hard delete
+            previous_tags = response_cache.blog_tags(blog)
             blog.soft_delete(username)
+            response_cache.invalidate(*previous_tags)
 
             return Response({
                 "message": "Blog moved to trash successfully"
@@ -373,12 +339,17 @@ class SaveAsDraft(APIView):
                 return Response({"error": "You are not authorized to modify this blog"}, 
                                status=status.HTTP_403_FORBIDDEN)
             
+            # Before any field changes, so the old categories are flushed too
+            previous_tags = response_cache.blog_tags(blog)
+
             # Handle thumbnail upload if provided
             if 'thumbnail' in request.FILES:
                 if blog.thumbnail_url:  # Delete old thumbnail if exists
                     public_id = blog.thumbnail_url.split('/')[-1].split('.')[0]
-                    cloudinary.uploader.destroy(public_id)
-                upload_result = cloudinary.uploader.upload(request.FILES['thumbnail'])
+                    with metrics.external_call('cloudinary'):
+                        clients.cloudinary_uploader().destroy(public_id)
+                with metrics.external_call('cloudinary'):
+                    upload_result = clients.cloudinary_uploader().upload(request.FILES['thumbnail'])
                 blog.thumbnail_url = upload_result['secure_url']
             
             # Update blog fields if provided in request data
@@ -408,6 +379,7 @@ class SaveAsDraft(APIView):
             
             # Save the blog
             blog.save()
+            response_cache.invalidate(*previous_tags, *response_cache.blog_tags(blog))
             
             # Prepare response
             dhaka_tz = pytz.timezone('Asia/Dhaka')
@@ -438,30 +410,96 @@ class SaveAsDraft(APIView):
 
 class GetBlogVersions(APIView):
     def get(self, request, blog_id):
+        """
+        Get version history metadata (no content), newest first
+        Query Parameters:
+        - page: Page number (default: 1)
+        - per_page: Items per page (default: 20, max: 100)
+        """
         try:
-            blog = Blog.objects.get(id=blog_id)
-            dhaka_tz = pytz.timezone('Asia/Dhaka')  # Define Asia/Dhaka timezone
+            page = int(request.GET.get('page', 1))
+            per_page = int(request.GET.get('per_page', versioning.DEFAULT_HISTORY_PAGE_SIZE))
+            history = versioning.get_version_history(blog_id, page, per_page)
+            if history is None:
+                return Response({"error": "Blog not found"}, status=status.HTTP_404_NOT_FOUND)
+
             versions = []
-            for idx, version in enumerate(blog.versions, 1):
-                updated_at_dhaka = version.updated_at.replace(tzinfo=pytz.utc).astimezone(dhaka_tz)  # Convert to Asia/Dhaka
+            for version in history['versions']:
                 versions.append({
-                    "version": idx,
-                    "title": version.title,
-                    "content": version.content,
-                    "updated_at": updated_at_dhaka.isoformat(),  # Use converted timestamp
-                    "updated_by": version.updated_by,
-                    "thumbnail_url": version.thumbnail_url,
-                    "categories": version.categories,
-                    "tags": version.tags
+                    "version": version['version'],
+                    "title": version.get('title'),
+                    "updated_at": readers.to_dhaka(version.get('updated_at')),
+                    "updated_by": version.get('updated_by'),
+                    "is_draft": version.get('is_draft', True),
+                    "size": version['size'],
+                    "size_delta": version['size_delta'],
+                    "change_summary": version['change_summary']
                 })
             return Response({
-                "blog_id": str(blog.id),
-                "current_version": blog.current_version,
+                "blog_id": blog_id,
+                "current_version": history['current_version'],
                 "versions": versions,
+                "pagination": history['pagination'],
                 "timezone": "Asia/Dhaka (UTC+6)"  # Indicate timezone in response
             })
-        except Blog.DoesNotExist:
-            return Response({"error": "Blog not found"}, status=status.HTTP_404_NOT_FOUND)
+        except InvalidId:
+            return Response({"error": "Invalid blog ID"}, status=status.HTTP_400_BAD_REQUEST)
+        except ValueError:
+            return Response({"error": "page and per_page must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+
+class GetBlogVersion(APIView):
+    def get(self, request, blog_id, version_number):
+        """Get the full content of a single version"""
+        try:
+            versions = versioning.get_versions(blog_id, version_number)
+            if versions is None:
+                return Response({"error": "Blog not found"}, status=status.HTTP_404_NOT_FOUND)
+            version = versions[0]
+            if version is None:
+                return Response({"error": "Version not found"}, status=status.HTTP_404_NOT_FOUND)
+
+            return Response({
+                "blog_id": blog_id,
+                "version": version_number,
+                "title": version.get('title'),
+                "content": version.get('content'),
+                "updated_at": readers.to_dhaka(version.get('updated_at')),
+                "updated_by": version.get('updated_by'),
+                "thumbnail_url": version.get('thumbnail_url'),
+                "categories": version.get('categories', []),
+                "tags": version.get('tags', []),
+                "is_draft": version.get('is_draft', True),
+                "timezone": "Asia/Dhaka (UTC+6)"  # Indicate timezone
+            })
+        except InvalidId:
+            return Response({"error": "Invalid blog ID"}, status=status.HTTP_400_BAD_REQUEST)
+
+class BlogVersionDiff(APIView):
+    def get(self, request, blog_id, version_a, version_b):
+        """
+        Diff two versions of a blog on the server
+        Query Parameters:
+        - mode: 'line' (default) or 'word'
+        """
+        mode = request.GET.get('mode', 'line')
+        if mode not in versioning.DIFF_MODES:
+            return Response({"error": "mode must be 'line' or 'word'"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            diff = versioning.get_version_diff(blog_id, version_a, version_b, mode)
+            if diff is None:
+                return Response({"error": "Blog not found"}, status=status.HTTP_404_NOT_FOUND)
+            return Response({
+                "blog_id": blog_id,
+                "from_version": version_a,
+                "to_version": version_b,
+                "mode": mode,
+                "title": diff['title'],
+                "content": diff['content']
+            })
+        except InvalidId:
+            return Response({"error": "Invalid blog ID"}, status=status.HTTP_400_BAD_REQUEST)
+        except IndexError:
+            return Response({"error": "Invalid version number"}, status=status.HTTP_400_BAD_REQUEST)
 
 class RevertBlogVersion(APIView):
     def post(self, request, blog_id, version_number):
@@ -481,6 +519,7 @@ class RevertBlogVersion(APIView):
                                status=status.HTTP_403_FORBIDDEN)
             
             if blog.revert_to_version(version_number, username):
+                response_cache.invalidate(*response_cache.blog_tags(blog))
                 return Response({
                     "message": f"Reverted to version {version_number}",
                     "new_version": blog.current_version
@@ -512,6 +551,7 @@ class RestoreBlog(APIView):
             blog.deleted_at = None
             blog.deleted_by = None
             blog.save()
+            response_cache.invalidate(*response_cache.blog_tags(blog))
             
             return Response({
                 "message": "Blog restored from trash",
@@ -525,12 +565,14 @@ class ModeratorDeleteBlog(APIView):
     def delete(self, request, blog_id):
         try:
             blog = Blog.objects.get(id=blog_id)
+            previous_tags = response_cache.blog_tags(blog)
             
-            Comment.objects(blog=blog).delete()
+            delete_tracked(Comment.objects(blog=blog))
             
             BlogReport.objects(blog=blog).delete()
             
             blog.delete()
+            response_cache.invalidate(*previous_tags, response_cache.comments_tag(blog_id))
             
             return Response({
                 "message": "Blog and all associated comments and reports permanently deleted",
@@ -540,52 +582,25 @@ class ModeratorDeleteBlog(APIView):
         except Blog.DoesNotExist:
             return Response({"error": "Blog not found"}, status=status.HTTP_404_NOT_FOUND)
         
-class BlogSearch(APIView):
-    def get(self, request):
+class BlogSearch(View):
+    async def get(self, request):
         query = request.GET.get('q', '').strip()
         status_filter = request.GET.get('status', None)
         
         if not query:
-            return Response({"error": "Search query 'q' parameter required"}, status=status.HTTP_400_BAD_REQUEST)
+            return FastJsonResponse({"error": "Search query 'q' parameter required"}, status=status.HTTP_400_BAD_REQUEST)
             
         try:
-            from mongoengine.queryset.visitor import Q
-            
-            search_query = (
-                Q(title__icontains=query) |
-                Q(content__icontains=query) |
-                Q(tags__icontains=query) |
-                Q(categories__icontains=query)
-            ) & Q(is_deleted=False)
-            
-            if status_filter == 'published':
-                search_query &= Q(is_published=True, is_draft=False)
-            elif status_filter == 'draft':
-                search_query &= Q(is_draft=True, is_published=False)
-            
-            blogs = Blog.objects(search_query)
-            
-            dhaka_tz = pytz.timezone('Asia/Dhaka')  # Define Asia/Dhaka timezone
-            results = []
-            for blog in blogs:
-                created_at_dhaka = blog.created_at.replace(tzinfo=pytz.utc).astimezone(dhaka_tz)  # Convert to Asia/Dhaka
-                results.append({
-                    "id": str(blog.id),
-                    "title": blog.title,
-                    "authors": [author.username for author in blog.authors],
-                    "excerpt": blog.content[:100] + "..." if len(blog.content) > 100 else blog.content,
-                    "categories": blog.categories,
-                    "tags": blog.tags,
-                    "thumbnail_url": blog.thumbnail_url,
-                    "status": "published" if blog.is_published else "draft",
-                    "created_at": created_at_dhaka.isoformat(),
-                    "timezone": "Asia/Dhaka (UTC+6)"  # Indicate timezone
-                })
-            
-            return Response(results)
+            results = await readers.BlogQuery(
+                readers.search_match(query, status_filter),
+                readers.SEARCH_PLAN,
+                sort=[('created_at', -1)],
+                reads=read_routing.secondary_reads()
+            ).afetch()
+            return FastJsonResponse(results, safe=False)
             
         except Exception as e:
-            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return FastJsonResponse({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 class AddAuthorToBlog(APIView):
     def post(self, request, blog_id):
@@ -614,6 +629,7 @@ class AddAuthorToBlog(APIView):
             
             blog.authors.append(new_author)
             blog.save()
+            response_cache.invalidate(*response_cache.blog_tags(blog))
             
             return Response({
                 "message": f"Added {new_author_username} as an author",
@@ -623,8 +639,8 @@ class AddAuthorToBlog(APIView):
         except Blog.DoesNotExist:
             return Response({"error": "Blog not found"}, status=status.HTTP_404_NOT_FOUND)
         
-class PublishedBlogs(APIView):
-    def get(self, request):
+class PublishedBlogs(View):
+    async def get(self, request):
         """
         Get ALL published blogs with pagination
         Query Parameters:
@@ -634,69 +650,57 @@ class PublishedBlogs(APIView):
         - author: Filter by author username
         - reviewed: Filter by review status (true/false)
         """
+        # Tag by the narrowest filter: any blog that can appear in the
+        # filtered list carries that category or author tag
+        category = request.GET.get('category')
+        author = request.GET.get('author')
+        if category:
+            tags = [response_cache.category_tag(category)]
+        elif author:
+            tags = [response_cache.author_tag(author)]
+        else:
+            tags = [response_cache.BLOGS_TAG]
+        return await response_cache.acached_json_response(request, tags, lambda: self.list_published(request))
+
+    async def list_published(self, request):
         try:
-            query = Blog.objects(
-                is_published=True,
-                is_draft=False,
-                is_deleted=False
-            ).order_by('-published_at')
+            match = {
+                'is_published': True,
+                'is_draft': False,
+                'is_deleted': False
+            }
 
             category = request.GET.get('category')
             if category:
-                query = query.filter(categories__in=[category])
+                match['categories'] = category
 
             author = request.GET.get('author')
             if author:
-                query = query.filter(authors__username=author)
+                author_id = await readers.aget_user_id(author)
+                match['authors'] = {'$in': [author_id] if author_id else []}
 
             reviewed = request.GET.get('reviewed')
             if reviewed is not None:
-                query = query.filter(is_reviewed=(reviewed.lower() == 'true'))
+                match['is_reviewed'] = reviewed.lower() == 'true'
+
+            query = readers.BlogQuery(match, readers.PUBLISHED_PLAN, sort=[('published_at', -1)])
 
             page_number = int(request.GET.get('page', 1))
             per_page = int(request.GET.get('per_page', 10))
-            paginator = Paginator(query, per_page)
+            # Paginate over the count alone and fetch just the requested page
+            paginator = Paginator(range(await query.acount()), per_page)
 
             try:
                 current_page = paginator.page(page_number)
             except EmptyPage:
-                return Response({
+                return FastJsonResponse({
                     "success": False,
                     "error": "Page not found"
                 }, status=status.HTTP_404_NOT_FOUND)
 
-            dhaka_tz = pytz.timezone('Asia/Dhaka')
-            blogs_list = []
-            for blog in current_page:
-                published_at_dhaka = blog.published_at.replace(tzinfo=pytz.utc).astimezone(dhaka_tz)
-                updated_at_dhaka = blog.updated_at.replace(tzinfo=pytz.utc).astimezone(dhaka_tz)
-                
-                blog_data = {
-                    "id": str(blog.id),
-                    "title": blog.title,
-                    "excerpt": blog.content,
-                    "content": blog.content,
-                    "authors": [{
-                        "username": author.username,
-                        "avatar": getattr(author, 'avatar_url', None)
-                    } for author in blog.authors],
-                    "thumbnail_url": blog.thumbnail_url,
-                    "categories": blog.categories,
-                    "tags": blog.tags,
-                    "published_at": published_at_dhaka.isoformat(),
-                    "updated_at": updated_at_dhaka.isoformat(),
-                    "is_reviewed": blog.is_reviewed,
-                    "reviewed_by": blog.reviewed_by.username if blog.reviewed_by else None,
-                    "upvote_count": blog.upvote_count,
-                    "downvote_count": blog.downvote_count,
-                    "stats": {
-                        "upvotes": len(blog.upvotes),
-                        "downvotes": len(blog.downvotes)
-                    }
-                }
-                blogs_list.append(blog_data)
+            blogs_list = await query.afetch(skip=(page_number - 1) * per_page, limit=per_page)
 
-            return Response({
+            return {
                 "success": True,
                 "blogs": blogs_list,
                 "pagination": {
@@ -714,14 +718,59 @@ class PublishedBlogs(APIView):
                     "applied_author": author,
                     "applied_reviewed": reviewed
                 }
-            })
+            }
 
         except Exception as e:
-            return Response({
+            return FastJsonResponse({
                 "success": False,
                 "error": "Failed to fetch published blogs",
                 "details": str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class TrendingBlogs(View):
+    async def get(self, request):
+        """
+        Get the published blogs with the highest trending score
+        Query Parameters:
+        - category: Filter by category
+        - limit: Number of blogs (default: TRENDING_FEED_SIZE, at most 50)
+        """
+        # Scores move with every view, so this list is only as fresh as
+        # the cache entry; votes, comments and publishes still invalidate it
+        category = request.GET.get('category')
+        tags = [response_cache.category_tag(category)] if category else [response_cache.BLOGS_TAG]
+        return await response_cache.acached_json_response(request, tags, lambda: self.list_trending(request))
+
+    async def list_trending(self, request):
+        try:
+            match = {
+                'is_published': True,
+                'is_draft': False,
+                'is_deleted': False
+            }
+
+            category = request.GET.get('category')
+            if category:
+                match['categories'] = category
+
+            limit = max(1, min(int(request.GET.get('limit', settings.TRENDING_FEED_SIZE)), 50))
+            query = readers.BlogQuery(match, readers.PUBLISHED_PLAN, sort=[('trending_score', -1)])
+
+            return {
+                "success": True,
+                "blogs": await query.afetch(limit=limit),
+                "filters": {
+                    "applied_category": category
+                }
+            }
+
+        except Exception as e:
+            return FastJsonResponse({
+                "success": False,
+                "error": "Failed to fetch trending blogs",
+                "details": str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
 class ReviewBlog(APIView):
     def post(self, request, blog_id):
@@ -732,6 +781,7 @@ class ReviewBlog(APIView):
             blog.is_reviewed = True
             blog.reviewed_by = reviewer
             blog.save()
+            response_cache.invalidate(*response_cache.blog_tags(blog))
             
             dhaka_tz = pytz.timezone('Asia/Dhaka')  # Define Asia/Dhaka timezone
             reviewed_at_dhaka = datetime.utcnow().replace(tzinfo=pytz.utc).astimezone(dhaka_tz)  # Convert to Asia/Dhaka
@@ -780,100 +830,102 @@ class CreateDraft(APIView):
 
 class UpdateDraft(APIView):
     def put(self, request, blog_id):
+        """
+        Update a draft with a single partial write
+        Body Parameters:
+        - autosave: 'true' for editor autosave ticks. A new version is then only
+          cut once enough time has passed or enough text changed; otherwise
+          every call is an explicit save and always cuts a version.
+        """
         try:
-            blog = Blog.objects.get(id=blog_id, is_draft=True)
             username = request.data.get('username')
             
             if not username:
                 return Response({"error": "username is required"}, status=400)
                 
             user = User.objects.get(username=username)
-            if user not in blog.authors:
+            draft = versioning.get_draft_state(blog_id)
+            if draft is None:
+                return Response({"error": "Draft not found"}, status=404)
+            if user.id not in draft.get('authors', []):
                 return Response({"error": "Not authorized"}, status=403)
             
             data = request.data
+            changes = {}
             if 'title' in data:
-                blog.title = data['title']
+                changes['title'] = data['title']
             if 'content' in data:
-                blog.content = data['content']
+                changes['content'] = data['content']
             # Replace categories and tags with new lists if provided, otherwise keep existing
             if 'categories[]' in data:
-                blog.categories = data.getlist('categories[]', [])
+                changes['categories'] = data.getlist('categories[]', [])
             if 'tags[]' in data:
-                blog.tags = data.getlist('tags[]', [])
-            
-            blog.save()
-            blog.save_version(username)
+                changes['tags'] = data.getlist('tags[]', [])
             
             if 'thumbnail' in request.FILES:
-                upload_result = cloudinary.uploader.upload(request.FILES['thumbnail'])
-                blog.thumbnail_url = upload_result['secure_url']
-                blog.save()
+                with metrics.external_call('cloudinary'):
+                    upload_result = clients.cloudinary_uploader().upload(request.FILES['thumbnail'])
+                changes['thumbnail_url'] = upload_result['secure_url']
+            
+            autosave = str(data.get('autosave', 'false')).lower() == 'true'
+            version_saved = versioning.save_draft(blog_id, draft, changes, username, force=not autosave)
+            # Drafts are never listed or cached at the edge, only the detail entry goes stale
+            response_cache.invalidate(response_cache.blog_tag(blog_id), purge=False)
             
             return Response({
-                "id": str(blog.id),
-                "title": blog.title,
-                "content": blog.content,
-                "thumbnail_url": blog.thumbnail_url,
-                "categories": blog.categories,
-                "tags": blog.tags,
-                "version": blog.current_version
+                "id": blog_id,
+                "title": draft.get('title'),
+                "content": draft.get('content'),
+                "thumbnail_url": draft.get('thumbnail_url'),
+                "categories": draft.get('categories', []),
+                "tags": draft.get('tags', []),
+                "version": draft['version_count'],
+                "version_saved": version_saved
             })
             
-        except Blog.DoesNotExist:
-            return Response({"error": "Draft not found"}, status=404)
+        except User.DoesNotExist:
+            return Response({"error": "User not found"}, status=404)
+        except InvalidId:
+            return Response({"error": "Invalid blog ID"}, status=400)
         except Exception as e:
             return Response({"error": str(e)}, status=500)
         
-class GetBlog(APIView):
-    def get(self, request, blog_id):
+class GetBlog(View):
+    async def get(self, request, blog_id):
         try:
-            blog = Blog.objects.get(id=blog_id, is_deleted=False)
+            blog = await readers.aget_cached_blog(blog_id)
+            if blog is None:
+                return FastJsonResponse({"error": "Blog not found"}, status=status.HTTP_404_NOT_FOUND)
             
+            if blog.get('is_published'):
+                trending.views.add(blog['id'])
+
             username = request.GET.get('username')
-            has_upvoted = False
-            has_downvoted = False
-            is_saved = False
-            
             if username:
-                user = User.objects(username=username).first()
-                if user:
-                    # Check if user has voted on this blog
-                    has_upvoted = str(blog.id) in user.upvoted_blogs
-                    has_downvoted = str(blog.id) in user.downvoted_blogs
-                    # Check if blog is saved
-                    is_saved = str(blog.id) in user.saved_blogs
-            
-            dhaka_tz = pytz.timezone('Asia/Dhaka')  # Define Asia/Dhaka timezone
-            created_at_dhaka = blog.created_at.replace(tzinfo=pytz.utc).astimezone(dhaka_tz)  # Convert to Asia/Dhaka
-            updated_at_dhaka = blog.updated_at.replace(tzinfo=pytz.utc).astimezone(dhaka_tz)  # Convert to Asia/Dhaka
-            published_at_dhaka = blog.published_at.replace(tzinfo=pytz.utc).astimezone(dhaka_tz) if blog.published_at else None  # Convert to Asia/Dhaka
-            
-            return Response({
-                "id": str(blog.id),
-                "title": blog.title,
-                "content": blog.content,
-                "thumbnail_url": blog.thumbnail_url,
-                "authors": [{"username": author.username, "avatar": getattr(author, 'avatar_url', None)} 
-                           for author in blog.authors],
-                "categories": blog.categories,
-                "tags": blog.tags,
-                "created_at": created_at_dhaka.isoformat(),
-                "updated_at": updated_at_dhaka.isoformat(),
-                "status": "published" if blog.is_published else "draft",
-                "published_at": published_at_dhaka.isoformat() if published_at_dhaka else None,
-                "upvotes": blog.upvote_count,
-                "downvotes": blog.downvote_count,
-                "has_upvoted": has_upvoted,
-                "has_downvoted": has_downvoted,
-                "is_saved": is_saved,
-                "versions": blog.current_version,
-                "is_draft": blog.is_draft,
-                "is_published": blog.is_published,
-                "timezone": "Asia/Dhaka (UTC+6)"  # Indicate timezone
-            })
-        except Blog.DoesNotExist:
-            return Response({"error": "Blog not found"}, status=status.HTTP_404_NOT_FOUND)
+                # Check if user has voted on or saved this blog
+                flags = await readers.aget_viewer_flags(username, blog['id'])
+                if flags:
+                    blog.update(flags)
+            
+            # The payload comes from the cache, so hashing it is the cheapest
+            # validator; it covers vote counts and viewer flags too
+            updated_at = blog.get('updated_at')
+            response = conditional.conditional_response(
+                request,
+                conditional.make_etag(blog),
+                int(datetime.fromisoformat(updated_at).timestamp()) if updated_at else None,
+                lambda: FastJsonResponse(blog)
+            )
+            # Drafts change on every autosave and viewer flags are per user,
+            # so neither is cached at the edge
+            keys = [response_cache.blog_tag(blog_id)]
+            keys.extend(response_cache.author_tag(author['username']) for author in blog['authors'])
+            keys.extend(response_cache.category_tag(category) for category in blog['categories'])
+            return edge_cache.apply_cache_headers(
+                response, keys, private=bool(username) or not blog.get('is_published')
+            )
+        except InvalidId:
+            return FastJsonResponse({"error": "Blog not found"}, status=status.HTTP_404_NOT_FOUND)
 
 class VoteBlog(APIView):
     def post(self, request, blog_id):
@@ -889,6 +941,8 @@ class VoteBlog(APIView):
             if vote_type not in ['upvote', 'downvote']:
                 return Response({"error": "Invalid vote type"}, status=status.HTTP_400_BAD_REQUEST)
 
+            concern = write_concern.for_operation('vote.cast')
+            removed, changed_from = False, None
             with mongoengine.get_connection().start_session() as session:
                 with session.start_transaction():
                     existing_vote = Vote.objects(blog=blog, user=user).first()
@@ -898,7 +952,8 @@ class VoteBlog(APIView):
                     if existing_vote:
                         if existing_vote.vote_type == vote_type:
                             # User is removing their existing vote
-                            existing_vote.delete()
+                            existing_vote.delete(**concern)
+                            removed = True
                             if vote_type == 'upvote':
                                 blog.upvote_count -= 1
                                 # Remove from user's upvoted blogs
@@ -911,10 +966,10 @@ class VoteBlog(APIView):
                                     user.downvoted_blogs.remove(str(blog.id))
                         else:
                             # User is changing their vote
-                            old_vote_type = existing_vote.vote_type
+                            changed_from = existing_vote.vote_type
                             existing_vote.vote_type = vote_type
                             existing_vote.created_at = timezone.now()
-                            existing_vote.save()
+                            existing_vote.save(write_concern=concern)
                             if vote_type == 'upvote':
                                 blog.upvote_count += 1
                                 blog.downvote_count -= 1
@@ -933,7 +988,7 @@ class VoteBlog(APIView):
                                     user.downvoted_blogs.append(str(blog.id))
                     else:
                         # User is adding a new vote
-                        Vote(blog=blog, user=user, vote_type=vote_type).save()
+                        Vote(blog=blog, user=user, vote_type=vote_type).save(write_concern=concern)
                         if vote_type == 'upvote':
                             blog.upvote_count += 1
                             # Add to user's upvoted blogs
@@ -945,8 +1000,11 @@ class VoteBlog(APIView):
                             if str(blog.id) not in user.downvoted_blogs:
                                 user.downvoted_blogs.append(str(blog.id))
 
-                    blog.save()
-                    user.save()
+                    blog.save(write_concern=concern)
+                    user.save(write_concern=concern)
+
+            trending.record_vote(blog.id, vote_type, removed, changed_from)
+            response_cache.invalidate(*response_cache.blog_tags(blog))
 
             # After all operations, check what the user's current vote status is
             current_vote = Vote.objects(blog=blog, user=user).first()
@@ -966,4 +1024,42 @@ class VoteBlog(APIView):
         except NotUniqueError:
             return Response({"error": "User has already voted"}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
-            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class Changes(APIView):
+    """
+    Delta sync for client caches: GET changes/<collection>/?since=<token>
+    returns what was created, updated or deleted after the token. Without
+    ``since`` it only returns a starting token. Comments can be scoped with
+    ?blog=<id> and author requests with ?username=<requested author>.
+    """
+    def get(self, request, collection):
+        feed = sync.FEEDS.get(collection)
+        if feed is None:
+            return Response({"error": f"Unknown collection '{collection}'"}, status=status.HTTP_404_NOT_FOUND)
+
+        scope = None
+        try:
+            if collection == 'comments' and request.GET.get('blog'):
+                scope = ObjectId(request.GET['blog'])
+            elif collection == 'requests' and request.GET.get('username'):
+                scope = readers.get_user_id(request.GET['username'])
+                if scope is None:
+                    return Response({"error": "User not found"}, status=status.HTTP_404_NOT_FOUND)
+        except InvalidId:
+            return Response({"error": "Invalid blog ID"}, status=status.HTTP_400_BAD_REQUEST)
+
+        since = request.GET.get('since')
+        if since is None:
+            return Response({"items": [], "deleted": [], "next": sync.current_token(feed, scope), "has_more": False})
+        try:
+            since = int(since)
+            if since < 0:
+                raise ValueError
+        except ValueError:
+            return Response({"error": "Invalid since token"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            return Response(sync.get_changes(feed, since, scope))
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -1,5 +1,6 @@
-from django.http import JsonResponse
+from techsage.renderers import FastJsonResponse
 from blogs.models import Blog
+from techsage import metrics
 import requests
 import os
 from django.views.decorators.csrf import csrf_exempt
@@ -26,12 +27,13 @@ def check_plagiarism(request, blog_id):
             "country": "us"
         }
 
-        resp = requests.post(api_url, json=payload, headers=headers)
+        with metrics.external_call('plagiarism'):
+            resp = requests.post(api_url, json=payload, headers=headers)
 
         
         if resp.status_code == 200:
             data = resp.json()
-            return JsonResponse({
+            return FastJsonResponse({
                 "success": True,
                 "blog_id": str(blog.id),
                 "blog_title": blog.title,
@@ -39,19 +41,19 @@ def check_plagiarism(request, blog_id):
                 "sources": data.get("sources", [])
             })
         else:
-            return JsonResponse({
+            return FastJsonResponse({
                 "success": False,
                 "error": f"API request failed with status {resp.status_code}",
                 "details": resp.text
             }, status=400)
             
     except Blog.DoesNotExist:
-        return JsonResponse({
+        return FastJsonResponse({
             "success": False,
             "error": "Blog not found"
         }, status=404)
     except Exception as e:
-        return JsonResponse({
+        return FastJsonResponse({
             "success": False,
             "error": str(e)
         }, status=500)
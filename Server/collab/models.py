@@ -1,10 +1,11 @@
 from django.db import models
 from datetime import datetime
 from mongoengine import Document, fields
+import pytz
 from users.models import User
-from blogs.models import Blog
+from blogs.models import Blog, ChangeTracked
 
-class AuthorRequest(Document):
+class AuthorRequest(ChangeTracked):
     blog = fields.ReferenceField(Blog, required=True)
     requested_author = fields.ReferenceField(User, required=True)  
     requesting_author = fields.ReferenceField(User, required=True) 
@@ -12,12 +13,33 @@ class AuthorRequest(Document):
     created_at = fields.DateTimeField(default=datetime.utcnow)
     updated_at = fields.DateTimeField(default=datetime.utcnow)
 
+    change_scope_field = 'requested_author'
+
     meta = {
         'collection': 'author_requests',
         'indexes': [
             'blog',
             'requested_author',
             'requesting_author',
-            'status'
+            'status',
+            'change_seq',
+            ('requested_author', 'change_seq')
         ]
-    }
\ No newline at end of file
+    }
+
+    def to_json(self):
+        dhaka_tz = pytz.timezone('Asia/Dhaka')  # Define Asia/Dhaka timezone
+        # Safely get blog title and requesting author username with fallbacks
+        blog_title = getattr(self.blog, 'title', 'Untitled Blog') if self.blog else "Untitled Blog"
+        requesting_author = "Unknown User"
+        if self.requesting_author:
+            requesting_author = getattr(self.requesting_author, 'username', 'Unknown User')
+        created_at_dhaka = self.created_at.replace(tzinfo=pytz.utc).astimezone(dhaka_tz)
+        return {
+            "request_id": str(self.id),
+            "blog_id": str(self.blog.id) if self.blog else None,
+            "blog_title": blog_title,
+            "requesting_author": requesting_author,
+            "created_at": created_at_dhaka.isoformat(),
+            "timezone": "Asia/Dhaka (UTC+6)"  # Indicate timezone
+        }
\ No newline at end of file
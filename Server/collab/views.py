@@ -10,6 +10,7 @@ import logging
 from .models import AuthorRequest
 from users.models import User
 from blogs.models import Blog
+from techsage import response_cache
 
 class RequestAuthor(APIView):
     def post(self, request):
@@ -133,6 +134,7 @@ class RespondToAuthorRequest(APIView):
                 if not user_already_author:
                     blog.authors.append(user)
                     blog.save()
+                    response_cache.invalidate(*response_cache.blog_tags(blog))
 
                 author_request.status = 'accepted'
                 author_request.save()
@@ -176,35 +178,12 @@ class GetAuthorRequests(APIView):
             except:
                 return Response({"error": "User not found"}, status=status.HTTP_404_NOT_FOUND)
             
-            dhaka_tz = pytz.timezone('Asia/Dhaka')  # Define Asia/Dhaka timezone
             requests = AuthorRequest.objects(
                 requested_author=user,
                 status='pending'
             )
             
-            requests_data = []
-            for req in requests:
-                # Safely get blog title with fallback
-                blog_title = "Untitled Blog"
-                if req.blog:
-                    blog_title = getattr(req.blog, 'title', 'Untitled Blog')
-                
-                # Safely get requesting author username with fallback
-                requesting_author = "Unknown User"
-                if req.requesting_author:
-                    requesting_author = getattr(req.requesting_author, 'username', 'Unknown User')
-                
-                # Convert created_at to Asia/Dhaka timezone
-                created_at_dhaka = req.created_at.replace(tzinfo=pytz.utc).astimezone(dhaka_tz)
-                
-                requests_data.append({
-                    "request_id": str(req.id),
-                    "blog_id": str(req.blog.id) if req.blog else None,
-                    "blog_title": blog_title,
-                    "requesting_author": requesting_author,
-                    "created_at": created_at_dhaka.isoformat(),
-                    "timezone": "Asia/Dhaka (UTC+6)"  # Indicate timezone
-                })
+            requests_data = [req.to_json() for req in requests]
             
             return Response({
                 "count": len(requests_data),
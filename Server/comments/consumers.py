@@ -1,10 +1,13 @@
 import json
 from channels.generic.websocket import AsyncWebsocketConsumer
+from techsage import write_concern
+from techsage.metrics import ConsumerMetricsMixin
 from .models import Comment
 from users.models import User
+from blogs import trending
 from blogs.models import Blog
 
-class CommentConsumer(AsyncWebsocketConsumer):
+class CommentConsumer(ConsumerMetricsMixin, AsyncWebsocketConsumer):
     async def connect(self):
         self.blog_id = self.scope['url_route']['kwargs']['blog_id']
         self.room_group_name = f"comments_{self.blog_id}"
@@ -49,8 +52,9 @@ class CommentConsumer(AsyncWebsocketConsumer):
             reviewed_by=None  
         )
         comment.save()
+        trending.record(blog.id, 'comment')
 
-        await self.channel_layer.group_send(
+        await self.group_send(
             self.room_group_name,
             {
                 'type': 'send_comment',
@@ -73,9 +77,9 @@ class CommentConsumer(AsyncWebsocketConsumer):
         else:
             comment.likes.remove(user)
 
-        comment.save()
+        comment.save(write_concern=write_concern.for_operation('comment.like'))
 
-        await self.channel_layer.group_send(
+        await self.group_send(
             self.room_group_name,
             {
                 'type': 'send_comment',
@@ -97,7 +101,7 @@ class CommentConsumer(AsyncWebsocketConsumer):
         comment.is_deleted = True
         comment.save()
 
-        await self.channel_layer.group_send(
+        await self.group_send(
             self.room_group_name,
             {
                 'type': 'send_comment',
@@ -2,9 +2,9 @@ import mongoengine as me
 import datetime
 import pytz
 from users.models import User
-from blogs.models import Blog
+from blogs.models import Blog, ChangeTracked
 
-class Comment(me.Document):
+class Comment(ChangeTracked):
     blog = me.ReferenceField(Blog, required=True)
     author = me.ReferenceField(User, required=True)
     content = me.StringField(required=True)
@@ -17,12 +17,17 @@ class Comment(me.Document):
     is_reviewed = me.BooleanField(default=False)  
     reviewed_by = me.ReferenceField(User, null=True) 
 
+    change_scope_field = 'blog'
+
     meta = {
         'ordering': ['-created_at'],
         'indexes': [
-            'is_reviewed',
-            'blog',
-            'author'
+            ('blog', 'is_deleted', '-created_at'),
+            ('is_deleted', 'is_reviewed', '-created_at'),
+            ('is_deleted', '-created_at'),
+            ('author', 'is_deleted'),
+            'change_seq',
+            ('blog', 'change_seq')
         ]
     }
 
@@ -0,0 +1,63 @@
+from bson import ObjectId
+from bson.errors import InvalidId
+from blogs.readers import (
+    TIMEZONE_LABEL, FieldPlan, constant, list_size, object_id, reviewer, timestamp, value
+)
+from techsage import mongo_async
+from .models import Comment
+
+
+def reference(key):
+    return key, {key: 1}, lambda doc, users: str(doc[key]) if doc.get(key) else None
+
+
+def author_card():
+    def get(doc, users):
+        card = users.get(doc.get('author'), {})
+        return {"username": card.get('username'), "avatar_url": card.get('avatar')}
+    return 'author', {'author': 1}, get
+
+
+COMMENT_FIELDS = (
+    object_id(),
+    reference('blog'),
+    author_card(),
+    value('content'),
+    reference('parent'),
+    timestamp('created_at'),
+    timestamp('updated_at'),
+    list_size('likes', 'likes'),
+    list_size('dislikes', 'dislikes'),
+    value('is_deleted', default=False),
+    value('is_reviewed', default=False),
+    reviewer(),
+    constant('timezone', TIMEZONE_LABEL),
+)
+
+# Same output as Comment.to_json, without dereferencing blog, author and
+# reviewer one comment at a time
+COMMENT_PLAN = FieldPlan(*COMMENT_FIELDS, user_refs=('author', 'reviewed_by'))
+
+# Plus the sequence a syncing client needs; changed_at is raw and popped by
+# the change feed
+COMMENT_CHANGES_PLAN = FieldPlan(
+    *COMMENT_FIELDS,
+    value('change_seq', default=0),
+    value('changed_at'),
+    user_refs=('author', 'reviewed_by'),
+)
+
+
+async def aget_blog_comments(blog_id):
+    """A blog's visible comments, newest first"""
+    try:
+        blog = ObjectId(blog_id)
+    except (InvalidId, TypeError):
+        return []
+    pipeline = [
+        {'$match': {'blog': blog, 'is_deleted': False}},
+        {'$sort': {'created_at': -1}},
+        {'$project': COMMENT_PLAN.projection},
+    ]
+    docs = await mongo_async.collection(Comment).aggregate(pipeline)
+    return await COMMENT_PLAN.aserialize(docs)
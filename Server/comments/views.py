@@ -1,12 +1,14 @@
-from django.http import JsonResponse
+from techsage.renderers import FastJsonResponse
+from techsage import response_cache, write_concern
+from . import readers
 from django.views import View
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 import json
 from .models import Comment
+from blogs import trending
 from blogs.models import Blog
 from users.models import User
-from django.http import JsonResponse
 from django.views import View
 from .models import Comment
 from django.core.paginator import Paginator
@@ -23,7 +25,7 @@ class PostComment(View):
         parent = Comment.objects(id=data['parent_id']).first() if 'parent_id' in data else None
 
         if not blog or not author:
-            return JsonResponse({'error': 'Invalid blog or author'}, status=400)
+            return FastJsonResponse({'error': 'Invalid blog or author'}, status=400)
 
         comment = Comment(
             blog=blog,
@@ -32,12 +34,17 @@ class PostComment(View):
             parent=parent
         )
         comment.save()
-        return JsonResponse(comment.to_json(), status=201)
+        trending.record(blog.id, 'comment')
+        response_cache.invalidate(response_cache.comments_tag(blog.id))
+        return FastJsonResponse(comment.to_json(), status=201)
 
 class GetComments(View):
-    def get(self, request, blog_id):
-        comments = Comment.objects(blog=blog_id, is_deleted=False).order_by('-created_at')
-        return JsonResponse([c.to_json() for c in comments], safe=False)
+    async def get(self, request, blog_id):
+        return await response_cache.acached_json_response(
+            request,
+            [response_cache.comments_tag(blog_id)],
+            lambda: readers.aget_blog_comments(blog_id)
+        )
 
 @method_decorator(csrf_exempt, name='dispatch')
 class LikeComment(View):
@@ -47,7 +54,7 @@ class LikeComment(View):
         comment = Comment.objects(id=comment_id).first()
 
         if not comment or not user:
-            return JsonResponse({'error': 'Invalid comment or user'}, status=400)
+            return FastJsonResponse({'error': 'Invalid comment or user'}, status=400)
 
         if user not in comment.likes:
             comment.likes.append(user)
@@ -56,8 +63,9 @@ class LikeComment(View):
         else:
             comment.likes.remove(user)
 
-        comment.save()
-        return JsonResponse(comment.to_json())
+        comment.save(write_concern=write_concern.for_operation('comment.like'))
+        response_cache.invalidate(response_cache.comments_tag(comment.blog.id))
+        return FastJsonResponse(comment.to_json())
 
 
 # ... (keep all your other view classes as they are)
@@ -71,18 +79,19 @@ class DeleteComment(View):
             comment = Comment.objects(id=comment_id).first()
 
             if not comment or not user:
-                return JsonResponse({'error': 'Invalid comment or user'}, status=400)
+                return FastJsonResponse({'error': 'Invalid comment or user'}, status=400)
 
             if comment.author.username != user.username and user.role not in ['admin', 'moderator']:
-                return JsonResponse({'error': 'Unauthorized'}, status=403)
+                return FastJsonResponse({'error': 'Unauthorized'}, status=403)
 
             comment.is_deleted = True
             comment.save()
+            response_cache.invalidate(response_cache.comments_tag(comment.blog.id))
             
-            return JsonResponse({'message': 'Comment marked as deleted'})
+            return FastJsonResponse({'message': 'Comment marked as deleted'})
             
         except Exception as e:
-            return JsonResponse({
+            return FastJsonResponse({
                 'success': False,
                 'error': str(e)
             }, status=500)
@@ -112,7 +121,7 @@ class GetAllComments(View):
 
             comments_data = [c.to_json() for c in comments_page]
             
-            return JsonResponse({
+            return FastJsonResponse({
                 'success': True,
                 'comments': comments_data,
                 'pagination': {
@@ -124,7 +133,7 @@ class GetAllComments(View):
             })
             
         except Exception as e:
-            return JsonResponse({
+            return FastJsonResponse({
                 'success': False,
                 'error': str(e)
             }, status=500)
@@ -139,20 +148,21 @@ class ReviewComment(View):
             comment = Comment.objects(id=comment_id).first()
             
             if not comment or not reviewer:
-                return JsonResponse({'error': 'Invalid comment or reviewer'}, status=400)
+                return FastJsonResponse({'error': 'Invalid comment or reviewer'}, status=400)
                 
             comment.is_reviewed = True
             comment.reviewed_by = reviewer
             comment.save()
+            response_cache.invalidate(response_cache.comments_tag(comment.blog.id))
             
-            return JsonResponse({
+            return FastJsonResponse({
                 'success': True,
                 'message': 'Comment reviewed successfully',
                 'comment': comment.to_json()
             })
             
         except Exception as e:
-            return JsonResponse({
+            return FastJsonResponse({
                 'success': False,
                 'error': str(e)
             }, status=500)
@@ -168,7 +178,7 @@ class GetCommentsByBlog(View):
             paginator = Paginator(query, per_page)
             page_obj = paginator.page(page)
 
-            return JsonResponse({
+            return FastJsonResponse({
                 'success': True,
                 'comments': [c.to_json() for c in page_obj],
                 'pagination': {
@@ -180,4 +190,4 @@ class GetCommentsByBlog(View):
             })
 
         except Exception as e:
-            return JsonResponse({'error': str(e)}, status=500)
+            return FastJsonResponse({'error': str(e)}, status=500)
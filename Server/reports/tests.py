@@ -1,3 +1,32 @@
-from django.test import TestCase
+import json
+from unittest import mock
+from bson import ObjectId
+from django.test import RequestFactory
+from blogs.models import Blog
+from reports import views
 
-# Create your tests here.
+
+def test_approving_a_report_tombstones_the_blogs_comments(monkeypatch):
+    blog = Blog(id=ObjectId(), title='t', content='c', categories=['tech'])
+    steps = mock.Mock()
+    monkeypatch.setattr(Blog, 'delete', lambda self, *args, **kwargs: steps.delete_blog(self))
+    monkeypatch.setattr(views, 'delete_tracked', steps.delete_tracked)
+    monkeypatch.setattr(views, 'Comment', mock.Mock())
+    monkeypatch.setattr(views, 'User', mock.Mock(**{'objects.get.return_value': mock.Mock(role='moderator')}))
+    report = mock.Mock(blog=blog, **{'to_json.return_value': {}})
+    monkeypatch.setattr(views, 'BlogReport', mock.Mock(**{'objects.get.return_value': report}))
+    monkeypatch.setattr(views.response_cache, 'invalidate', mock.Mock())
+
+    request = RequestFactory().post(
+        f'/reports/{ObjectId()}/approve/', json.dumps({'reviewer_id': str(ObjectId())}),
+        content_type='application/json'
+    )
+    response = views.ApproveReport.as_view()(request, report_id=str(ObjectId()))
+
+    assert response.status_code == 200
+    views.Comment.objects.assert_called_once_with(blog=blog)
+    # Sync clients learn the comments are gone before the blog disappears
+    assert steps.mock_calls == [
+        mock.call.delete_tracked(views.Comment.objects.return_value),
+        mock.call.delete_blog(blog),
+    ]
@@ -1,11 +1,13 @@
 from django.views import View
-from django.http import JsonResponse
+from techsage.renderers import FastJsonResponse
+from techsage import read_routing, response_cache
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 import json
 from .models import BlogReport
 from users.models import User
-from blogs.models import Blog
+from blogs.models import Blog, delete_tracked
+from comments.models import Comment
 import datetime
 from mongoengine.errors import DoesNotExist, ValidationError
 
@@ -20,7 +22,7 @@ class ReportBlog(View):
             details = data.get('details')
 
             if not all([blog, user, reason, details]):
-                return JsonResponse({"error": "Missing required fields"}, status=400)
+                return FastJsonResponse({"error": "Missing required fields"}, status=400)
 
             report = BlogReport(
                 blog=blog,
@@ -31,11 +33,11 @@ class ReportBlog(View):
                 is_reviewed=False
             )
             report.save()
-            return JsonResponse(report.to_json(), status=201)
+            return FastJsonResponse(report.to_json(), status=201)
         except (DoesNotExist, ValidationError) as e:
-            return JsonResponse({"error": str(e)}, status=400)
+            return FastJsonResponse({"error": str(e)}, status=400)
         except Exception as e:
-            return JsonResponse({"error": str(e)}, status=500)
+            return FastJsonResponse({"error": str(e)}, status=500)
 
 class GetReports(View):
     @method_decorator(csrf_exempt)
@@ -57,6 +59,7 @@ class GetReports(View):
             else:
                 # If no status filter is provided or status is 'all', return all reports
                 reports = BlogReport.objects()
+            reports = read_routing.secondary_reads().queryset(reports)
             
             # Filter out reports with invalid references
             valid_reports = []
@@ -68,10 +71,10 @@ class GetReports(View):
                 except:
                     continue
                     
-            return JsonResponse([r.to_json() for r in valid_reports], safe=False)
+            return FastJsonResponse([r.to_json() for r in valid_reports], safe=False)
             
         except Exception as e:
-            return JsonResponse({"error": str(e)}, status=500)
+            return FastJsonResponse({"error": str(e)}, status=500)
 
 @method_decorator(csrf_exempt, name='dispatch')
 class ApproveReport(View):
@@ -81,7 +84,7 @@ class ApproveReport(View):
             reviewer = User.objects.get(id=data.get('reviewer_id'))
 
             if reviewer.role != 'moderator':
-                return JsonResponse({"error": "Unauthorized"}, status=403)
+                return FastJsonResponse({"error": "Unauthorized"}, status=403)
 
             report = BlogReport.objects.get(id=report_id)
             
@@ -94,13 +97,16 @@ class ApproveReport(View):
             
             # Delete the reported blog
             blog = report.blog
+            previous_tags = response_cache.blog_tags(blog)
+            delete_tracked(Comment.objects(blog=blog))
             blog.delete()
+            response_cache.invalidate(*previous_tags, response_cache.comments_tag(blog.id))
             
-            return JsonResponse(report.to_json())
+            return FastJsonResponse(report.to_json())
         except DoesNotExist as e:
-            return JsonResponse({"error": str(e)}, status=404)
+            return FastJsonResponse({"error": str(e)}, status=404)
         except Exception as e:
-            return JsonResponse({"error": str(e)}, status=500)
+            return FastJsonResponse({"error": str(e)}, status=500)
 
 @method_decorator(csrf_exempt, name='dispatch')
 class RejectReport(View):
@@ -110,7 +116,7 @@ class RejectReport(View):
             reviewer = User.objects.get(id=data.get('reviewer_id'))
 
             if reviewer.role != 'moderator':
-                return JsonResponse({"error": "Unauthorized"}, status=403)
+                return FastJsonResponse({"error": "Unauthorized"}, status=403)
 
             report = BlogReport.objects.get(id=report_id)
             
@@ -121,8 +127,8 @@ class RejectReport(View):
             report.reviewed_at = datetime.datetime.utcnow()
             report.save()
             
-            return JsonResponse(report.to_json())
+            return FastJsonResponse(report.to_json())
         except DoesNotExist as e:
-            return JsonResponse({"error": str(e)}, status=404)
+            return FastJsonResponse({"error": str(e)}, status=404)
         except Exception as e:
-            return JsonResponse({"error": str(e)}, status=500)
\ No newline at end of file
+            return FastJsonResponse({"error": str(e)}, status=500)
\ No newline at end of file
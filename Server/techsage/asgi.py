@@ -4,6 +4,8 @@ from django.core.asgi import get_asgi_application
 from channels.routing import ProtocolTypeRouter, URLRouter
 import comments.routing
 import blogs.routing
+from django.conf import settings
+from techsage import clients
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'techsage.settings')
 django.setup()
@@ -14,4 +16,7 @@ application = ProtocolTypeRouter({
         comments.routing.websocket_urlpatterns + 
         blogs.routing.websocket_urlpatterns
     ),
-})
\ No newline at end of file
+})
+
+if settings.MONGO_WARM_UP:
+    clients.warm_up()
\ No newline at end of file
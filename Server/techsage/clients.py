@@ -0,0 +1,84 @@
+"""
+External clients, configured on first use instead of at import.
+
+Settings only record how to reach MongoDB and Cloudinary; nothing here runs
+until a request (or a command) actually needs the service, so management
+commands that never touch the database, and workers before their first
+request, don't pay for SRV lookups, TLS handshakes or client start-up.
+MongoEngine builds its client on the first query through the registered
+'default' alias; mongo() does the same explicitly.
+
+Workers call warm_up() from the ASGI/WSGI entry points, so their first
+requests find a discovered topology and an open pool instead of waiting
+for both.
+"""
+import logging
+import threading
+import time
+from django.conf import settings
+from mongoengine.connection import DEFAULT_CONNECTION_NAME, get_connection
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_cloudinary_configured = False
+
+
+def mongo(alias=DEFAULT_CONNECTION_NAME):
+    """The MongoClient behind ``alias``, created if this is its first use"""
+    with _lock:
+        return get_connection(alias)
+
+
+def mongo_connected(alias=DEFAULT_CONNECTION_NAME):
+    """Whether the client behind ``alias`` has been created yet"""
+    from mongoengine.connection import _connections
+    return alias in _connections
+
+
+def warm_up(alias=DEFAULT_CONNECTION_NAME):
+    """
+    Create the client now and connect it in the background. The client is
+    built here, before any request can race to build its own; the ping
+    that selects a server runs on a daemon thread so start-up isn't
+    blocked, and once a server is known pymongo's pool maintenance opens
+    MONGO_MIN_POOL_SIZE connections.
+    """
+    client = mongo(alias)
+    thread = threading.Thread(target=_ping, args=(client,), name='mongo-warm-up', daemon=True)
+    thread.start()
+    return thread
+
+
+def _ping(client):
+    started = time.perf_counter()
+    try:
+        client.admin.command('ping')
+    except PyMongoError as e:
+        logger.warning("Mongo warm-up failed: %s", e)
+    else:
+        logger.info("Mongo warm-up connected in %.0f ms", (time.perf_counter() - started) * 1000)
+
+
+def configure_cloudinary():
+    global _cloudinary_configured
+    if _cloudinary_configured:
+        return
+    with _lock:
+        if not _cloudinary_configured:
+            import cloudinary
+            cloudinary.config(
+                cloud_name=settings.CLOUDINARY_CLOUD_NAME,
+                api_key=settings.CLOUDINARY_API_KEY,
+                api_secret=settings.CLOUDINARY_API_SECRET,
+                secure=True,
+            )
+            _cloudinary_configured = True
+
+
+def cloudinary_uploader():
+    """cloudinary.uploader, configured from settings"""
+    configure_cloudinary()
+    import cloudinary.uploader
+    return cloudinary.uploader
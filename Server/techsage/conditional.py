@@ -0,0 +1,53 @@
+import calendar
+import hashlib
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from .renderers import dumps
+
+
+def make_etag(*parts):
+    """Strong ETag over raw bytes or any JSON-serializable values"""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else dumps(part))
+        digest.update(b'\0')
+    return f'"{digest.hexdigest()}"'
+
+
+def to_timestamp(value):
+    """Naive UTC datetime from Mongo to a Unix timestamp, as Last-Modified wants"""
+    return calendar.timegm(value.utctimetuple()) if value else None
+
+
+def set_validators(response, etag=None, last_modified=None):
+    if etag:
+        response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def not_modified(request, etag=None, last_modified=None):
+    """
+    A 304 response carrying the validators if the request's If-None-Match or
+    If-Modified-Since says the client already has this representation,
+    otherwise None.
+    """
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None or response.status_code != 304:
+        return None
+    return set_validators(response, etag, last_modified)
+
+
+def conditional_response(request, etag, last_modified, build):
+    """
+    Answer 304 when the client's copy is current, otherwise return build()
+    with ETag/Last-Modified attached to successful responses.
+    """
+    response = not_modified(request, etag, last_modified)
+    if response is not None:
+        return response
+    response = build()
+    if response.status_code == 200:
+        set_validators(response, etag, last_modified)
+    return response
@@ -0,0 +1,330 @@
+"""
+In-process metrics in the Prometheus text format.
+
+Counters, gauges and histograms live in a module-level registry and are
+rendered by MetricsView at /metrics/. Values are per process; scrape every
+worker. Request latency and response sizes are recorded by
+MetricsMiddleware, Mongo commands by MongoMetricsListener and connection
+pool checkouts by MongoPoolMetricsListener (both registered on the
+connection in settings), websocket connections and group sends by
+ConsumerMetricsMixin, and calls to outside services with external_call().
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+from django.views import View
+from pymongo import monitoring
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+_registry = []
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(label, '')) for label in self.labels)
+
+    def _label_text(self, key, extra=()):
+        pairs = list(zip(self.labels, key)) + list(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+    def collect(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            items = sorted(self._values.items())
+            lines.extend(self._samples(items))
+        return lines
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self, items):
+        return [f'{self.name}{self._label_text(key)} {_number(value)}' for key, value in items]
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket counts (last one is +Inf), then the sum
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][bisect_left(self.buckets, value)] += 1
+            state[1] += value
+
+    def _samples(self, items):
+        lines = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else _number(bound)
+                lines.append(f'{self.name}_bucket{self._label_text(key, [("le", le)])} {cumulative}')
+            lines.append(f'{self.name}_sum{self._label_text(key)} {_number(total)}')
+            lines.append(f'{self.name}_count{self._label_text(key)} {cumulative}')
+        return lines
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render():
+    lines = []
+    for metric in list(_registry):
+        lines.extend(metric.collect())
+    return '\n'.join(lines) + '\n'
+
+
+REQUEST_DURATION = Histogram(
+    'techsage_http_request_duration_seconds', 'Time spent in Django views.', ('view', 'method', 'status')
+)
+RESPONSE_SIZE = Histogram(
+    'techsage_http_response_size_bytes', 'Size of non-streaming response bodies.', ('view',), buckets=SIZE_BUCKETS
+)
+MONGO_COMMAND_DURATION = Histogram(
+    'techsage_mongo_command_duration_seconds', 'Mongo command latency.', ('collection', 'command')
+)
+MONGO_COMMAND_FAILURES = Counter(
+    'techsage_mongo_command_failures_total', 'Mongo commands that returned an error.', ('collection', 'command')
+)
+MONGO_POOL_CHECKOUT_WAIT = Histogram(
+    'techsage_mongo_pool_checkout_wait_seconds', 'Time spent waiting for a pooled Mongo connection.', ('address',),
+    buckets=POOL_WAIT_BUCKETS
+)
+MONGO_POOL_CHECKOUT_FAILURES = Counter(
+    'techsage_mongo_pool_checkout_failures_total', 'Connection checkouts that timed out or failed.',
+    ('address', 'reason')
+)
+MONGO_POOL_CONNECTIONS_IN_USE = Gauge(
+    'techsage_mongo_pool_connections_in_use', 'Pooled Mongo connections checked out right now.', ('address',)
+)
+MONGO_POOL_CONNECTIONS = Gauge(
+    'techsage_mongo_pool_connections', 'Open Mongo connections, idle or in use.', ('address',)
+)
+WEBSOCKET_CONNECTIONS = Gauge(
+    'techsage_websocket_connections', 'Open websocket connections.', ('consumer',)
+)
+CHANNEL_SEND_DURATION = Histogram(
+    'techsage_channel_layer_send_duration_seconds', 'Channel layer group_send latency.', ('consumer',)
+)
+EXTERNAL_CALL_DURATION = Histogram(
+    'techsage_external_call_duration_seconds', 'Calls to Cloudinary, SMTP and the plagiarism API.',
+    ('service', 'outcome')
+)
+
+
+@contextmanager
+def external_call(service):
+    """Time a call to an outside service, labelled ok or error"""
+    started = time.perf_counter()
+    outcome = 'error'
+    try:
+        yield
+        outcome = 'ok'
+    finally:
+        EXTERNAL_CALL_DURATION.observe(time.perf_counter() - started, service=service, outcome=outcome)
+
+
+class MongoMetricsListener(monitoring.CommandListener):
+    """Observes command latency by collection and command name"""
+
+    def __init__(self):
+        self._started = {}
+        self._lock = threading.Lock()
+
+    def _labels(self, event):
+        with self._lock:
+            collection = self._started.pop((event.connection_id, event.request_id), '')
+        return {'collection': collection, 'command': event.command_name}
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        with self._lock:
+            self._started[(event.connection_id, event.request_id)] = collection if isinstance(collection, str) else ''
+
+    def succeeded(self, event):
+        MONGO_COMMAND_DURATION.observe(event.duration_micros / 1e6, **self._labels(event))
+
+    def failed(self, event):
+        labels = self._labels(event)
+        MONGO_COMMAND_DURATION.observe(event.duration_micros / 1e6, **labels)
+        MONGO_COMMAND_FAILURES.inc(**labels)
+
+
+mongo_listener = MongoMetricsListener()
+
+
+class MongoPoolMetricsListener(monitoring.ConnectionPoolListener):
+    """
+    Times connection checkouts and tracks open and in-use connections per
+    server. Checkouts happen on the thread that runs the command, so the
+    start of a wait is kept per thread.
+    """
+
+    def __init__(self):
+        self._waits = threading.local()
+
+    def _address(self, event):
+        host, port = event.address
+        return f'{host}:{port}'
+
+    def _wait(self, event):
+        started = getattr(self._waits, 'started', {}).pop(event.address, None)
+        return time.perf_counter() - started if started is not None else None
+
+    def connection_check_out_started(self, event):
+        if not hasattr(self._waits, 'started'):
+            self._waits.started = {}
+        self._waits.started[event.address] = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        address = self._address(event)
+        waited = self._wait(event)
+        if waited is not None:
+            MONGO_POOL_CHECKOUT_WAIT.observe(waited, address=address)
+        MONGO_POOL_CONNECTIONS_IN_USE.inc(address=address)
+
+    def connection_check_out_failed(self, event):
+        address = self._address(event)
+        waited = self._wait(event)
+        if waited is not None:
+            MONGO_POOL_CHECKOUT_WAIT.observe(waited, address=address)
+        MONGO_POOL_CHECKOUT_FAILURES.inc(address=address, reason=event.reason)
+
+    def connection_checked_in(self, event):
+        MONGO_POOL_CONNECTIONS_IN_USE.dec(address=self._address(event))
+
+    def connection_created(self, event):
+        MONGO_POOL_CONNECTIONS.inc(address=self._address(event))
+
+    def connection_closed(self, event):
+        MONGO_POOL_CONNECTIONS.dec(address=self._address(event))
+
+    def pool_created(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+
+pool_listener = MongoPoolMetricsListener()
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        response = self.get_response(request)
+        return self.observe(request, response, started)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        return self.observe(request, response, started)
+
+    def observe(self, request, response, started):
+        match = getattr(request, 'resolver_match', None)
+        # Unmatched paths share one label so scanners can't blow up cardinality
+        view = match.view_name if match else 'unmatched'
+        REQUEST_DURATION.observe(
+            time.perf_counter() - started, view=view, method=request.method, status=response.status_code
+        )
+        if not getattr(response, 'streaming', False):
+            RESPONSE_SIZE.observe(len(response.content), view=view)
+        return response
+
+
+class ConsumerMetricsMixin:
+    """Counts open websockets and times group sends for a consumer"""
+
+    async def websocket_connect(self, message):
+        WEBSOCKET_CONNECTIONS.inc(consumer=type(self).__name__)
+        await super().websocket_connect(message)
+
+    async def websocket_disconnect(self, message):
+        WEBSOCKET_CONNECTIONS.dec(consumer=type(self).__name__)
+        await super().websocket_disconnect(message)
+
+    async def group_send(self, group, message):
+        started = time.perf_counter()
+        try:
+            await self.channel_layer.group_send(group, message)
+        finally:
+            CHANNEL_SEND_DURATION.observe(time.perf_counter() - started, consumer=type(self).__name__)
+
+
+class MetricsView(View):
+    """
+    Prometheus scrape target, guarded by METRICS_TOKEN. Without a token it
+    is only served under DEBUG, and otherwise answers 404.
+    """
+
+    def get(self, request):
+        token = settings.METRICS_TOKEN
+        if not token:
+            if not settings.DEBUG:
+                raise Http404
+        elif not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return HttpResponse('Unauthorized', status=401, content_type='text/plain')
+        return HttpResponse(render(), content_type=CONTENT_TYPE)
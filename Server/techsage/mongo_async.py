@@ -0,0 +1,69 @@
+"""
+Async access to MongoEngine's database for views that run on the event loop
+under Daphne.
+
+Blocking pymongo calls run on a dedicated pool of MONGO_ASYNC_WORKERS
+threads and are awaited, which is what Motor does internally; Motor itself
+needs pymongo 4 on current Pythons, and this keeps the one client, pool and
+command listeners MongoEngine already holds. Only the database round trip
+occupies a thread: clients on slow networks are served by the event loop.
+The caller's context is copied into the worker, so the query budget and
+metrics attribute commands to the request that issued them.
+"""
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from techsage import read_routing
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(settings.MONGO_ASYNC_WORKERS, thread_name_prefix='mongo-async')
+    return _executor
+
+
+async def run(fn, *args, **kwargs):
+    """Await a blocking call on the Mongo worker pool"""
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(
+        get_executor(), functools.partial(context.run, fn, *args, **kwargs)
+    )
+
+
+class AsyncCollection:
+    """
+    Awaitable versions of the collection methods async views use. Cursors
+    are drained on the worker, so find() and aggregate() return lists.
+    Calls go where ``reads`` routes them, in its causal session if any.
+    """
+
+    def __init__(self, document, reads=read_routing.PRIMARY):
+        self.document = document
+        self.reads = reads
+
+    def _call(self, method, *args, **kwargs):
+        with self.reads.open(self.document) as (collection, session):
+            result = getattr(collection, method)(*args, session=session, **kwargs)
+            return list(result) if method in ('find', 'aggregate') else result
+
+    async def find_one(self, *args, **kwargs):
+        return await run(self._call, 'find_one', *args, **kwargs)
+
+    async def count_documents(self, *args, **kwargs):
+        return await run(self._call, 'count_documents', *args, **kwargs)
+
+    async def find(self, *args, **kwargs):
+        return await run(self._call, 'find', *args, **kwargs)
+
+    async def aggregate(self, pipeline, **kwargs):
+        return await run(self._call, 'aggregate', pipeline, **kwargs)
+
+
+def collection(document, reads=read_routing.PRIMARY):
+    """The async collection behind a MongoEngine document class"""
+    return AsyncCollection(document, reads)
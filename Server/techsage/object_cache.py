@@ -0,0 +1,140 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+
+MISSING = object()
+
+
+class LFUCache:
+    """
+    Size-bounded in-process cache that evicts the least frequently used
+    entry (least recently used among ties) in O(1). Entries expire after
+    ``ttl`` seconds regardless of how often they are read.
+    """
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = {}  # key -> [value, expires_at, frequency]
+        self._buckets = {}  # frequency -> OrderedDict of keys
+        self._min_frequency = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _touch(self, key, entry):
+        frequency = entry[2]
+        bucket = self._buckets[frequency]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[frequency]
+            if self._min_frequency == frequency:
+                self._min_frequency = frequency + 1
+        entry[2] = frequency + 1
+        self._buckets.setdefault(frequency + 1, OrderedDict())[key] = None
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        bucket = self._buckets[entry[2]]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[entry[2]]
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            if entry[1] < time.monotonic():
+                self._remove(key)
+                return MISSING
+            self._touch(key, entry)
+            return entry[0]
+
+    def set(self, key, value):
+        with self._lock:
+            if key in self._entries:
+                entry = self._entries[key]
+                entry[0] = value
+                entry[1] = time.monotonic() + self.ttl
+                self._touch(key, entry)
+                return
+            if len(self._entries) >= self.max_entries:
+                bucket = self._buckets[self._min_frequency]
+                victim, _ = bucket.popitem(last=False)
+                if not bucket:
+                    del self._buckets[self._min_frequency]
+                del self._entries[victim]
+            self._entries[key] = [value, time.monotonic() + self.ttl, 1]
+            self._buckets.setdefault(1, OrderedDict())[key] = None
+            self._min_frequency = 1
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+            self._min_frequency = 0
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls for the same key into one: the first caller
+    runs the function, the rest wait for it and share its result or error.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+class AsyncSingleFlight:
+    """SingleFlight for coroutines on one event loop: followers await the leader's task"""
+
+    def __init__(self):
+        self._calls = {}
+
+    async def do(self, key, fn):
+        task = self._calls.get(key)
+        if task is None:
+            task = self._calls[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        # A cancelled follower must not cancel the load the others share
+        return await asyncio.shield(task)
@@ -0,0 +1,195 @@
+"""
+Per-request accounting of Mongo commands.
+
+A pymongo command listener (registered on the connection in settings)
+records every command issued while a QueryLog is active: its shape, which
+is the command, collection and filter with the values stripped, and how
+long it took. QueryBudgetMiddleware opens a log per request, logs N+1
+suspects (the same shape repeated QUERY_BUDGET_N_PLUS_ONE times or more)
+and requests over QUERY_BUDGET_WARN commands. Tests use assert_max_queries
+to pin an endpoint's command budget.
+"""
+import logging
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('query_log', default=None)
+
+# Where each command keeps its filter
+_FILTER_KEYS = {'find': 'filter', 'count': 'query', 'distinct': 'query', 'findAndModify': 'query'}
+_BULK_KEYS = {'update': ('updates', 'q'), 'delete': ('deletes', 'q')}
+
+
+def strip_values(value):
+    """Keep field names and operators, replace everything else with '?'"""
+    if isinstance(value, dict):
+        return {key: strip_values(item) for key, item in value.items()}
+    if isinstance(value, list) and value and all(isinstance(item, dict) for item in value):
+        return [strip_values(item) for item in value]
+    return '?'
+
+
+def command_shape(command_name, command):
+    """A hashable description of a command that ignores literal values"""
+    collection = command.get(command_name)
+    if not isinstance(collection, str):
+        return command_name, None, None
+    if command_name in _FILTER_KEYS:
+        query = command.get(_FILTER_KEYS[command_name]) or {}
+    elif command_name == 'aggregate':
+        pipeline = command.get('pipeline') or []
+        query = [{stage: strip_values(body) if stage == '$match' else '?'}
+                 for step in pipeline for stage, body in step.items()]
+        return command_name, collection, repr(query)
+    elif command_name in _BULK_KEYS:
+        documents, key = _BULK_KEYS[command_name]
+        statements = command.get(documents) or [{}]
+        query = statements[0].get(key) or {}
+    else:
+        query = {}
+    return command_name, collection, repr(strip_values(query))
+
+
+def format_shape(shape):
+    command_name, collection, query = shape
+    return ' '.join(part for part in (command_name, collection, query) if part)
+
+
+class QueryLog:
+    """
+    Commands seen while this log was active, by shape, with total time.
+    Logs opened inside another (a request inside a test) report to both.
+    """
+
+    def __init__(self, parent=None):
+        self.parent = parent
+        self.shapes = Counter()
+        self.count = 0
+        self.duration = 0.0
+
+    def record(self, shape):
+        self.count += 1
+        self.shapes[shape] += 1
+        if self.parent is not None:
+            self.parent.record(shape)
+
+    def add_time(self, seconds):
+        self.duration += seconds
+        if self.parent is not None:
+            self.parent.add_time(seconds)
+
+    def repeated(self, threshold):
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+    def summary(self):
+        return '\n'.join(f"{count:>4}x {format_shape(shape)}" for shape, count in self.shapes.most_common())
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Feeds pymongo command events into the active QueryLog, if any"""
+
+    def started(self, event):
+        log = _current.get()
+        if log is not None:
+            log.record(command_shape(event.command_name, event.command))
+
+    def succeeded(self, event):
+        log = _current.get()
+        if log is not None:
+            log.add_time(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        log = _current.get()
+        if log is not None:
+            log.add_time(event.duration_micros / 1e6)
+
+
+listener = CommandCounter()
+
+
+@contextmanager
+def track():
+    """Collect the commands issued in this context into a new QueryLog"""
+    log = QueryLog(parent=_current.get())
+    token = _current.set(log)
+    try:
+        yield log
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def assert_max_queries(limit):
+    """Fail if the block issues more than ``limit`` Mongo commands"""
+    with track() as log:
+        yield log
+    if log.count > limit:
+        raise AssertionError(f"{log.count} Mongo commands issued, budget is {limit}:\n{log.summary()}")
+
+
+class QueryBudgetMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        log = QueryLog(parent=_current.get())
+        token = _current.set(log)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, log)
+
+    async def __acall__(self, request):
+        log = QueryLog(parent=_current.get())
+        token = _current.set(log)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, log)
+
+    def finish(self, request, response, log):
+        if getattr(response, 'streaming', False) and not response.is_async:
+            # Streamed bodies query the database while they are being sent
+            response.streaming_content = self._stream(response.streaming_content, log, request)
+        else:
+            self.report(request, log)
+        return response
+
+    def _stream(self, content, log, request):
+        iterator = iter(content)
+        while True:
+            token = _current.set(log)
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                break
+            finally:
+                _current.reset(token)
+            yield chunk
+        self.report(request, log)
+
+    def report(self, request, log):
+        path = request.get_full_path()
+        for shape, count in log.repeated(settings.QUERY_BUDGET_N_PLUS_ONE):
+            logger.warning("Possible N+1 on %s %s: %dx %s", request.method, path, count, format_shape(shape))
+        if log.count > settings.QUERY_BUDGET_WARN:
+            logger.warning("%s %s issued %d Mongo commands (%.1f ms)\n%s",
+                           request.method, path, log.count, log.duration * 1000, log.summary())
+        else:
+            logger.debug("%s %s issued %d Mongo commands (%.1f ms)",
+                         request.method, path, log.count, log.duration * 1000)
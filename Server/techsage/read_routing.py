@@ -0,0 +1,177 @@
+"""
+Read preference per view, with read-your-writes for users who just wrote.
+
+Views whose reads tolerate a little lag (lists, search, admin analytics)
+take secondary_reads(): secondaryPreferred, never from a secondary more than
+MONGO_MAX_STALENESS_SECONDS behind. Everything else, including views whose
+output goes into the response cache, keeps reading from the primary. A
+recomputation from a lagging secondary right after an invalidation would
+cache stale data until the entry expires.
+
+A user who has just voted, published or commented must see that on the
+next page even when a secondary serves it. CausalConsistencyMiddleware
+takes the operation time of every write a request makes from the command
+replies and returns it as a signed token, in the X-Mongo-After response
+header and in a cookie. The SPA calls the API cross-site without
+credentials, so it echoes the header on its next requests; same-site
+clients can rely on the cookie. While the token lives, that user's
+secondary reads run in a causally consistent session advanced to
+that time, so the server holds the read until the secondary has applied
+the write. MongoEngine 0.27 can't pass a session, so routed querysets
+read from the primary for such users instead.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from bson import json_util
+from django.conf import settings
+from django.core import signing
+from pymongo import monitoring
+from pymongo.read_preferences import SecondaryPreferred
+
+COOKIE_NAME = 'mongo_after'
+HEADER_NAME = 'X-Mongo-After'
+SALT = 'techsage.read_routing'
+
+WRITE_COMMANDS = {'insert', 'update', 'delete', 'findAndModify'}
+
+_current = ContextVar('read_routing_request', default=None)
+
+
+class CausalState:
+    """What the current request must observe, and the latest write it made"""
+
+    def __init__(self, after=None):
+        self.after = after
+        self.written = None
+
+    def record(self, operation_time, cluster_time):
+        if self.written is None or operation_time > self.written['operationTime']:
+            self.written = {'operationTime': operation_time, '$clusterTime': cluster_time}
+
+
+class Reads:
+    """Where a view's reads go: a read preference and the causal token to honour"""
+
+    def __init__(self, preference=None, after=None):
+        self.preference = preference
+        self.after = after
+
+    def collection(self, document):
+        collection = document._get_collection()
+        if self.preference is None:
+            return collection
+        return collection.with_options(read_preference=self.preference)
+
+    @contextmanager
+    def open(self, document):
+        """Yield the routed collection and the session its reads must pass"""
+        collection = self.collection(document)
+        if self.preference is None or self.after is None:
+            yield collection, None
+            return
+        with collection.database.client.start_session(causal_consistency=True) as session:
+            if self.after.get('$clusterTime'):
+                session.advance_cluster_time(self.after['$clusterTime'])
+            session.advance_operation_time(self.after['operationTime'])
+            yield collection, session
+
+    def queryset(self, queryset):
+        if self.preference is None or self.after is not None:
+            return queryset
+        return queryset.read_preference(self.preference)
+
+
+PRIMARY = Reads()
+
+
+def secondary_preferred():
+    return SecondaryPreferred(max_staleness=settings.MONGO_MAX_STALENESS_SECONDS)
+
+
+def secondary_reads():
+    """Reads for a view that can be served by a slightly stale secondary"""
+    if not settings.MONGO_SECONDARY_READS:
+        return PRIMARY
+    state = _current.get()
+    return Reads(secondary_preferred(), state.after if state else None)
+
+
+def encode_token(written):
+    return signing.dumps(json_util.dumps(written), salt=SALT, compress=True)
+
+
+def decode_token(value):
+    """The write a client has to observe, or None for a missing, forged or expired token"""
+    if not value:
+        return None
+    try:
+        return json_util.loads(signing.loads(value, salt=SALT, max_age=settings.MONGO_MAX_STALENESS_SECONDS))
+    except (signing.BadSignature, ValueError, TypeError):
+        return None
+
+
+class CausalListener(monitoring.CommandListener):
+    """Records the operation time of writes made by the current request"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        if event.command_name not in WRITE_COMMANDS:
+            return
+        state = _current.get()
+        operation_time = event.reply.get('operationTime')
+        if state is not None and operation_time is not None:
+            state.record(operation_time, event.reply.get('$clusterTime'))
+
+    def failed(self, event):
+        pass
+
+
+listener = CausalListener()
+
+
+class CausalConsistencyMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = self.start(request)
+        token = _current.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(response, state)
+
+    async def __acall__(self, request):
+        state = self.start(request)
+        token = _current.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(response, state)
+
+    def start(self, request):
+        value = request.headers.get(HEADER_NAME) or request.COOKIES.get(COOKIE_NAME)
+        return CausalState(decode_token(value))
+
+    def finish(self, response, state):
+        if state.written is not None:
+            value = encode_token(state.written)
+            response[HEADER_NAME] = value
+            # After MONGO_MAX_STALENESS_SECONDS every eligible secondary has the write
+            response.set_cookie(
+                COOKIE_NAME, value, max_age=settings.MONGO_MAX_STALENESS_SECONDS,
+                httponly=True, secure=True, samesite='None'
+            )
+        return response
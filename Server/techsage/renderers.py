@@ -0,0 +1,163 @@
+from decimal import Decimal
+import orjson
+from bson import ObjectId
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.functional import Promise
+from rest_framework.renderers import BaseRenderer
+from rest_framework.settings import api_settings
+from techsage import mongo_async
+
+# orjson natively handles datetimes, dates, UUIDs and dict/list subclasses
+# (DRF's ReturnDict/ReturnList); anything else goes through _default.
+BASE_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj):
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, Promise):
+        return str(obj)
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(data, compact=True):
+    """Serialize to UTF-8 JSON bytes. Non-compact output is indented by two spaces."""
+    options = BASE_OPTIONS if compact else BASE_OPTIONS | orjson.OPT_INDENT_2
+    return orjson.dumps(data, default=_default, option=options)
+
+
+class ORJSONRenderer(BaseRenderer):
+    """
+    Drop-in replacement for DRF's JSONRenderer backed by orjson. Honours
+    the COMPACT_JSON setting and an ``indent`` media type parameter, which
+    the browsable API uses for its pretty-printed view.
+    """
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return dumps(data, compact=not self._wants_indent(accepted_media_type, renderer_context or {}))
+
+    def _wants_indent(self, accepted_media_type, renderer_context):
+        if renderer_context.get('indent'):
+            return True
+        if accepted_media_type and 'indent=' in accepted_media_type:
+            return True
+        return not api_settings.COMPACT_JSON
+
+
+class FastJsonResponse(HttpResponse):
+    """
+    JsonResponse equivalent for plain Django views, serialized with orjson.
+    Like JsonResponse, non-dict data must be passed with safe=False.
+    """
+
+    def __init__(self, data, safe=True, compact=True, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError(
+                "In order to allow non-dict objects to be serialized set the "
+                "safe parameter to False."
+            )
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=dumps(data, compact=compact), **kwargs)
+
+
+STREAM_CHUNK_SIZE = 100
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+
+
+def _batched(items, size=STREAM_CHUNK_SIZE):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_json_array(items, envelope=None, key='results'):
+    """
+    Encode an iterable as a JSON array, one chunk per batch of items. With an
+    envelope dict the array is emitted as its ``key`` member, so the streamed
+    body has the same shape as the buffered response.
+    """
+    if envelope is None:
+        prefix, suffix = b'[', b']'
+    else:
+        head = dumps(envelope)
+        prefix = head[:-1] + (b',' if len(head) > 2 else b'') + dumps(key) + b':['
+        suffix = b']}'
+    yield prefix
+    separator = b''
+    for batch in _batched(items):
+        yield separator + b','.join(dumps(item) for item in batch)
+        separator = b','
+    yield suffix
+
+
+def iter_ndjson(items):
+    """Encode an iterable as newline-delimited JSON, one chunk per batch of items"""
+    for batch in _batched(items):
+        yield b''.join(dumps(item) + b'\n' for item in batch)
+
+
+def wants_ndjson(request):
+    """NDJSON is opted into with ?stream=ndjson or an application/x-ndjson Accept header"""
+    return (
+        request.GET.get('stream') == 'ndjson'
+        or NDJSON_MEDIA_TYPE in request.META.get('HTTP_ACCEPT', '')
+    )
+
+
+async def aiter_chunks(chunks):
+    """
+    Serve a blocking chunk generator to an ASGI server. Each chunk is
+    produced on the Mongo worker pool and sent before the next is pulled.
+    """
+    done = object()
+    try:
+        while (chunk := await mongo_async.run(next, chunks, done)) is not done:
+            yield chunk
+    finally:
+        # Closes the cursor when the client goes away mid-stream
+        if hasattr(chunks, 'close'):
+            await mongo_async.run(chunks.close)
+
+
+def stream_chunks(request, chunks):
+    """
+    Streaming content for ``request``. Django drains a synchronous iterator
+    into a list before an ASGI server sends any of it, so under Daphne the
+    generator is handed over as an async iterator instead.
+    """
+    if isinstance(getattr(request, '_request', request), ASGIRequest):
+        return aiter_chunks(chunks)
+    return chunks
+
+
+def streaming_json_response(request, items, envelope=None, key='results'):
+    """
+    Stream an iterable as a JSON array (wrapped in ``envelope`` if given) or
+    as NDJSON when the client asks for it. Memory stays bounded by the chunk
+    size as long as ``items`` is a lazy iterator such as a cursor.
+    """
+    if wants_ndjson(request):
+        return StreamingHttpResponse(stream_chunks(request, iter_ndjson(items)), content_type=NDJSON_MEDIA_TYPE)
+    return StreamingHttpResponse(
+        stream_chunks(request, iter_json_array(items, envelope, key)),
+        content_type='application/json'
+    )
@@ -0,0 +1,380 @@
+"""
+Two-tier cache for public read responses.
+
+Entries live in a per-process LRU and, when Redis is reachable, in Redis so
+every worker shares them. Each entry is tagged (blog id, author, category,
+...) and records the version of each tag at the time it was built. Writes
+call invalidate() to bump tag versions, which makes every entry built
+before the write stale at once without having to find and delete them.
+Tag versions live in Redis when it is up and in process memory otherwise.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+import orjson
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from . import edge_cache
+from .conditional import make_etag, not_modified, set_validators
+from .renderers import dumps, wants_ndjson
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'rc:'
+TAG_PREFIX = 'rc:tag:'
+# After a Redis error the shared tier is skipped for this many seconds
+REDIS_RETRY_SECONDS = 30
+
+
+def blog_tag(blog_id):
+    return f'blog:{blog_id}'
+
+
+def author_tag(username):
+    return f'author:{username}'
+
+
+def category_tag(category):
+    return f'category:{category}'
+
+
+def comments_tag(blog_id):
+    return f'comments:{blog_id}'
+
+
+# Unfiltered public blog listings
+BLOGS_TAG = 'blogs'
+BADGES_TAG = 'badges'
+
+
+def blog_tags(blog, listed=None):
+    """
+    Tags touched by a write to ``blog``. Listing tags (authors, categories,
+    all blogs) are only included when the blog is, or was, publicly listed,
+    so draft autosaves don't flush the public feeds.
+    """
+    tags = [blog_tag(blog.id)]
+    if listed is None:
+        listed = blog.is_published and not blog.is_deleted
+    if listed:
+        tags.append(BLOGS_TAG)
+        tags.extend(author_tag(author.username) for author in blog.authors if hasattr(author, 'username'))
+        tags.extend(category_tag(category) for category in blog.categories or ())
+    return tags
+
+
+class LRUCache:
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, timeout):
+        with self._lock:
+            self._data[key] = (time.monotonic() + timeout, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class ResponseCache:
+    def __init__(self):
+        self.local = LRUCache(settings.RESPONSE_CACHE_LOCAL_ENTRIES)
+        self._local_tags = {}
+        self._tag_lock = threading.Lock()
+        self._redis = None
+        self._redis_down_until = 0
+
+    @property
+    def enabled(self):
+        return settings.RESPONSE_CACHE_TIMEOUT > 0
+
+    def _client(self):
+        url = settings.RESPONSE_CACHE_REDIS_URL
+        if not url or time.monotonic() < self._redis_down_until:
+            return None
+        if self._redis is None:
+            import redis
+            self._redis = redis.Redis.from_url(url, socket_timeout=0.1, socket_connect_timeout=0.1)
+        return self._redis
+
+    def _redis_call(self, fn):
+        client = self._client()
+        if client is None:
+            return None
+        try:
+            return fn(client)
+        except Exception as e:
+            logger.warning("Response cache: Redis unavailable, using local tier only (%s)", e)
+            self._redis_down_until = time.monotonic() + REDIS_RETRY_SECONDS
+            return None
+
+    def tag_versions(self, tags):
+        tags = sorted(set(tags))
+        if not tags:
+            return {}
+        values = self._redis_call(lambda r: r.mget([TAG_PREFIX + tag for tag in tags]))
+        if values is None:
+            with self._tag_lock:
+                return {tag: self._local_tags.get(tag, 0) for tag in tags}
+        return {tag: int(v) if v else 0 for tag, v in zip(tags, values)}
+
+    def local_version(self, tag):
+        """Version of a tag as last bumped by a write in this process"""
+        with self._tag_lock:
+            return self._local_tags.get(tag, 0)
+
+    def invalidate(self, *tags):
+        tags = set(tags)
+        if not tags:
+            return
+        with self._tag_lock:
+            for tag in tags:
+                self._local_tags[tag] = self._local_tags.get(tag, 0) + 1
+
+        def bump(r):
+            pipe = r.pipeline(transaction=False)
+            for tag in tags:
+                pipe.incr(TAG_PREFIX + tag)
+            return pipe.execute()
+        self._redis_call(bump)
+
+    def get(self, key):
+        """Return (content_type, body, etag) for a fresh entry, or None"""
+        entry = self.local.get(key)
+        if entry is None:
+            raw = self._redis_call(lambda r: r.get(KEY_PREFIX + key))
+            if raw is None:
+                return None
+            header, _, body = raw.partition(b'\n')
+            meta = orjson.loads(header)
+            entry = (meta['tags'], meta['content_type'], body, meta['etag'])
+            self.local.set(key, entry, settings.RESPONSE_CACHE_TIMEOUT)
+        tags, content_type, body, etag = entry
+        if self.tag_versions(tags) != tags:
+            return None
+        return content_type, body, etag
+
+    def set(self, key, tag_versions, content_type, body):
+        """Store a body and return its ETag"""
+        etag = make_etag(body)
+        if len(body) > settings.RESPONSE_CACHE_MAX_BYTES:
+            return etag
+        timeout = settings.RESPONSE_CACHE_TIMEOUT
+        self.local.set(key, (tag_versions, content_type, body, etag), timeout)
+        header = orjson.dumps({'tags': tag_versions, 'content_type': content_type, 'etag': etag})
+        self._redis_call(lambda r: r.set(KEY_PREFIX + key, header + b'\n' + body, ex=timeout))
+        return etag
+
+    def clear(self):
+        self.local.clear()
+        with self._tag_lock:
+            self._local_tags.clear()
+
+
+_cache = None
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache()
+    return _cache
+
+
+def invalidate(*tags, purge=True):
+    """
+    Mark everything tagged with ``tags`` stale, and purge the same surrogate
+    keys from the CDN unless the content was never cached there.
+    """
+    get_cache().invalidate(*tags)
+    if purge:
+        edge_cache.purge(*tags)
+
+
+def request_key(request):
+    """Cache key for a request: path plus its query parameters in a stable order"""
+    params = sorted((k, v) for k in request.GET for v in request.GET.getlist(k))
+    return request.path + '?' + '&'.join(f'{k}={v}' for k, v in params)
+
+
+def cached_payload(key, tags, build):
+    """
+    Return the JSON-compatible result of build(), cached under ``key`` and
+    tagged with ``tags``. Returns None without caching when build() does.
+    """
+    cache = get_cache()
+    if not cache.enabled:
+        return build()
+    hit = cache.get(key)
+    if hit is not None:
+        return orjson.loads(hit[1])
+    versions = cache.tag_versions(tags)
+    data = build()
+    if data is not None:
+        cache.set(key, versions, 'application/json', dumps(data))
+    return data
+
+
+def cached_json_response(request, tags, build, key=None):
+    """
+    Serve a JSON response from the cache, or build it with build(), which
+    returns the data or an HttpResponse for errors. Only successful bodies
+    are cached. Responses carry a strong ETag of the body, and a matching
+    If-None-Match is answered with 304 straight from the cache entry.
+    """
+    cache = get_cache()
+    if not cache.enabled:
+        result = build()
+        if isinstance(result, HttpResponse):
+            return result
+        body = dumps(result)
+        return edge_cache.apply_cache_headers(_json_response(body, make_etag(body)), tags)
+    key = key or request_key(request)
+    hit = cache.get(key)
+    if hit is not None:
+        content_type, body, etag = hit
+        response = not_modified(request, etag) or _json_response(body, etag, content_type)
+        return edge_cache.apply_cache_headers(response, tags)
+    versions = cache.tag_versions(tags)
+    result = build()
+    if isinstance(result, HttpResponse):
+        return result
+    body = dumps(result)
+    etag = cache.set(key, versions, 'application/json', body)
+    response = not_modified(request, etag) or _json_response(body, etag)
+    return edge_cache.apply_cache_headers(response, tags)
+
+
+async def _offload(fn, *args):
+    """Run a cache call off the event loop when it may have to wait on Redis"""
+    if get_cache()._client() is None:
+        return fn(*args)
+    return await sync_to_async(fn, thread_sensitive=False)(*args)
+
+
+async def acached_payload(key, tags, build):
+    """cached_payload for async code; build is a coroutine function"""
+    cache = get_cache()
+    if not cache.enabled:
+        return await build()
+    hit = await _offload(cache.get, key)
+    if hit is not None:
+        return orjson.loads(hit[1])
+    versions = await _offload(cache.tag_versions, tags)
+    data = await build()
+    if data is not None:
+        await _offload(cache.set, key, versions, 'application/json', dumps(data))
+    return data
+
+
+async def acached_json_response(request, tags, build, key=None):
+    """cached_json_response for async views; build is a coroutine function"""
+    cache = get_cache()
+    if not cache.enabled:
+        result = await build()
+        if isinstance(result, HttpResponse):
+            return result
+        body = dumps(result)
+        return edge_cache.apply_cache_headers(_json_response(body, make_etag(body)), tags)
+    key = key or request_key(request)
+    hit = await _offload(cache.get, key)
+    if hit is not None:
+        content_type, body, etag = hit
+        response = not_modified(request, etag) or _json_response(body, etag, content_type)
+        return edge_cache.apply_cache_headers(response, tags)
+    versions = await _offload(cache.tag_versions, tags)
+    result = await build()
+    if isinstance(result, HttpResponse):
+        return result
+    body = dumps(result)
+    etag = await _offload(cache.set, key, versions, 'application/json', body)
+    response = not_modified(request, etag) or _json_response(body, etag)
+    return edge_cache.apply_cache_headers(response, tags)
+
+
+def _vary_on_accept(response):
+    # Streaming endpoints pick JSON or NDJSON from the Accept header
+    patch_vary_headers(response, ('Accept',))
+    return response
+
+
+def _json_response(body, etag, content_type='application/json'):
+    return set_validators(HttpResponse(body, content_type=content_type), etag)
+
+
+class _StreamCopy:
+    """The chunks of a streamed body, dropped once they outgrow RESPONSE_CACHE_MAX_BYTES"""
+
+    def __init__(self):
+        self.parts = []
+        self.size = 0
+
+    def add(self, chunk):
+        if self.parts is not None:
+            self.size += len(chunk)
+            if self.size > settings.RESPONSE_CACHE_MAX_BYTES:
+                self.parts = None
+            else:
+                self.parts.append(chunk)
+
+
+def cached_streaming_response(request, tags, build, key=None):
+    """
+    Like cached_json_response for endpoints that stream. build() returns a
+    StreamingHttpResponse; its chunks are copied into the cache as they go
+    out, unless the body grows past RESPONSE_CACHE_MAX_BYTES.
+    """
+    cache = get_cache()
+    if not cache.enabled:
+        return _vary_on_accept(edge_cache.apply_cache_headers(build(), tags))
+    key = key or request_key(request) + ('#ndjson' if wants_ndjson(request) else '')
+    hit = cache.get(key)
+    if hit is not None:
+        content_type, body, etag = hit
+        response = not_modified(request, etag) or _json_response(body, etag, content_type)
+        return _vary_on_accept(edge_cache.apply_cache_headers(response, tags))
+    versions = cache.tag_versions(tags)
+    response = build()
+    if not isinstance(response, StreamingHttpResponse) or response.status_code != 200:
+        return response
+    _vary_on_accept(edge_cache.apply_cache_headers(response, tags))
+    content_type = response['Content-Type']
+    chunks = response.streaming_content
+
+    def tee():
+        body = _StreamCopy()
+        for chunk in chunks:
+            body.add(chunk)
+            yield chunk
+        if body.parts is not None:
+            cache.set(key, versions, content_type, b''.join(body.parts))
+
+    async def atee():
+        body = _StreamCopy()
+        async for chunk in chunks:
+            body.add(chunk)
+            yield chunk
+        if body.parts is not None:
+            await _offload(cache.set, key, versions, content_type, b''.join(body.parts))
+
+    response.streaming_content = atee() if response.is_async else tee()
+    return response
@@ -1,8 +1,10 @@
 import os
+import sys
 from pathlib import Path
+from corsheaders.defaults import default_headers
 from dotenv import load_dotenv
-from mongoengine import connect
-import cloudinary
+from mongoengine import register_connection
+from techsage import metrics, query_budget, read_routing, write_concern
 
 
 load_dotenv()
@@ -37,9 +39,13 @@ INSTALLED_APPS = [
     'auth.apps.CustomAuthConfig',
     'collab',
     'badges',
+    'benchmarks',
 ]
 
 MIDDLEWARE = [
+    'techsage.metrics.MetricsMiddleware',
+    'techsage.query_budget.QueryBudgetMiddleware',
+    'techsage.read_routing.CausalConsistencyMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -72,14 +78,54 @@ WSGI_APPLICATION = 'techsage.wsgi.application'
 ASGI_APPLICATION = 'techsage.asgi.application'
 
 
-connect(
+# Connection pool. Checkouts wait at most MONGO_WAIT_QUEUE_TIMEOUT_MS for a
+# free connection before failing fast; workers open MONGO_MIN_POOL_SIZE
+# connections at start. zstd and snappy compression need the zstandard and
+# python-snappy packages, zlib is built in.
+MONGO_MAX_POOL_SIZE = int(os.getenv('MONGO_MAX_POOL_SIZE', 100))
+MONGO_MIN_POOL_SIZE = int(os.getenv('MONGO_MIN_POOL_SIZE', 10))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv('MONGO_MAX_IDLE_TIME_MS', 300000))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv('MONGO_WAIT_QUEUE_TIMEOUT_MS', 2000))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv('MONGO_CONNECT_TIMEOUT_MS', 5000))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv('MONGO_SOCKET_TIMEOUT_MS', 30000))
+MONGO_COMPRESSORS = os.getenv('MONGO_COMPRESSORS', 'zlib')
+# Create the client and fill the pool when an ASGI/WSGI worker starts.
+# Off by default under the test runners, which import the entry points
+# without a database and would leave the ping failing after teardown.
+TESTING = 'pytest' in sys.modules or sys.argv[1:2] == ['test']
+MONGO_WARM_UP = os.getenv('MONGO_WARM_UP', str(not TESTING)) == 'True'
+
+# Registered only: the client (SRV lookup, TLS, pool) is created on the
+# first query or by the worker warm-up, see techsage/clients.py
+register_connection(
     db=os.getenv('MONGO_DB_NAME', 'techsage_db'),
     host=os.getenv('MONGO_URI'),
     alias='default',
-    ssl=True,
+    # Atlas needs TLS; set MONGO_TLS=False for a local mongod
+    ssl=os.getenv('MONGO_TLS', 'True') == 'True',
     retryWrites=True,
-    w='majority'
+    w='majority',
+    maxPoolSize=MONGO_MAX_POOL_SIZE,
+    minPoolSize=MONGO_MIN_POOL_SIZE,
+    maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+    waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+    socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+    compressors=MONGO_COMPRESSORS,
+    event_listeners=[query_budget.listener, metrics.mongo_listener, metrics.pool_listener, read_routing.listener]
 )
+# Lists, search and admin analytics may read from secondaries at most this
+# far behind the primary (90 is the server's minimum); see read_routing.py
+MONGO_SECONDARY_READS = os.getenv('MONGO_SECONDARY_READS', 'True') == 'True'
+MONGO_MAX_STALENESS_SECONDS = int(os.getenv('MONGO_MAX_STALENESS_SECONDS', 90))
+# Move operations between write-concern tiers, e.g.
+# "blog.autosave=unacknowledged,otp.attempt=critical"; see write_concern.py.
+# Parsed here so an unknown tier stops the server from starting
+WRITE_CONCERN_OVERRIDES = write_concern.parse_overrides(os.getenv('WRITE_CONCERN_OVERRIDES', ''))
+# Threads that run Mongo calls for async views; keep it within the pool size
+MONGO_ASYNC_WORKERS = int(os.getenv('MONGO_ASYNC_WORKERS', 32))
 
 
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend' 
@@ -92,6 +138,25 @@ DEFAULT_FROM_EMAIL = os.getenv('EMAIL_HOST_USER', 'afrinjahanera03@gmail.com')
 OTP_VALIDITY_MINUTES = int(os.getenv('OTP_VALIDITY_MINUTES', 2))
 
 
+# Autosaves only cut a new blog version once this much time has passed or
+# this many characters changed since the latest version
+AUTOSAVE_VERSION_INTERVAL_SECONDS = int(os.getenv('AUTOSAVE_VERSION_INTERVAL_SECONDS', 600))
+AUTOSAVE_VERSION_MIN_CHARS = int(os.getenv('AUTOSAVE_VERSION_MIN_CHARS', 200))
+
+# Trending feed: engagement loses half its weight every HALF_LIFE_HOURS.
+# Scores are rebased every REBASE_HOURS (run update_trending after each
+# boundary) and view counts are written in batches every FLUSH_SECONDS.
+TRENDING_HALF_LIFE_HOURS = float(os.getenv('TRENDING_HALF_LIFE_HOURS', 12))
+TRENDING_REBASE_HOURS = int(os.getenv('TRENDING_REBASE_HOURS', 24))
+TRENDING_VIEW_FLUSH_SECONDS = int(os.getenv('TRENDING_VIEW_FLUSH_SECONDS', 10))
+TRENDING_FEED_SIZE = int(os.getenv('TRENDING_FEED_SIZE', 20))
+
+# Version retention: keep every version for KEEP_ALL_HOURS, the newest per hour
+# up to HOURLY_DAYS, then the newest per day. Published snapshots are always kept.
+VERSION_RETENTION_KEEP_ALL_HOURS = int(os.getenv('VERSION_RETENTION_KEEP_ALL_HOURS', 24))
+VERSION_RETENTION_HOURLY_DAYS = int(os.getenv('VERSION_RETENTION_HOURLY_DAYS', 30))
+
+
 if os.getenv('DJANGO_ENV') == 'production':
     REDIS_URL = os.getenv('REDIS_URL') 
 else:
@@ -107,6 +172,46 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Response cache for public read endpoints (seconds; 0 disables it)
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', 300))
+RESPONSE_CACHE_LOCAL_ENTRIES = int(os.getenv('RESPONSE_CACHE_LOCAL_ENTRIES', 1000))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', 1024 * 1024))
+# Shared tier; set to an empty string to keep the cache per process
+RESPONSE_CACHE_REDIS_URL = os.getenv('RESPONSE_CACHE_REDIS_URL', REDIS_URL)
+# Per-process LFU cache of hot blog detail payloads (seconds; 0 disables it)
+BLOG_OBJECT_CACHE_TTL = int(os.getenv('BLOG_OBJECT_CACHE_TTL', 5))
+BLOG_OBJECT_CACHE_ENTRIES = int(os.getenv('BLOG_OBJECT_CACHE_ENTRIES', 500))
+
+# CDN caching of public reads (seconds; 0 marks everything private)
+EDGE_CACHE_MAX_AGE = int(os.getenv('EDGE_CACHE_MAX_AGE', 60))
+EDGE_CACHE_STALE_WHILE_REVALIDATE = int(os.getenv('EDGE_CACHE_STALE_WHILE_REVALIDATE', 300))
+# Purged on writes; FastlyPurgeBackend needs FASTLY_SERVICE_ID and FASTLY_API_TOKEN
+EDGE_PURGE_BACKEND = os.getenv('EDGE_PURGE_BACKEND', 'techsage.edge_cache.LoggingPurgeBackend')
+FASTLY_SERVICE_ID = os.getenv('FASTLY_SERVICE_ID', '')
+FASTLY_API_TOKEN = os.getenv('FASTLY_API_TOKEN', '')
+
+# Per-request Mongo command accounting: warn when one query shape repeats
+# this often (likely N+1) or a request issues more commands than this
+QUERY_BUDGET_N_PLUS_ONE = int(os.getenv('QUERY_BUDGET_N_PLUS_ONE', 5))
+QUERY_BUDGET_WARN = int(os.getenv('QUERY_BUDGET_WARN', 50))
+
+# Bearer token required to scrape /metrics/; when empty the endpoint is
+# only served under DEBUG
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Bearer token required by /export/ on top of an admin username; empty
+# disables the endpoint
+EXPORT_TOKEN = os.getenv('EXPORT_TOKEN', '')
+
+# Change feeds: page size, and how long (seconds) a change must be old
+# before the returned token moves past it
+CHANGES_PAGE_SIZE = int(os.getenv('CHANGES_PAGE_SIZE', 500))
+CHANGES_SETTLE_SECONDS = int(os.getenv('CHANGES_SETTLE_SECONDS', 2))
+# Sequence numbers each process reserves at a time, and how long (seconds)
+# it may use them; keep this well below CHANGES_SETTLE_SECONDS
+CHANGE_SEQ_BLOCK_SIZE = int(os.getenv('CHANGE_SEQ_BLOCK_SIZE', 100))
+CHANGE_SEQ_BLOCK_SECONDS = float(os.getenv('CHANGE_SEQ_BLOCK_SECONDS', 1))
+
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [],
@@ -114,7 +219,7 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.AllowAny',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'techsage.renderers.ORJSONRenderer',
         'rest_framework.renderers.BrowsableAPIRenderer',
     ],
     'UNAUTHENTICATED_USER': None,
@@ -126,14 +231,15 @@ CORS_ALLOWED_ORIGINS = [
     'http://localhost:5173',  
 ]
 CORS_ALLOW_CREDENTIALS = True
+# The read-your-writes token, see techsage/read_routing.py
+CORS_ALLOW_HEADERS = (*default_headers, 'x-mongo-after')
+CORS_EXPOSE_HEADERS = ['X-Mongo-After']
 
 
-cloudinary.config(
-    cloud_name=os.getenv('CLOUDINARY_CLOUD_NAME'),
-    api_key=os.getenv('CLOUDINARY_API_KEY'),
-    api_secret=os.getenv('CLOUDINARY_API_SECRET'),
-    secure=True
-)
+# Applied on the first upload, see techsage/clients.py
+CLOUDINARY_CLOUD_NAME = os.getenv('CLOUDINARY_CLOUD_NAME')
+CLOUDINARY_API_KEY = os.getenv('CLOUDINARY_API_KEY')
+CLOUDINARY_API_SECRET = os.getenv('CLOUDINARY_API_SECRET')
 
 
 PLAGIARISM_CHECKER_API_KEY = os.getenv('PLAGIARISM_CHECKER_API_KEY')
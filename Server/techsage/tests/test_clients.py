@@ -0,0 +1,10 @@
+import threading
+from django.conf import settings
+
+
+def test_entry_points_skip_the_warm_up_under_pytest():
+    import techsage.asgi
+    import techsage.wsgi
+    assert settings.TESTING
+    assert not settings.MONGO_WARM_UP
+    assert 'mongo-warm-up' not in {thread.name for thread in threading.enumerate()}
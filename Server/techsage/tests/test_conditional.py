@@ -0,0 +1,55 @@
+from datetime import datetime
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.utils.http import http_date
+from techsage.conditional import conditional_response, make_etag, not_modified, to_timestamp
+
+factory = RequestFactory()
+MODIFIED = to_timestamp(datetime(2024, 1, 1, 12, 0))
+
+
+def _build():
+    return HttpResponse(b'{"ok":true}', content_type='application/json')
+
+
+def test_etag_is_strong_and_content_sensitive():
+    etag = make_etag({'id': 1, 'updated_at': '2024-01-01'})
+    assert etag.startswith('"') and not etag.startswith('W/')
+    assert etag == make_etag({'id': 1, 'updated_at': '2024-01-01'})
+    assert etag != make_etag({'id': 1, 'updated_at': '2024-01-02'})
+    assert make_etag(b'a', b'bc') != make_etag(b'ab', b'c')
+
+
+def test_full_response_carries_validators():
+    response = conditional_response(factory.get('/'), '"v1"', MODIFIED, _build)
+    assert response.status_code == 200
+    assert response['ETag'] == '"v1"'
+    assert response['Last-Modified'] == http_date(MODIFIED)
+
+
+def test_matching_etag_is_not_modified():
+    request = factory.get('/', HTTP_IF_NONE_MATCH='"v0", "v1"')
+    response = conditional_response(request, '"v1"', MODIFIED, lambda: 1 / 0)
+    assert response.status_code == 304
+    assert response['ETag'] == '"v1"'
+    assert response.content == b''
+
+
+def test_stale_etag_wins_over_modified_since():
+    request = factory.get('/', HTTP_IF_NONE_MATCH='"v0"', HTTP_IF_MODIFIED_SINCE=http_date(MODIFIED))
+    assert conditional_response(request, '"v1"', MODIFIED, _build).status_code == 200
+
+
+def test_modified_since():
+    request = factory.get('/', HTTP_IF_MODIFIED_SINCE=http_date(MODIFIED))
+    assert conditional_response(request, '"v1"', MODIFIED, _build).status_code == 304
+    assert conditional_response(request, '"v1"', MODIFIED + 1, _build).status_code == 200
+
+
+def test_only_safe_methods_get_304():
+    assert not_modified(factory.post('/', HTTP_IF_NONE_MATCH='"v1"'), '"v1"') is None
+
+
+def test_errors_do_not_get_validators():
+    response = conditional_response(factory.get('/'), '"v1"', None, lambda: HttpResponse(status=404))
+    assert 'ETag' not in response
@@ -0,0 +1,54 @@
+import threading
+from unittest import mock
+import pytest
+from django.http import HttpResponse
+from techsage import edge_cache, response_cache
+
+
+@pytest.fixture(autouse=True)
+def logging_backend(settings, monkeypatch):
+    settings.EDGE_CACHE_MAX_AGE = 60
+    settings.EDGE_CACHE_STALE_WHILE_REVALIDATE = 300
+    settings.EDGE_PURGE_BACKEND = 'techsage.edge_cache.LoggingPurgeBackend'
+    settings.RESPONSE_CACHE_REDIS_URL = ''
+    monkeypatch.setattr(edge_cache, '_backend', None)
+    monkeypatch.setattr(response_cache, '_cache', None)
+
+
+def test_public_headers():
+    response = edge_cache.apply_cache_headers(HttpResponse(), ['blog:1', 'category:Web Dev', 'blog:1'])
+    assert response['Cache-Control'] == 'public, max-age=0, s-maxage=60, stale-while-revalidate=300'
+    assert response['Surrogate-Key'] == 'blog:1 category:Web%20Dev'
+
+
+def test_private_and_error_responses():
+    response = edge_cache.apply_cache_headers(HttpResponse(), ['blog:1'], private=True)
+    assert response['Cache-Control'] == 'private, no-cache'
+    assert 'Surrogate-Key' not in response
+    assert 'Cache-Control' not in edge_cache.apply_cache_headers(HttpResponse(status=404), ['blog:1'])
+
+
+def test_edge_caching_can_be_disabled(settings):
+    settings.EDGE_CACHE_MAX_AGE = 0
+    assert edge_cache.apply_cache_headers(HttpResponse(), ['blogs'])['Cache-Control'] == 'private, no-cache'
+
+
+def test_invalidation_purges_matching_keys():
+    response_cache.invalidate('blog:1', 'category:Web Dev')
+    response_cache.invalidate('blog:2', purge=False)
+    assert list(edge_cache.get_backend().purged) == [['blog:1', 'category:Web%20Dev']]
+
+
+def test_fastly_purges_hard_and_off_the_request_thread(settings, monkeypatch):
+    settings.FASTLY_SERVICE_ID = 'svc'
+    settings.FASTLY_API_TOKEN = 'token'
+    calls = []
+    monkeypatch.setattr(edge_cache.requests, 'post', lambda url, headers, timeout: calls.append(
+        (url, headers, threading.current_thread().name)
+    ) or mock.Mock())
+
+    edge_cache.FastlyPurgeBackend().purge({'blog:1', 'blogs'}).result(timeout=5)
+    [(url, headers, thread)] = calls
+    assert url == 'https://api.fastly.com/service/svc/purge'
+    assert headers == {'Fastly-Key': 'token', 'Surrogate-Key': 'blog:1 blogs'}
+    assert thread.startswith('edge-purge')
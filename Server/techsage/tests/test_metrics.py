@@ -0,0 +1,95 @@
+from types import SimpleNamespace
+import pytest
+from django.http import Http404, HttpResponse
+from django.test import RequestFactory
+from pymongo import monitoring
+from techsage import metrics
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = metrics.Histogram('test_latency_seconds', 'Test.', ('view',), buckets=(0.1, 1))
+    histogram.observe(0.05, view='a')
+    histogram.observe(0.5, view='a')
+    histogram.observe(5, view='a')
+    lines = histogram.collect()
+    assert lines[:2] == ['# HELP test_latency_seconds Test.', '# TYPE test_latency_seconds histogram']
+    assert 'test_latency_seconds_bucket{view="a",le="0.1"} 1' in lines
+    assert 'test_latency_seconds_bucket{view="a",le="1"} 2' in lines
+    assert 'test_latency_seconds_bucket{view="a",le="+Inf"} 3' in lines
+    assert 'test_latency_seconds_sum{view="a"} 5.55' in lines
+    assert 'test_latency_seconds_count{view="a"} 3' in lines
+
+
+def test_gauge_and_label_escaping():
+    gauge = metrics.Gauge('test_connections', 'Test.', ('consumer',))
+    gauge.inc(consumer='Say "hi"')
+    gauge.inc(consumer='Say "hi"')
+    gauge.dec(consumer='Say "hi"')
+    assert 'test_connections{consumer="Say \\"hi\\""} 1' in gauge.collect()
+
+
+def test_external_call_records_outcome():
+    with metrics.external_call('test-service'):
+        pass
+    with pytest.raises(ValueError):
+        with metrics.external_call('test-service'):
+            raise ValueError
+    text = metrics.render()
+    assert 'techsage_external_call_duration_seconds_count{service="test-service",outcome="ok"} 1' in text
+    assert 'techsage_external_call_duration_seconds_count{service="test-service",outcome="error"} 1' in text
+
+
+def test_mongo_listener_labels_by_collection():
+    listener = metrics.MongoMetricsListener()
+    started = SimpleNamespace(command_name='find', command={'find': 'test_blogs'}, connection_id=('h', 1), request_id=7)
+    listener.started(started)
+    listener.succeeded(SimpleNamespace(command_name='find', connection_id=('h', 1), request_id=7, duration_micros=2000))
+    assert ('techsage_mongo_command_duration_seconds_count{collection="test_blogs",command="find"} 1'
+            in metrics.render())
+
+
+def test_pool_listener_times_checkouts_and_counts_connections():
+    listener = metrics.MongoPoolMetricsListener()
+    address = ('pool-test', 27017)
+    listener.connection_created(monitoring.ConnectionCreatedEvent(address, 1))
+    listener.connection_check_out_started(monitoring.ConnectionCheckOutStartedEvent(address))
+    listener.connection_checked_out(monitoring.ConnectionCheckedOutEvent(address, 1))
+    listener.connection_check_out_started(monitoring.ConnectionCheckOutStartedEvent(address))
+    listener.connection_check_out_failed(
+        monitoring.ConnectionCheckOutFailedEvent(address, monitoring.ConnectionCheckOutFailedReason.TIMEOUT)
+    )
+    text = metrics.render()
+    assert 'techsage_mongo_pool_checkout_wait_seconds_count{address="pool-test:27017"} 2' in text
+    assert 'techsage_mongo_pool_checkout_failures_total{address="pool-test:27017",reason="timeout"} 1' in text
+    assert 'techsage_mongo_pool_connections_in_use{address="pool-test:27017"} 1' in text
+    assert 'techsage_mongo_pool_connections{address="pool-test:27017"} 1' in text
+
+    listener.connection_checked_in(monitoring.ConnectionCheckedInEvent(address, 1))
+    listener.connection_closed(monitoring.ConnectionClosedEvent(address, 1, 'idle'))
+    text = metrics.render()
+    assert 'techsage_mongo_pool_connections_in_use{address="pool-test:27017"} 0' in text
+    assert 'techsage_mongo_pool_connections{address="pool-test:27017"} 0' in text
+
+
+def test_middleware_and_view(settings):
+    settings.METRICS_TOKEN = 'secret'
+    request = RequestFactory().get('/nowhere/')
+    metrics.MetricsMiddleware(lambda r: HttpResponse(b'x' * 10, status=404))(request)
+
+    view = metrics.MetricsView.as_view()
+    assert view(RequestFactory().get('/metrics/')).status_code == 401
+    response = view(RequestFactory().get('/metrics/', HTTP_AUTHORIZATION='Bearer secret'))
+    assert response['Content-Type'] == metrics.CONTENT_TYPE
+    text = response.content.decode()
+    assert 'techsage_http_request_duration_seconds_count{view="unmatched",method="GET",status="404"}' in text
+    assert 'techsage_http_response_size_bytes_sum{view="unmatched"}' in text
+
+
+def test_view_is_hidden_without_a_token_unless_debugging(settings):
+    settings.METRICS_TOKEN = ''
+    view = metrics.MetricsView.as_view()
+    settings.DEBUG = False
+    with pytest.raises(Http404):
+        view(RequestFactory().get('/metrics/'))
+    settings.DEBUG = True
+    assert view(RequestFactory().get('/metrics/')).status_code == 200
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+import time
+import pytest
+from techsage.object_cache import MISSING, AsyncSingleFlight, LFUCache, SingleFlight
+
+
+def test_lfu_evicts_least_frequently_used():
+    cache = LFUCache(2, ttl=60)
+    cache.set('hot', 1)
+    cache.get('hot')
+    cache.get('hot')
+    cache.set('cold', 2)
+    cache.set('new', 3)
+    assert cache.get('cold') is MISSING
+    assert cache.get('hot') == 1 and cache.get('new') == 3
+
+
+def test_lfu_breaks_ties_by_recency():
+    cache = LFUCache(2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.set('c', 3)
+    assert cache.get('a') is MISSING
+    assert len(cache) == 2
+
+
+def test_lfu_expiry_and_delete():
+    cache = LFUCache(2, ttl=-1)
+    cache.set('a', 1)
+    assert cache.get('a') is MISSING
+    cache = LFUCache(2, ttl=60)
+    cache.set('a', 1)
+    cache.delete('a')
+    assert cache.get('a') is MISSING
+    cache.set('b', 2)
+    cache.set('b', 3)
+    assert cache.get('b') == 3
+
+
+def test_single_flight_shares_one_call():
+    flight = SingleFlight()
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def load():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {'id': 'b1'}
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do('b1', load)))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(flight.do('b1', load))) for _ in range(5)]
+    for thread in followers:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join(5)
+    assert len(calls) == 1
+    assert results == [{'id': 'b1'}] * 6
+
+
+def test_single_flight_propagates_errors_and_recovers():
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        flight.do('k', fail)
+    assert flight.do('k', lambda: 42) == 42
+
+
+def test_async_single_flight_shares_one_call():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {'id': 'b1'}
+
+    async def main():
+        return await asyncio.gather(*(flight.do('b1', load) for _ in range(5)))
+
+    assert asyncio.run(main()) == [{'id': 'b1'}] * 5
+    assert calls == [1]
+    assert asyncio.run(flight.do('b1', load)) == {'id': 'b1'}
+    assert calls == [1, 1]
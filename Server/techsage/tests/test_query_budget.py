@@ -0,0 +1,97 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from asgiref.sync import iscoroutinefunction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory
+from techsage import mongo_async, query_budget
+from techsage.query_budget import QueryBudgetMiddleware, assert_max_queries, command_shape, listener
+
+
+def issue(command_name, command):
+    event = SimpleNamespace(command_name=command_name, command=command, request_id=1, duration_micros=1500)
+    listener.started(event)
+    listener.succeeded(event)
+
+
+def test_shape_ignores_values():
+    first = command_shape('find', {'find': 'blogs', 'filter': {'_id': 1, 'is_deleted': False}})
+    second = command_shape('find', {'find': 'blogs', 'filter': {'_id': 2, 'is_deleted': True}})
+    assert first == second == ('find', 'blogs', "{'_id': '?', 'is_deleted': '?'}")
+
+
+def test_shape_keeps_operators_and_match_stages():
+    shape = command_shape('aggregate', {
+        'aggregate': 'blogs',
+        'pipeline': [{'$match': {'authors': {'$in': [1, 2]}}}, {'$sort': {'created_at': -1}}, {'$limit': 10}]
+    })
+    assert shape == ('aggregate', 'blogs', "[{'$match': {'authors': {'$in': '?'}}}, {'$sort': '?'}, {'$limit': '?'}]")
+    assert command_shape('getMore', {'getMore': 123, 'collection': 'blogs'}) == ('getMore', None, None)
+
+
+def test_commands_outside_a_log_are_ignored():
+    issue('find', {'find': 'blogs', 'filter': {}})
+
+
+def test_assert_max_queries():
+    with assert_max_queries(2) as log:
+        issue('find', {'find': 'blogs', 'filter': {}})
+        issue('find', {'find': 'blogs', 'filter': {}})
+    assert log.count == 2
+    assert log.duration == pytest.approx(0.003)
+
+    with pytest.raises(AssertionError, match="3 Mongo commands issued, budget is 2"):
+        with assert_max_queries(2):
+            for user_id in range(3):
+                issue('find', {'find': 'user', 'filter': {'_id': user_id}})
+
+
+def test_middleware_logs_n_plus_one(settings, caplog):
+    settings.QUERY_BUDGET_N_PLUS_ONE = 3
+    settings.QUERY_BUDGET_WARN = 50
+
+    def view(request):
+        for user_id in range(3):
+            issue('find', {'find': 'user', 'filter': {'_id': user_id}})
+        return HttpResponse()
+
+    QueryBudgetMiddleware(view)(RequestFactory().get('/all-users/'))
+    assert "Possible N+1 on GET /all-users/: 3x find user {'_id': '?'}" in caplog.text
+
+
+def test_middleware_counts_streamed_body(settings, caplog):
+    settings.QUERY_BUDGET_N_PLUS_ONE = 2
+    settings.QUERY_BUDGET_WARN = 50
+
+    def chunks():
+        for blog_id in range(2):
+            issue('find', {'find': 'blogs', 'filter': {'_id': blog_id}})
+            yield b'x'
+
+    response = QueryBudgetMiddleware(lambda request: StreamingHttpResponse(chunks()))(RequestFactory().get('/blogs/'))
+    assert "N+1" not in caplog.text
+    assert b''.join(response.streaming_content) == b'xx'
+    assert "Possible N+1 on GET /blogs/: 2x find blogs" in caplog.text
+    assert query_budget._current.get() is None
+
+
+def test_budget_sees_commands_through_middleware():
+    def view(request):
+        issue('find', {'find': 'blogs', 'filter': {}})
+        return HttpResponse()
+
+    with assert_max_queries(1) as log:
+        QueryBudgetMiddleware(view)(RequestFactory().get('/blogs/'))
+    assert log.count == 1
+
+
+def test_async_middleware_sees_commands_run_on_mongo_workers():
+    async def view(request):
+        await mongo_async.run(issue, 'find', {'find': 'blogs', 'filter': {}})
+        return HttpResponse()
+
+    middleware = QueryBudgetMiddleware(view)
+    assert iscoroutinefunction(middleware)
+    with assert_max_queries(1) as log:
+        asyncio.run(middleware(RequestFactory().get('/blogs/')))
+    assert log.count == 1
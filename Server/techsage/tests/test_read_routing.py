@@ -0,0 +1,117 @@
+from types import SimpleNamespace
+from unittest import mock
+import pytest
+from bson import Timestamp
+from django.conf import settings as django_settings
+from django.http import HttpResponse
+from django.test import Client, RequestFactory
+from techsage import read_routing
+
+@pytest.fixture(autouse=True)
+def secret_key(monkeypatch):
+    # Tokens are signed; the suite may run without a .env
+    monkeypatch.setattr(django_settings._wrapped, 'SECRET_KEY', 'test')
+
+
+WRITTEN = {'operationTime': Timestamp(1700000000, 3), '$clusterTime': {'clusterTime': Timestamp(1700000000, 3)}}
+
+
+def write_reply(command_name, seconds, increment):
+    return SimpleNamespace(command_name=command_name, reply={'ok': 1, 'operationTime': Timestamp(seconds, increment)})
+
+
+def test_token_round_trip_rejects_tampering():
+    token = read_routing.encode_token(WRITTEN)
+    assert read_routing.decode_token(token) == WRITTEN
+    assert read_routing.decode_token(token[:-2] + 'xx') is None
+    assert read_routing.decode_token('') is None
+
+
+def test_middleware_hands_back_the_latest_write(settings):
+    settings.MONGO_SECONDARY_READS = True
+
+    def view(request):
+        read_routing.listener.succeeded(write_reply('find', 1700000009, 1))
+        read_routing.listener.succeeded(write_reply('update', 1700000005, 2))
+        read_routing.listener.succeeded(write_reply('insert', 1700000004, 1))
+        return HttpResponse()
+
+    response = read_routing.CausalConsistencyMiddleware(view)(RequestFactory().get('/'))
+    cookie = response.cookies[read_routing.COOKIE_NAME]
+    assert read_routing.decode_token(cookie.value)['operationTime'] == Timestamp(1700000005, 2)
+    assert cookie['samesite'] == 'None'
+
+    def reader(request):
+        reads = read_routing.secondary_reads()
+        assert reads.after['operationTime'] == Timestamp(1700000005, 2)
+        return HttpResponse()
+
+    request = RequestFactory().get('/', HTTP_COOKIE=f'{read_routing.COOKIE_NAME}={cookie.value}')
+    assert read_routing.COOKIE_NAME not in read_routing.CausalConsistencyMiddleware(reader)(request).cookies
+
+
+def test_secondary_reads_respect_the_switch(settings):
+    settings.MONGO_SECONDARY_READS = False
+    assert read_routing.secondary_reads() is read_routing.PRIMARY
+
+    settings.MONGO_SECONDARY_READS = True
+    settings.MONGO_MAX_STALENESS_SECONDS = 120
+    reads = read_routing.secondary_reads()
+    assert reads.preference.mongos_mode == 'secondaryPreferred'
+    assert reads.preference.max_staleness == 120
+    assert reads.after is None
+
+
+def test_reads_after_a_write_use_a_causal_session():
+    session = mock.MagicMock()
+    collection = mock.MagicMock()
+    collection.with_options.return_value.database.client.start_session.return_value.__enter__.return_value = session
+    document = SimpleNamespace(_get_collection=lambda: collection)
+
+    reads = read_routing.Reads(read_routing.secondary_preferred(), WRITTEN)
+    with reads.open(document) as (routed, active):
+        assert active is session
+    session.advance_cluster_time.assert_called_once_with(WRITTEN['$clusterTime'])
+    session.advance_operation_time.assert_called_once_with(WRITTEN['operationTime'])
+    routed.database.client.start_session.assert_called_once_with(causal_consistency=True)
+
+    # Querysets can't carry the session, so they stay on the primary
+    queryset = mock.MagicMock()
+    assert reads.queryset(queryset) is queryset
+    fresh = read_routing.Reads(read_routing.secondary_preferred())
+    assert fresh.queryset(queryset) is queryset.read_preference.return_value
+    with fresh.open(document) as (_, active):
+        assert active is None
+
+
+def test_token_travels_in_headers_without_a_cookie_jar(settings):
+    settings.MONGO_SECONDARY_READS = True
+
+    def vote(request):
+        read_routing.listener.succeeded(write_reply('update', 1700000007, 1))
+        return HttpResponse()
+
+    written = read_routing.CausalConsistencyMiddleware(vote)(RequestFactory().post('/'))
+    header = written[read_routing.HEADER_NAME]
+
+    seen = []
+
+    def reader(request):
+        seen.append(read_routing.secondary_reads().after)
+        return HttpResponse()
+
+    # The SPA sends no cookies cross-site, only the echoed header
+    read_routing.CausalConsistencyMiddleware(reader)(RequestFactory().get('/', HTTP_X_MONGO_AFTER=header))
+    assert seen[0]['operationTime'] == Timestamp(1700000007, 1)
+
+
+def test_cors_lets_the_spa_read_and_send_the_token():
+    client = Client()
+    preflight = client.options(
+        '/blogs/', HTTP_ORIGIN='http://localhost:5173', HTTP_ACCESS_CONTROL_REQUEST_METHOD='GET',
+        HTTP_ACCESS_CONTROL_REQUEST_HEADERS='x-mongo-after'
+    )
+    assert 'x-mongo-after' in preflight['Access-Control-Allow-Headers']
+    # Exposed on every cross-origin response, whatever the view returned
+    response = client.get('/no-such-endpoint/', HTTP_ORIGIN='http://localhost:5173')
+    assert read_routing.HEADER_NAME in response['Access-Control-Expose-Headers']
@@ -0,0 +1,119 @@
+import asyncio
+import json
+from datetime import datetime
+from decimal import Decimal
+import pytest
+from bson import ObjectId
+from django.utils.translation import gettext_lazy
+from rest_framework.utils.serializer_helpers import ReturnDict
+from django.conf import settings as django_settings
+from django.test import AsyncClient, RequestFactory
+from techsage.renderers import (
+    STREAM_CHUNK_SIZE, FastJsonResponse, ORJSONRenderer, dumps, iter_json_array, iter_ndjson, streaming_json_response
+)
+
+
+def test_dumps_handles_mongo_types():
+    oid = ObjectId()
+    data = {'id': oid, 'at': datetime(2024, 1, 1, 6, 0), 'score': Decimal('1.5'), 'msg': gettext_lazy('ok')}
+    assert json.loads(dumps(data)) == {'id': str(oid), 'at': '2024-01-01T06:00:00', 'score': 1.5, 'msg': 'ok'}
+
+
+def test_dumps_is_compact_by_default():
+    assert dumps({'a': [1, 2]}) == b'{"a":[1,2]}'
+    assert dumps({'a': 1}, compact=False) == b'{\n  "a": 1\n}'
+
+
+def test_dumps_rejects_unknown_types():
+    with pytest.raises(TypeError):
+        dumps({'a': object()})
+
+
+def test_renderer():
+    renderer = ORJSONRenderer()
+    assert renderer.render(None) == b''
+    assert renderer.render(ReturnDict({'a': 1}, serializer=None)) == b'{"a":1}'
+    assert renderer.render({'a': 1}, 'application/json; indent=4') == b'{\n  "a": 1\n}'
+
+
+def test_fast_json_response():
+    response = FastJsonResponse([{'id': ObjectId('0' * 24)}], safe=False, status=201)
+    assert response.status_code == 201
+    assert response['Content-Type'] == 'application/json'
+    assert json.loads(response.content) == [{'id': '0' * 24}]
+    with pytest.raises(TypeError):
+        FastJsonResponse([1, 2])
+
+
+def _items(n):
+    return ({'n': i} for i in range(n))
+
+
+@pytest.mark.parametrize("n", [0, 1, 250])
+def test_json_array_stream_matches_buffered(n):
+    assert json.loads(b''.join(iter_json_array(_items(n)))) == list(_items(n))
+    body = b''.join(iter_json_array(_items(n), envelope={'count': n}))
+    assert json.loads(body) == {'count': n, 'results': list(_items(n))}
+
+
+def test_json_array_stream_with_empty_envelope():
+    assert json.loads(b''.join(iter_json_array(_items(2), envelope={}, key='items'))) == {'items': [{'n': 0}, {'n': 1}]}
+
+
+def test_stream_is_chunked():
+    assert len(list(iter_ndjson(_items(250)))) == 3
+    assert len(list(iter_json_array(_items(250)))) == 5
+
+
+def test_ndjson_stream():
+    lines = b''.join(iter_ndjson(_items(3))).splitlines()
+    assert [json.loads(line) for line in lines] == list(_items(3))
+
+
+def test_streaming_response_negotiation():
+    factory = RequestFactory()
+    response = streaming_json_response(factory.get('/'), _items(2), envelope={'count': 2})
+    assert response['Content-Type'] == 'application/json'
+    assert json.loads(b''.join(response.streaming_content))['count'] == 2
+    response = streaming_json_response(factory.get('/?stream=ndjson'), _items(2))
+    assert response['Content-Type'] == 'application/x-ndjson'
+    response = streaming_json_response(factory.get('/', HTTP_ACCEPT='application/x-ndjson'), _items(2))
+    assert response['Content-Type'] == 'application/x-ndjson'
+
+
+class _LazyFeed:
+    """Stands in for a BlogQuery and records how far it has been read"""
+
+    def __init__(self, n):
+        self.n = n
+        self.pulled = 0
+
+    def count(self):
+        return self.n
+
+    def __iter__(self):
+        for i in range(self.n):
+            self.pulled += 1
+            yield {'n': i}
+
+
+def test_list_blogs_streams_under_asgi(monkeypatch):
+    # The middleware stack signs cookies; the suite may run without a .env
+    monkeypatch.setattr(django_settings._wrapped, 'SECRET_KEY', 'test')
+    from blogs import readers
+    feed = _LazyFeed(1000)
+    monkeypatch.setattr(readers, 'BlogQuery', lambda *args, **kwargs: feed)
+
+    async def first_chunks():
+        response = await AsyncClient().get('/blogs/')
+        assert response.is_async
+        chunks = aiter(response.streaming_content)
+        head = [await anext(chunks), await anext(chunks)]
+        pulled = feed.pulled
+        rest = [chunk async for chunk in chunks]
+        return head + rest, pulled
+
+    chunks, pulled_before_rest = asyncio.run(first_chunks())
+    # The first chunks went out after one batch, not after the whole feed
+    assert pulled_before_rest <= 2 * STREAM_CHUNK_SIZE
+    assert json.loads(b''.join(chunks)) == {'count': 1000, 'results': [{'n': i} for i in range(1000)]}
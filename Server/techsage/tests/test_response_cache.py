@@ -0,0 +1,141 @@
+import asyncio
+import json
+from types import SimpleNamespace
+import pytest
+from django.http import StreamingHttpResponse
+from django.test import RequestFactory
+from techsage import response_cache
+from techsage.renderers import FastJsonResponse
+
+
+@pytest.fixture(autouse=True)
+def local_cache(settings, monkeypatch):
+    settings.RESPONSE_CACHE_TIMEOUT = 60
+    settings.RESPONSE_CACHE_LOCAL_ENTRIES = 10
+    settings.RESPONSE_CACHE_MAX_BYTES = 1024
+    settings.RESPONSE_CACHE_REDIS_URL = ''
+    monkeypatch.setattr(response_cache, '_cache', None)
+
+
+@pytest.fixture
+def counting_build():
+    calls = []
+
+    def build(payload):
+        def inner():
+            calls.append(1)
+            return payload
+        return inner
+    build.calls = calls
+    return build
+
+
+def test_lru_evicts_least_recently_used():
+    lru = response_cache.LRUCache(2)
+    lru.set('a', 1, 60)
+    lru.set('b', 2, 60)
+    lru.get('a')
+    lru.set('c', 3, 60)
+    assert lru.get('b') is None
+    assert lru.get('a') == 1 and lru.get('c') == 3
+
+
+def test_lru_expires_entries():
+    lru = response_cache.LRUCache(2)
+    lru.set('a', 1, -1)
+    assert lru.get('a') is None
+
+
+def test_response_is_cached_until_tag_is_invalidated(counting_build):
+    request = RequestFactory().get('/published-blogs/', {'page': '1'})
+    tags = [response_cache.BLOGS_TAG]
+    first = response_cache.cached_json_response(request, tags, counting_build({'n': 1}))
+    second = response_cache.cached_json_response(request, tags, counting_build({'n': 2}))
+    assert json.loads(first.content) == json.loads(second.content) == {'n': 1}
+    assert len(counting_build.calls) == 1
+
+    response_cache.invalidate(response_cache.author_tag('someone'))
+    response_cache.cached_json_response(request, tags, counting_build({'n': 3}))
+    assert len(counting_build.calls) == 1
+
+    response_cache.invalidate(response_cache.BLOGS_TAG)
+    third = response_cache.cached_json_response(request, tags, counting_build({'n': 4}))
+    assert json.loads(third.content) == {'n': 4}
+
+
+def test_query_order_does_not_change_key():
+    factory = RequestFactory()
+    assert (response_cache.request_key(factory.get('/x/?a=1&b=2'))
+            == response_cache.request_key(factory.get('/x/?b=2&a=1')))
+
+
+def test_error_responses_are_not_cached(counting_build):
+    request = RequestFactory().get('/badges/')
+    error = FastJsonResponse({'error': 'boom'}, status=500)
+    assert response_cache.cached_json_response(request, ['badges'], lambda: error) is error
+    response = response_cache.cached_json_response(request, ['badges'], counting_build([]))
+    assert json.loads(response.content) == []
+    assert len(counting_build.calls) == 1
+
+
+def test_payload_cache(counting_build):
+    assert response_cache.cached_payload('k', ['blog:1'], counting_build({'id': '1'})) == {'id': '1'}
+    assert response_cache.cached_payload('k', ['blog:1'], counting_build({'id': '2'})) == {'id': '1'}
+    assert response_cache.cached_payload('missing', ['blog:2'], lambda: None) is None
+
+
+def test_streaming_body_is_cached_after_it_is_sent():
+    request = RequestFactory().get('/jobs/')
+    build = lambda: StreamingHttpResponse(iter([b'[1,', b'2]']), content_type='application/json')
+    response = response_cache.cached_streaming_response(request, ['category:job'], build)
+    assert b''.join(response.streaming_content) == b'[1,2]'
+    cached = response_cache.cached_streaming_response(request, ['category:job'], None)
+    assert cached.content == b'[1,2]'
+
+
+def test_async_streaming_body_is_cached_after_it_is_sent():
+    request = RequestFactory().get('/jobs/')
+
+    async def chunks():
+        yield b'[1,'
+        yield b'2]'
+
+    async def send():
+        response = response_cache.cached_streaming_response(
+            request, ['category:job'], lambda: StreamingHttpResponse(chunks(), content_type='application/json')
+        )
+        return b''.join([chunk async for chunk in response.streaming_content])
+
+    assert asyncio.run(send()) == b'[1,2]'
+    assert response_cache.cached_streaming_response(request, ['category:job'], None).content == b'[1,2]'
+
+
+def test_oversized_stream_is_not_cached(settings):
+    settings.RESPONSE_CACHE_MAX_BYTES = 3
+    request = RequestFactory().get('/jobs/')
+    build = lambda: StreamingHttpResponse(iter([b'[1,', b'2]']), content_type='application/json')
+    b''.join(response_cache.cached_streaming_response(request, ['category:job'], build).streaming_content)
+    assert response_cache.get_cache().get(response_cache.request_key(request)) is None
+
+
+def test_blog_tags_only_touch_listings_for_public_blogs():
+    author = SimpleNamespace(username='alice')
+    blog = SimpleNamespace(id='b1', authors=[author], categories=['job'], is_published=True, is_deleted=False)
+    assert set(response_cache.blog_tags(blog)) == {'blog:b1', 'blogs', 'author:alice', 'category:job'}
+    blog.is_published = False
+    assert response_cache.blog_tags(blog) == ['blog:b1']
+
+
+def test_cached_response_answers_if_none_match(counting_build):
+    factory = RequestFactory()
+    first = response_cache.cached_json_response(factory.get('/c/'), ['comments:1'], counting_build([1]))
+    etag = first['ETag']
+    repeat = response_cache.cached_json_response(
+        factory.get('/c/', HTTP_IF_NONE_MATCH=etag), ['comments:1'], counting_build([2])
+    )
+    assert repeat.status_code == 304
+    response_cache.invalidate('comments:1')
+    changed = response_cache.cached_json_response(
+        factory.get('/c/', HTTP_IF_NONE_MATCH=etag), ['comments:1'], counting_build([3])
+    )
+    assert changed.status_code == 200 and changed['ETag'] != etag
@@ -0,0 +1,59 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from unittest import mock
+import pytest
+from django.test import RequestFactory
+from techsage import write_concern
+
+
+def test_policy_defaults_and_unlisted_operations(settings):
+    settings.WRITE_CONCERN_OVERRIDES = {}
+    assert write_concern.for_operation('comment.like') == {'w': 1}
+    assert write_concern.for_operation('blog.autosave') == {'w': 1}
+    assert write_concern.for_operation('blog.save_draft') == {'w': 'majority'}
+
+
+def test_overrides_move_operations_between_tiers(settings):
+    settings.WRITE_CONCERN_OVERRIDES = write_concern.parse_overrides(' blog.autosave=unacknowledged, otp.attempt=critical ')
+    assert write_concern.for_operation('blog.autosave') == {'w': 0}
+    assert write_concern.for_operation('otp.attempt') == {'w': 'majority'}
+    assert write_concern.for_operation('vote.cast') == {'w': 1}
+
+
+@pytest.mark.parametrize('operation', sorted(write_concern.SAVE_OPERATIONS))
+def test_saved_operations_cannot_go_unacknowledged(operation):
+    with pytest.raises(ValueError, match='must be acknowledged'):
+        write_concern.parse_overrides(f'{operation}=unacknowledged')
+
+
+def test_like_view_saves_with_the_overridden_tier(settings, monkeypatch):
+    from comments import views
+    settings.WRITE_CONCERN_OVERRIDES = write_concern.parse_overrides('comment.like=critical')
+    comment = mock.MagicMock(likes=[], dislikes=[])
+    comment.to_json.return_value = {'likes': 1}
+    monkeypatch.setattr(views, 'Comment', mock.Mock(**{'objects.return_value.first.return_value': comment}))
+    monkeypatch.setattr(views, 'User', mock.Mock(**{'objects.return_value.first.return_value': object()}))
+    monkeypatch.setattr(views.response_cache, 'invalidate', mock.Mock())
+
+    request = RequestFactory().post('/', json.dumps({'username': 'alice'}), content_type='application/json')
+    response = views.LikeComment.as_view()(request, comment_id='c1')
+    assert response.status_code == 200
+    comment.save.assert_called_once_with(write_concern={'w': 'majority'})
+
+
+def test_unknown_tier_is_rejected():
+    with pytest.raises(ValueError, match="Unknown write concern tier 'fast'"):
+        write_concern.parse_overrides('comment.like=fast')
+
+
+def test_bad_override_stops_start_up():
+    result = subprocess.run(
+        [sys.executable, '-c', 'import django; django.setup()'],
+        env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'techsage.settings', 'WRITE_CONCERN_OVERRIDES': 'vote.cast=fast'},
+        cwd=Path(__file__).resolve().parents[2], capture_output=True, text=True
+    )
+    assert result.returncode != 0
+    assert "Unknown write concern tier 'fast' for 'vote.cast'" in result.stderr
@@ -1,17 +1,18 @@
 from django.urls import path, include
 from django.urls import path
 from django.contrib import admin
+from techsage.metrics import MetricsView
 from django.urls import path, include
-from users.views import AllUsersView, LoginUser, UserProfile, UserSearch, SavedBlogsAPI, VotedBlogsAPI, UserListByRole, DeleteUserAccount, RegisterUser
+from users.views import AllUsersView, LoginUser, UserProfile, UserSearch, SavedBlogsAPI, VotedBlogsAPI, UserListByRole, DeleteUserAccount, RegisterUser, DataExport
 
 from blogs.views import (
     CreateBlog, ListBlogs, GetBlog, 
-    UpdateBlog, GetBlogVersions, 
+    UpdateBlog, GetBlogVersions, GetBlogVersion, BlogVersionDiff,
     RevertBlogVersion, DeleteBlog,
     ModeratorDeleteBlog, VoteBlog, 
     BlogSearch, PublishBlog, UnpublishBlog,
     SaveAsDraft, RestoreBlog, AddAuthorToBlog,JobBlogs,
-    PublishedBlogs,ReviewBlog, CreateDraft, UpdateDraft, blog_test_view
+    PublishedBlogs, TrendingBlogs, ReviewBlog, CreateDraft, UpdateDraft, Changes, blog_test_view
 )
 
 
@@ -29,9 +30,12 @@ urlpatterns = [
     path('user/<str:username>/voted-blogs/', VotedBlogsAPI.as_view(), name='voted-blogs'),
     path('users/<str:username>/delete/', DeleteUserAccount.as_view(), name='delete-user'),
     path('search/', UserSearch.as_view(), name='user-search'),
+    path('export/<str:collection>/', DataExport.as_view(), name='data-export'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
 
 
     path('blogs/', ListBlogs.as_view()),
+    path('changes/<str:collection>/', Changes.as_view(), name='changes'),
     path('blogs/create/', CreateBlog.as_view()),
     
     path('blogs/publish/<str:blog_id>/', PublishBlog.as_view()),
@@ -44,6 +48,8 @@ urlpatterns = [
     path('published-blogs/search/', BlogSearch.as_view(), name='blog-search'),#search string matching if status=published 
     
     path('blogs/versions/<str:blog_id>/', GetBlogVersions.as_view()),
+    path('blogs/versions/<str:blog_id>/diff/<int:version_a>/<int:version_b>/', BlogVersionDiff.as_view()),
+    path('blogs/versions/<str:blog_id>/<int:version_number>/', GetBlogVersion.as_view()),
     path('blogs/revert/<str:blog_id>/<int:version_number>/', RevertBlogVersion.as_view()),
     
     path('blogs/update/<str:blog_id>/', UpdateBlog.as_view()),
@@ -64,6 +70,7 @@ urlpatterns = [
 
     
     path('blogs/<str:blog_id>/', GetBlog.as_view()), #one blogs all things
+    path('published-blogs/trending/', TrendingBlogs.as_view(), name='trending_blogs'),
     path('published-blogs/', PublishedBlogs.as_view(), name='published_blogs'),#all published blogs
     path('blogs/review/<str:blog_id>/', ReviewBlog.as_view(), name='review-blog'),
 
@@ -0,0 +1,70 @@
+"""
+Write-concern tiers per model and operation.
+
+The connection waits for majority acknowledgement on every write, which is
+what accounts, publishing, reviews and deletes need. High-volume writes
+whose loss in a rare failover is harmless (a like, an autosave tick, an
+OTP attempt counter) don't need to wait for the secondaries, and that
+wait dominates their latency.
+
+Each such write names its operation ('comment.like') and passes
+for_operation() as the write concern of MongoEngine's save(), update() or
+delete(). POLICY holds the defaults and WRITE_CONCERN_OVERRIDES in the
+environment can move any operation to another tier, e.g.
+"blog.autosave=unacknowledged". The settings parse it once at start-up.
+Operations that aren't listed stay on the connection default (majority).
+"""
+from django.conf import settings
+from pymongo.write_concern import WriteConcern
+
+TIERS = {
+    # Survives a primary failover; the connection default
+    'critical': {'w': 'majority'},
+    # Acknowledged by the primary only
+    'acknowledged': {'w': 1},
+    # Not acknowledged at all: errors, including duplicate keys, go unseen
+    'unacknowledged': {'w': 0},
+}
+
+POLICY = {
+    'comment.like': 'acknowledged',
+    'vote.cast': 'acknowledged',
+    'blog.autosave': 'acknowledged',
+    'otp.attempt': 'acknowledged',
+    # Trending score increments, and the batched view counts behind them
+    'blog.trending': 'acknowledged',
+    'blog.view': 'unacknowledged',
+}
+
+
+# Written with MongoEngine's Document.save() or delete(), which read the
+# server's reply and raise on an unacknowledged write
+SAVE_OPERATIONS = {'comment.like', 'vote.cast', 'otp.attempt'}
+
+
+def parse_overrides(value):
+    """'blog.autosave=unacknowledged,otp.attempt=critical' -> dict"""
+    overrides = {}
+    for item in filter(None, (part.strip() for part in (value or '').split(','))):
+        operation, _, tier = item.partition('=')
+        operation, tier = operation.strip(), tier.strip()
+        if tier not in TIERS:
+            raise ValueError(f"Unknown write concern tier '{tier}' for '{operation}'")
+        if tier == 'unacknowledged' and operation in SAVE_OPERATIONS:
+            raise ValueError(f"'{operation}' is written with save() and must be acknowledged")
+        overrides[operation] = tier
+    return overrides
+
+
+def tier(operation):
+    return settings.WRITE_CONCERN_OVERRIDES.get(operation) or POLICY.get(operation, 'critical')
+
+
+def for_operation(operation):
+    """The write_concern argument for ``operation``"""
+    return dict(TIERS[tier(operation)])
+
+
+def pymongo_write_concern(operation):
+    """The same tier for writes made on a raw pymongo collection"""
+    return WriteConcern(**for_operation(operation))
@@ -9,8 +9,13 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
+from techsage import clients
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'techsage.settings')
 
 application = get_wsgi_application()
+
+if settings.MONGO_WARM_UP:
+    clients.warm_up()
@@ -0,0 +1,339 @@
+"""
+Deterministic synthetic data for load and scale testing.
+
+Users and blogs (with everything hanging off them) are generated in
+batches, each from its own Random seeded with (seed, kind, batch start), and ObjectIds are derived from the
+kind and index of a document. The same seed and size therefore produce the
+same database no matter how many workers insert it or in which order the
+batches finish. Users' vote and saved-blog lists are left empty; Vote
+documents and the blogs' vote fields are consistent with each other.
+"""
+import random
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from bson import ObjectId
+from django.contrib.auth.hashers import make_password
+from badges.models import Badge
+from blogs.models import Blog, Vote
+from collab.models import AuthorRequest
+from comments.models import Comment
+from reports.models import BlogReport
+from .models import User
+
+BASE_TIME = datetime(2023, 1, 1)
+SPAN = timedelta(days=730)
+
+# Roughly 9 documents per blog once comments, votes, reports and author
+# requests are counted, plus one user per five blogs
+DOCUMENTS_PER_BLOG = 9
+BLOGS_PER_USER = 5
+MAX_COMMENTS_PER_BLOG = 200
+MAX_VOTES_PER_BLOG = 500
+DEFAULT_PASSWORD = 'password123'
+
+KIND_USER, KIND_BLOG, KIND_COMMENT, KIND_VOTE, KIND_REPORT, KIND_REQUEST, KIND_BADGE = range(1, 8)
+
+BADGES = [
+    ('ruby', 'Ruby Contributor', 50),
+    ('bronze', 'Bronze Author', 200),
+    ('silver', 'Silver Author', 500),
+    ('gold', 'Gold Author', 1000),
+    ('diamond', 'Diamond Author', 2500),
+]
+CATEGORIES = ['software', 'ai', 'web', 'security', 'data', 'cloud', 'research', 'career', 'job']
+TAGS = [
+    'python', 'django', 'react', 'mongodb', 'kubernetes', 'rust', 'go', 'ml', 'llm', 'devops',
+    'testing', 'performance', 'databases', 'linux', 'networking', 'frontend', 'backend',
+    'interview', 'internship', 'opensource',
+]
+UNIVERSITIES = ['BUET', 'DU', 'NSU', 'BRAC', 'IUT', 'KUET', 'RUET', 'CUET', 'SUST', 'AIUB']
+REPORT_REASONS = ['inaccurate', 'plagiarism', 'methodological', 'other']
+WORDS = (
+    "system data model query index latency cache request server client network design "
+    "performance memory thread process scale test deploy build release review research "
+    "paper result method analysis experiment learning graph tree search sort stream "
+    "event message queue storage replica shard cluster node api schema field document"
+).split()
+
+
+def make_id(kind, number, when):
+    """ObjectId whose timestamp is ``when`` and whose tail encodes kind and number"""
+    seconds = int(when.replace(tzinfo=timezone.utc).timestamp())
+    return ObjectId(struct.pack('>IB', seconds, kind) + number.to_bytes(7, 'big'))
+
+
+def plan(size):
+    """Blog and user counts for a dataset of roughly ``size`` documents"""
+    blogs = max(size // DOCUMENTS_PER_BLOG, 1)
+    users = max(blogs // BLOGS_PER_USER, 10)
+    return {'users': users, 'blogs': blogs}
+
+
+def user_created_at(number, users):
+    return BASE_TIME + SPAN * (number / users) / 2
+
+
+def blog_created_at(number, blogs):
+    return BASE_TIME + SPAN / 2 + SPAN * (number / blogs) / 2
+
+
+def user_id(number, users):
+    return make_id(KIND_USER, number, user_created_at(number, users))
+
+
+def sentence(rng, words=12):
+    text = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(words // 2, words * 2)))
+    return text.capitalize() + '.'
+
+
+def html_content(rng):
+    parts = []
+    for _ in range(rng.randint(2, 6)):
+        parts.append(f"<h2>{sentence(rng, 4)[:-1]}</h2>")
+        for _ in range(rng.randint(1, 4)):
+            parts.append(f"<p>{' '.join(sentence(rng) for _ in range(rng.randint(2, 6)))}</p>")
+        if rng.random() < 0.3:
+            items = ''.join(f"<li>{sentence(rng, 6)}</li>" for _ in range(rng.randint(2, 5)))
+            parts.append(f"<ul>{items}</ul>")
+        if rng.random() < 0.2:
+            parts.append(f"<pre><code>{rng.choice(WORDS)} = {rng.randint(0, 1000)}</code></pre>")
+    return '\n'.join(parts)
+
+
+def badge_docs():
+    return [
+        {
+            '_id': make_id(KIND_BADGE, number, BASE_TIME),
+            'name': name,
+            'title': title,
+            'points_required': points,
+            'image_url': f'https://res.cloudinary.com/demo/image/upload/badges/{name}.png',
+        }
+        for number, (name, title, points) in enumerate(BADGES)
+    ]
+
+
+def generate_users(seed, start, end, users, password):
+    rng = random.Random(f'{seed}:users:{start}')
+    badges = badge_docs()
+    admins = max(users // 100, 1)
+    moderators = max(users // 25, 1)
+    docs = []
+    for number in range(start, end):
+        created_at = user_created_at(number, users)
+        role = 'admin' if number < admins else 'moderator' if number < admins + moderators else 'user'
+        points = int(rng.paretovariate(1.5) * 40) - 40
+        docs.append({
+            '_id': user_id(number, users),
+            'username': f'user{number}',
+            'email': f'user{number}@example.com',
+            'password': password,
+            'is_user': True,
+            'is_admin': role == 'admin',
+            'is_reviewer': role != 'user',
+            'role': role,
+            'job_title': rng.choice(['Student', 'Researcher', 'Engineer', 'Lecturer', 'User']),
+            'university': rng.choice(UNIVERSITIES),
+            'bio': sentence(rng),
+            'is_verified': rng.random() < 0.8,
+            'points': points,
+            'total_publications': 0,
+            'followers': int(rng.paretovariate(1.2)) - 1,
+            'saved_blogs': [],
+            'upvoted_blogs': [],
+            'downvoted_blogs': [],
+            'created_at': created_at,
+            'updated_at': created_at,
+            'badges': [
+                {
+                    'id': str(badge['_id']),
+                    'name': badge['name'],
+                    'title': badge['title'],
+                    'image_url': badge['image_url'],
+                    'points_required': badge['points_required'],
+                }
+                for badge in badges if points >= badge['points_required']
+            ],
+        })
+    return {User: docs}
+
+
+def generate_blogs(seed, start, end, users, blogs):
+    """Blogs [start, end) with their versions, votes, comments, reports and author requests"""
+    rng = random.Random(f'{seed}:blogs:{start}')
+    reviewers = max(users // 100, 1) + max(users // 25, 1)
+    out = {Blog: [], Comment: [], Vote: [], BlogReport: [], AuthorRequest: []}
+
+    for number in range(start, end):
+        created_at = blog_created_at(number, blogs)
+        blog_id = make_id(KIND_BLOG, number, created_at)
+        author_numbers = [rng.randrange(users)]
+        while rng.random() < 0.2 and len(author_numbers) < 4:
+            author_numbers.append(rng.randrange(users))
+        authors = list(dict.fromkeys(user_id(n, users) for n in author_numbers))
+        username = f'user{author_numbers[0]}'
+        categories = rng.sample(CATEGORIES, rng.randint(1, 2))
+        tags = rng.sample(TAGS, rng.randint(1, 5))
+
+        state = rng.random()
+        is_published = state < 0.75
+        is_deleted = 0.9 <= state
+        updated_at = created_at + timedelta(hours=rng.randint(0, 72))
+
+        versions = []
+        for version in range(rng.randint(1, 5)):
+            versions.append({
+                'title': sentence(rng, 5)[:-1],
+                'content': html_content(rng) if version == 0 or rng.random() < 0.5 else '',
+                'thumbnail_url': None,
+                'updated_at': created_at + timedelta(hours=version * 6),
+                'updated_by': username,
+                'is_draft': True,
+                'categories': categories,
+                'tags': tags,
+            })
+        title = sentence(rng, 5)[:-1]
+        content = html_content(rng)
+        versions[-1].update(title=title, content=content, is_draft=not is_published)
+
+        upvotes, downvotes = [], []
+        voters = rng.sample(range(users), min(int(rng.expovariate(1 / 3.8)), users, MAX_VOTES_PER_BLOG))
+        for index, voter in enumerate(voters):
+            vote_type = 'upvote' if rng.random() < 0.8 else 'downvote'
+            voter_id = user_id(voter, users)
+            (upvotes if vote_type == 'upvote' else downvotes).append(voter_id)
+            out[Vote].append({
+                '_id': make_id(KIND_VOTE, number * MAX_VOTES_PER_BLOG + index, updated_at),
+                'blog': blog_id,
+                'user': voter_id,
+                'vote_type': vote_type,
+                'created_at': updated_at + timedelta(minutes=index),
+            })
+
+        out[Blog].append({
+            '_id': blog_id,
+            'title': title,
+            'content': content,
+            'authors': authors,
+            'thumbnail_url': None,
+            'categories': categories,
+            'tags': tags,
+            'created_at': created_at,
+            'updated_at': updated_at,
+            'versions': versions,
+            'current_version': len(versions),
+            'is_draft': not is_published,
+            'is_published': is_published,
+            'published_at': updated_at if is_published else None,
+            'published_by': username if is_published else None,
+            'is_deleted': is_deleted,
+            'deleted_at': updated_at if is_deleted else None,
+            'deleted_by': username if is_deleted else None,
+            'upvotes': upvotes,
+            'downvotes': downvotes,
+            'draft_history': [],
+            'is_reviewed': is_published and rng.random() < 0.3,
+            'reviewed_by': user_id(rng.randrange(reviewers), users) if is_published else None,
+            'upvote_count': len(upvotes),
+            'downvote_count': len(downvotes),
+        })
+
+        comment_ids = []
+        for index in range(min(int(rng.expovariate(1 / 4.5)), MAX_COMMENTS_PER_BLOG)):
+            when = updated_at + timedelta(minutes=rng.randint(1, 60 * 24 * 30))
+            comment_id = make_id(KIND_COMMENT, number * MAX_COMMENTS_PER_BLOG + index, when)
+            # Replies hang off earlier comments to build threads
+            parent = rng.choice(comment_ids) if comment_ids and rng.random() < 0.4 else None
+            comment_ids.append(comment_id)
+            out[Comment].append({
+                '_id': comment_id,
+                'blog': blog_id,
+                'author': user_id(rng.randrange(users), users),
+                'content': sentence(rng),
+                'parent': parent,
+                'created_at': when,
+                'updated_at': when,
+                'likes': [user_id(n, users) for n in rng.sample(range(users), min(int(rng.expovariate(1 / 2)), users))],
+                'dislikes': [],
+                'is_deleted': rng.random() < 0.03,
+                'is_reviewed': rng.random() < 0.2,
+                'reviewed_by': None,
+            })
+
+        if rng.random() < 0.02:
+            for index in range(rng.randint(1, 3)):
+                out[BlogReport].append({
+                    '_id': make_id(KIND_REPORT, number * 4 + index, updated_at),
+                    'blog': blog_id,
+                    'reported_by': user_id(rng.randrange(users), users),
+                    'reason': rng.choice(REPORT_REASONS),
+                    'details': sentence(rng),
+                    'status': 'pending',
+                    'is_reviewed': False,
+                    'created_at': updated_at + timedelta(hours=index + 1),
+                })
+
+        if rng.random() < 0.02:
+            out[AuthorRequest].append({
+                '_id': make_id(KIND_REQUEST, number, updated_at),
+                'blog': blog_id,
+                'requested_author': user_id(rng.randrange(users), users),
+                'requesting_author': authors[0],
+                'status': rng.choice(['pending', 'pending', 'accepted', 'rejected']),
+                'created_at': updated_at,
+                'updated_at': updated_at,
+            })
+    return out
+
+
+def insert(batch):
+    counts = {}
+    for document, docs in batch.items():
+        if docs:
+            document._get_collection().insert_many(docs, ordered=False)
+        counts[document] = len(docs)
+    return counts
+
+
+MODELS = (User, Badge, Blog, Comment, Vote, BlogReport, AuthorRequest)
+
+
+def generate(size, seed=0, batch_size=1000, workers=4, progress=None):
+    """
+    Generate and insert a dataset of roughly ``size`` documents. Returns the
+    number of documents inserted per collection name.
+    """
+    counts = plan(size)
+    users, blogs = counts['users'], counts['blogs']
+    # Hashing once keeps generation fast; every user shares the password
+    password = make_password(DEFAULT_PASSWORD)
+    totals = {document._get_collection_name(): 0 for document in MODELS}
+
+    Badge._get_collection().insert_many(badge_docs(), ordered=False)
+    totals[Badge._get_collection_name()] = len(BADGES)
+
+    jobs = [
+        (generate_users, (seed, start, min(start + batch_size, users), users, password))
+        for start in range(0, users, batch_size)
+    ] + [
+        (generate_blogs, (seed, start, min(start + batch_size, blogs), users, blogs))
+        for start in range(0, blogs, batch_size)
+    ]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(lambda job=job: insert(job[0](*job[1]))) for job in jobs]
+        for done, future in enumerate(futures, 1):
+            for document, count in future.result().items():
+                totals[document._get_collection_name()] += count
+            if progress:
+                progress(done, len(futures), totals)
+
+    # Bulk loads are faster without indexes to maintain, so build them last
+    for document in MODELS:
+        document.ensure_indexes()
+    return totals
+
+
+def clear():
+    for document in MODELS:
+        document.drop_collection()
@@ -0,0 +1,122 @@
+import gzip
+import json
+import os
+from bson import ObjectId
+from pymongo import ReadPreference
+from blogs.models import Blog, Vote
+from comments.models import Comment
+from reports.models import BlogReport
+from techsage.renderers import dumps
+from .models import User
+
+DEFAULT_BATCH_SIZE = 1000
+
+# Fields exported per collection. Heavy or sensitive fields (blog version
+# history, passwords, emails) are left out on purpose.
+EXPORTS = {
+    'blogs': (Blog, {
+        'title': 1, 'content': 1, 'authors': 1, 'categories': 1, 'tags': 1,
+        'created_at': 1, 'updated_at': 1, 'published_at': 1, 'current_version': 1,
+        'is_draft': 1, 'is_published': 1, 'is_deleted': 1, 'is_reviewed': 1,
+        'reviewed_by': 1, 'upvote_count': 1, 'downvote_count': 1,
+    }),
+    'comment': (Comment, {
+        'blog': 1, 'author': 1, 'parent': 1, 'content': 1, 'created_at': 1,
+        'updated_at': 1, 'likes': 1, 'dislikes': 1, 'is_deleted': 1,
+        'is_reviewed': 1, 'reviewed_by': 1,
+    }),
+    'user': (User, {
+        'username': 1, 'role': 1, 'job_title': 1, 'university': 1, 'is_verified': 1,
+        'points': 1, 'total_publications': 1, 'followers': 1, 'source': 1,
+        'created_at': 1, 'updated_at': 1,
+    }),
+    'vote': (Vote, {'blog': 1, 'user': 1, 'vote_type': 1, 'created_at': 1}),
+    'blog_report': (BlogReport, {
+        'blog': 1, 'reported_by': 1, 'reason': 1, 'details': 1, 'status': 1,
+        'is_reviewed': 1, 'reviewed_by': 1, 'created_at': 1, 'reviewed_at': 1,
+    }),
+}
+
+# Credentials and contact details never leave the database, whatever a
+# projection above lists
+SENSITIVE_FIELDS = frozenset({'password', 'email', 'otp_code'})
+
+
+def export_cursor(name, after=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Walk a collection in _id order starting after ``after``. Reads prefer a
+    secondary so nightly extracts stay off the primary when one is available.
+    """
+    model, fields = EXPORTS[name]
+    projection = {field: 1 for field in fields if field not in SENSITIVE_FIELDS}
+    collection = model._get_collection().with_options(
+        read_preference=ReadPreference.SECONDARY_PREFERRED
+    )
+    query = {'_id': {'$gt': ObjectId(after)}} if after else {}
+    return collection.find(query, projection).sort('_id', 1).batch_size(batch_size)
+
+
+def iter_export_batches(name, after=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Yield (last_id, count, chunk) per batch, where chunk is a complete gzip
+    member of NDJSON lines. Concatenated members form a valid .gz file, so a
+    consumer can stop after any batch and resume from its last_id.
+    """
+    lines = []
+    last_id = None
+    for doc in export_cursor(name, after, batch_size):
+        last_id = doc['_id']
+        lines.append(dumps(doc) + b'\n')
+        if len(lines) == batch_size:
+            yield str(last_id), len(lines), gzip.compress(b''.join(lines))
+            lines = []
+    if lines:
+        yield str(last_id), len(lines), gzip.compress(b''.join(lines))
+
+
+def _checkpoint_path(path):
+    return path + '.checkpoint'
+
+
+def _load_checkpoint(path):
+    try:
+        with open(_checkpoint_path(path)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _save_checkpoint(path, checkpoint):
+    tmp = _checkpoint_path(path) + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp, _checkpoint_path(path))
+
+
+def export_to_file(name, output_dir, batch_size=DEFAULT_BATCH_SIZE, restart=False):
+    """
+    Export one collection to <output_dir>/<name>.ndjson.gz. Progress is
+    checkpointed after every batch with the last _id and the file size, so
+    an interrupted run resumes where it stopped and drops any partly
+    written batch.
+    """
+    path = os.path.join(output_dir, f'{name}.ndjson.gz')
+    checkpoint = None if restart else _load_checkpoint(path)
+    if checkpoint is None or not os.path.exists(path):
+        checkpoint = {'last_id': None, 'offset': 0, 'exported': 0, 'completed': False}
+    if checkpoint['completed']:
+        return checkpoint
+
+    with open(path, 'r+b' if checkpoint['offset'] else 'wb') as f:
+        f.truncate(checkpoint['offset'])
+        f.seek(checkpoint['offset'])
+        for last_id, count, chunk in iter_export_batches(name, checkpoint['last_id'], batch_size):
+            f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+            checkpoint.update(last_id=last_id, offset=f.tell(), exported=checkpoint['exported'] + count)
+            _save_checkpoint(path, checkpoint)
+
+    checkpoint['completed'] = True
+    _save_checkpoint(path, checkpoint)
+    return checkpoint
@@ -0,0 +1,32 @@
+import os
+from django.core.management.base import BaseCommand
+from users.exports import DEFAULT_BATCH_SIZE, EXPORTS, export_to_file
+
+
+class Command(BaseCommand):
+    help = (
+        "Export collections to gzip-compressed NDJSON for analytics. "
+        "Reruns with the same output directory resume from the last checkpoint."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('output_dir')
+        parser.add_argument('--collection', choices=[*EXPORTS, 'all'], default='all')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--restart', action='store_true',
+                            help="Ignore saved checkpoints and export from the first document")
+
+    def handle(self, *args, **options):
+        os.makedirs(options['output_dir'], exist_ok=True)
+        names = list(EXPORTS) if options['collection'] == 'all' else [options['collection']]
+        for name in names:
+            checkpoint = export_to_file(
+                name,
+                options['output_dir'],
+                batch_size=options['batch_size'],
+                restart=options['restart']
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f"{name}: exported {checkpoint['exported']} documents "
+                f"({checkpoint['offset']} bytes), last id {checkpoint['last_id']}"
+            ))
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+from users import dataset
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with a deterministic synthetic dataset of users, blogs, "
+        "comments, votes, reports, badges and author requests for load testing."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=10000,
+                            help="Approximate number of documents (10k to 10M)")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Users or blogs generated per insert batch")
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--drop', action='store_true',
+                            help="Drop the generated collections first")
+
+    def handle(self, *args, **options):
+        if options['size'] < 100:
+            raise CommandError("--size must be at least 100")
+        if options['drop']:
+            dataset.clear()
+        elif User.objects.limit(1).count(with_limit_and_skip=True):
+            raise CommandError("The database already has users; pass --drop to replace them")
+
+        counts = dataset.plan(options['size'])
+        self.stdout.write(
+            f"Generating {counts['users']} users and {counts['blogs']} blogs "
+            f"(seed {options['seed']}, {options['workers']} workers)"
+        )
+
+        def progress(done, total, totals):
+            if done == total or done % 10 == 0:
+                self.stdout.write(f"  {done}/{total} batches, {sum(totals.values())} documents")
+
+        totals = dataset.generate(
+            options['size'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            workers=options['workers'],
+            progress=progress
+        )
+        for name, count in totals.items():
+            self.stdout.write(self.style.SUCCESS(f"{name}: {count}"))
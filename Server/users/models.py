@@ -1,16 +1,6 @@
 import mongoengine as me
 import datetime
-import cloudinary
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-cloudinary.config(
-    cloud_name=os.getenv('CLOUDINARY_CLOUD_NAME'),
-    api_key=os.getenv('CLOUDINARY_API_KEY'),
-    api_secret=os.getenv('CLOUDINARY_API_SECRET')
-)
+from techsage import clients, metrics
 
 class User(me.Document):
     username = me.StringField(required=True, unique=True)
@@ -67,13 +57,15 @@ class User(me.Document):
         """Handle avatar upload to Cloudinary"""
         try:
             if self.avatar_public_id:
-                cloudinary.uploader.destroy(self.avatar_public_id)
+                with metrics.external_call('cloudinary'):
+                    clients.cloudinary_uploader().destroy(self.avatar_public_id)
             
-            upload_result = cloudinary.uploader.upload(
-                file,
-                folder="techsage/avatars",
-                allowed_formats=['jpg', 'png', 'jpeg']
-            )
+            with metrics.external_call('cloudinary'):
+                upload_result = clients.cloudinary_uploader().upload(
+                    file,
+                    folder="techsage/avatars",
+                    allowed_formats=['jpg', 'png', 'jpeg']
+                )
             self.avatar_public_id = upload_result['public_id']
             self.avatar_url = upload_result['secure_url']
             return True
@@ -169,7 +161,7 @@ class User(me.Document):
         return self.points
     
 
-    def to_json(self):
+    def to_json(self, blog_count=None):
         return {
             "id": str(self.id),
             "username": self.username,
@@ -186,7 +178,7 @@ class User(me.Document):
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat(),
             "badges": self.badges,
-            "blog_count": self.calculate_publications(),
+            "blog_count": self.calculate_publications() if blog_count is None else blog_count,
             "github": self.github,
             "linkedin": self.linkedin,
             "twitter": self.twitter,
@@ -0,0 +1,31 @@
+from blogs.models import Blog, Vote
+from comments.models import Comment
+from users import dataset
+
+
+def test_batches_are_deterministic():
+    assert dataset.generate_blogs(7, 0, 20, 50, 100) == dataset.generate_blogs(7, 0, 20, 50, 100)
+    assert dataset.generate_blogs(7, 0, 20, 50, 100) != dataset.generate_blogs(8, 0, 20, 50, 100)
+
+
+def test_votes_match_blog_counters_and_threads_stay_in_blog():
+    batch = dataset.generate_blogs(1, 0, 50, 30, 50)
+    blogs = {blog['_id']: blog for blog in batch[Blog]}
+    for blog in blogs.values():
+        votes = [vote for vote in batch[Vote] if vote['blog'] == blog['_id']]
+        assert blog['upvote_count'] == len(blog['upvotes']) == sum(v['vote_type'] == 'upvote' for v in votes)
+        assert blog['downvote_count'] == len(blog['downvotes'])
+        assert not (blog['is_published'] and blog['is_draft'])
+
+    comments = {comment['_id']: comment for comment in batch[Comment]}
+    for comment in comments.values():
+        if comment['parent']:
+            assert comments[comment['parent']]['blog'] == comment['blog']
+
+
+def test_ids_are_unique_across_batches():
+    first = dataset.generate_blogs(1, 0, 10, 20, 20)
+    second = dataset.generate_blogs(1, 10, 20, 20, 20)
+    ids = [doc['_id'] for batch in (first, second) for docs in batch.values() for doc in docs]
+    assert len(ids) == len(set(ids))
+    assert dataset.plan(100000) == {'users': 2222, 'blogs': 11111}
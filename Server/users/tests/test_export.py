@@ -0,0 +1,67 @@
+import asyncio
+from unittest import mock
+import pytest
+from django.conf import settings
+from django.test import AsyncRequestFactory, RequestFactory
+from users import exports, views
+
+
+@pytest.fixture
+def export_token(monkeypatch):
+    monkeypatch.setattr(settings._wrapped, 'EXPORT_TOKEN', 'secret')
+    return 'secret'
+
+
+def test_export_streams_batches_under_asgi(monkeypatch, export_token):
+    users = mock.Mock()
+    users.objects.return_value.only.return_value.first.return_value = mock.Mock(role='admin')
+    monkeypatch.setattr(views, 'User', users)
+    produced = []
+
+    def batches(name, after, batch_size):
+        for i in range(3):
+            produced.append(i)
+            yield None, batch_size, b'chunk%d' % i
+    monkeypatch.setattr(views.exports, 'iter_export_batches', batches)
+
+    request = AsyncRequestFactory().get(
+        '/export/blogs/', {'username': 'root'}, headers={'Authorization': f'Bearer {export_token}'}
+    )
+    response = views.DataExport.as_view()(request, collection='blogs')
+    assert response.is_async
+
+    async def send():
+        chunks = aiter(response.streaming_content)
+        first = await anext(chunks)
+        # Only the batch being sent has been read from the database
+        assert produced == [0]
+        return [first] + [chunk async for chunk in chunks]
+
+    assert asyncio.run(send()) == [b'chunk0', b'chunk1', b'chunk2']
+
+
+@pytest.mark.parametrize('configured, header', [('', ''), ('', 'Bearer '), ('secret', ''), ('secret', 'Bearer wrong')])
+def test_export_requires_the_configured_token(monkeypatch, configured, header):
+    monkeypatch.setattr(settings._wrapped, 'EXPORT_TOKEN', configured)
+    users = mock.Mock()
+    users.objects.return_value.only.return_value.first.return_value = mock.Mock(role='admin')
+    monkeypatch.setattr(views, 'User', users)
+
+    request = RequestFactory().get('/export/user/', {'username': 'root'}, headers={'Authorization': header})
+    response = views.DataExport.as_view()(request, collection='user')
+
+    assert response.status_code == 403
+    # A bare admin username is not a credential
+    users.objects.assert_not_called()
+
+
+def test_user_export_leaves_out_credentials(monkeypatch):
+    model = mock.Mock()
+    _, fields = exports.EXPORTS['user']
+    monkeypatch.setitem(exports.EXPORTS, 'user', (model, {**fields, 'password': 1, 'email': 1, 'otp_code': 1}))
+
+    exports.export_cursor('user')
+
+    [(query, projection), _] = model._get_collection.return_value.with_options.return_value.find.call_args
+    assert projection == fields
+    assert not exports.SENSITIVE_FIELDS & set(projection)
@@ -0,0 +1,36 @@
+from unittest import mock
+from bson import ObjectId
+from django.core.files.uploadedfile import SimpleUploadedFile
+from rest_framework.test import APIRequestFactory
+from blogs.models import Blog
+from users import views
+from users.models import User
+
+
+def test_avatar_change_flushes_responses_embedding_the_author(monkeypatch):
+    user = User(id=ObjectId(), username='alice')
+    blog = Blog(id=ObjectId(), title='t', content='c', authors=[user], categories=['tech'],
+                is_draft=False, is_published=True)
+    commented = ObjectId()
+    monkeypatch.setattr(User, 'upload_avatar', lambda self, file: True)
+    monkeypatch.setattr(User, 'save', lambda self, *args, **kwargs: self)
+    monkeypatch.setattr(User, 'calculate_publications', lambda self: 1)
+    monkeypatch.setattr(views, 'User', mock.Mock(**{'objects.return_value.first.return_value': user}))
+    monkeypatch.setattr(views, 'Blog', mock.Mock(**{'objects.return_value': [blog]}))
+    monkeypatch.setattr(views, 'Comment', mock.Mock(**{'_get_collection.return_value.distinct.return_value': [commented]}))
+    invalidate = mock.Mock()
+    monkeypatch.setattr(views.response_cache, 'invalidate', invalidate)
+
+    avatar = SimpleUploadedFile('a.png', b'png', content_type='image/png')
+    request = APIRequestFactory().put('/users/alice/', {'avatar': avatar}, format='multipart')
+    assert views.UpdateUserProfile.as_view()(request, username='alice').status_code == 200
+    invalidate.assert_called_once()
+    assert set(invalidate.call_args.args) == {
+        f'comments:{commented}', f'blog:{blog.id}', 'blogs', 'author:alice', 'category:tech'
+    }
+
+    # Other profile fields aren't part of the author card
+    invalidate.reset_mock()
+    request = APIRequestFactory().put('/users/alice/', {'bio': 'hi'}, format='multipart')
+    assert views.UpdateUserProfile.as_view()(request, username='alice').status_code == 200
+    invalidate.assert_not_called()
@@ -3,13 +3,20 @@ from rest_framework.response import Response
 from rest_framework import status
 from django.contrib.auth.hashers import make_password, check_password
 from .models import User
-import cloudinary
-import os
-from dotenv import load_dotenv
+from . import exports
+from techsage import clients, conditional, metrics, mongo_async, read_routing, response_cache
+from techsage.renderers import FastJsonResponse, stream_chunks
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.crypto import constant_time_compare
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from django.http import StreamingHttpResponse
 from reports.models import BlogReport
 from datetime import datetime
 from mongoengine.queryset.visitor import Q
-from blogs.models import Blog
+from blogs.models import Blog, delete_tracked
 from comments.models import Comment
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -17,19 +24,6 @@ from rest_framework import status
 from django.contrib.auth.hashers import check_password
 
 
-
-
-
-load_dotenv()
-
-cloudinary.config(
-    cloud_name=os.getenv('CLOUDINARY_CLOUD_NAME'),
-    api_key=os.getenv('CLOUDINARY_API_KEY'),
-    api_secret=os.getenv('CLOUDINARY_API_SECRET')
-)
-
-
-
 class UserListByRole(APIView):
     def get(self, request):
         role = request.GET.get('role', '').strip().lower()
@@ -75,8 +69,11 @@ class DeleteUserAccount(APIView):
             # Get all blogs where user is an author
             user_blogs = Blog.objects(authors__in=[target_user])
             
+            # Blogs whose comment threads and listings change with this account
+            stale_tags = author_card_tags(target_user)
+
             # Delete all comments by this user
-            Comment.objects(author=target_user).delete()
+            delete_tracked(Comment.objects(author=target_user))
             
             # Delete all reports by this user
             BlogReport.objects(reported_by=target_user).delete()
@@ -89,7 +86,7 @@ class DeleteUserAccount(APIView):
             for blog in user_blogs:
                 if len(blog.authors) == 1:  # User is the only author
                     # Delete all comments on this blog
-                    Comment.objects(blog=blog).delete()
+                    delete_tracked(Comment.objects(blog=blog))
                     # Delete all reports on this blog
                     BlogReport.objects(blog=blog).delete()
                     # Delete the blog
@@ -101,6 +98,7 @@ class DeleteUserAccount(APIView):
 
             # Finally delete the user
             target_user.delete()
+            response_cache.invalidate(*stale_tags)
             
             return Response({
                 "message": f"User '{username}' and all associated data deleted successfully",
@@ -125,19 +123,20 @@ class AllUsersView(APIView):
             offset = (page - 1) * page_size
             limit = page_size
             
-            users = User.objects.all()
+            reads = read_routing.secondary_reads()
+            users = reads.queryset(User.objects.all())
             user_data = []
             for user in users:
-                published_blogs = Blog.objects(
+                published_blogs = reads.queryset(Blog.objects(
                     authors__in=[user],
                     is_published=True,
                     is_deleted=False
-                ).count()
-                user_comments = Comment.objects(
+                )).count()
+                user_comments = reads.queryset(Comment.objects(
                     author=user,
                     is_deleted=False
-                ).count()
-                blog_likes = Blog.objects(authors__in=[user]).aggregate([
+                )).count()
+                blog_likes = reads.queryset(Blog.objects(authors__in=[user])).aggregate([
                     {
                         '$project': {
                             'likes_count': { '$size': '$upvotes' }
@@ -151,7 +150,7 @@ class AllUsersView(APIView):
                     }
                 ])
                 blog_likes = next(blog_likes, {}).get('total_likes', 0)
-                blog_reports = BlogReport.objects.aggregate([
+                blog_reports = reads.queryset(BlogReport.objects).aggregate([
                     {
                         '$lookup': {
                             'from': 'blogs',
@@ -231,11 +230,12 @@ class RegisterUser(APIView):
             avatar_url = None
             avatar_public_id = None
             if 'avatar' in request.FILES:
-                upload_result = cloudinary.uploader.upload(
-                    request.FILES['avatar'],
-                    folder="techsage/avatars",
-                    allowed_formats=['jpg', 'png', 'jpeg']
-                )
+                with metrics.external_call('cloudinary'):
+                    upload_result = clients.cloudinary_uploader().upload(
+                        request.FILES['avatar'],
+                        folder="techsage/avatars",
+                        allowed_formats=['jpg', 'png', 'jpeg']
+                    )
                 avatar_url = upload_result['secure_url']
                 avatar_public_id = upload_result['public_id']
 
@@ -278,16 +278,45 @@ class LoginUser(APIView):
 
 
 
-class UserProfile(APIView):
-    def get(self, request, username):
+@method_decorator(csrf_exempt, name='dispatch')
+class UserProfile(View):
+    # Everything the profile shows; the vote/save lists can be long and are not shown
+    PROFILE_PROJECTION = {'password': 0, 'saved_blogs': 0, 'upvoted_blogs': 0, 'downvoted_blogs': 0}
+
+    async def get(self, request, username):
         try:
-            user = User.objects(username=username).first()
-            if not user:
-                return Response({"error": "User not found"}, status=404)
-            return Response(user.to_json())
+            doc = await mongo_async.collection(User).find_one({'username': username}, self.PROFILE_PROJECTION)
+            if not doc:
+                return FastJsonResponse({"error": "User not found"}, status=404)
+            user = User._from_son(doc)
+            blog_count = await mongo_async.collection(Blog).count_documents(
+                {'authors': {'$in': [doc['_id']]}, 'is_published': True, 'is_deleted': False}
+            )
+            return conditional.conditional_response(
+                request,
+                conditional.make_etag(doc, blog_count),
+                conditional.to_timestamp(doc.get('updated_at')),
+                lambda: FastJsonResponse(user.to_json(blog_count=blog_count))
+            )
         except Exception as e:
-            return Response({"error": str(e)}, status=500)
+            return FastJsonResponse({"error": str(e)}, status=500)
+
+    async def put(self, request, username):
+        # Avatar uploads and saves stay synchronous, on a worker thread
+        return await sync_to_async(update_profile)(request, username=username)
+
+
+def author_card_tags(user):
+    """Tags of the cached responses that embed ``user``'s author card"""
+    tags = [
+        response_cache.comments_tag(blog_id)
+        for blog_id in Comment._get_collection().distinct('blog', {'author': user.id})
+    ]
+    tags.extend(tag for blog in Blog.objects(authors=user) for tag in response_cache.blog_tags(blog))
+    return tags
+
 
+class UpdateUserProfile(APIView):
     def put(self, request, username):
         try:
             user = User.objects(username=username).first()
@@ -306,6 +335,9 @@ class UserProfile(APIView):
 
             user.updated_at = datetime.now()
             user.save()
+            if 'avatar' in request.FILES:
+                # Feeds, blog pages and comment threads embed the avatar
+                response_cache.invalidate(*author_card_tags(user))
 
             return Response(user.to_json())
 
@@ -313,6 +345,9 @@ class UserProfile(APIView):
             return Response({"error": str(e)}, status=500)
 
 
+update_profile = UpdateUserProfile.as_view()
+
+
 
 class UserSearch(APIView):
     def get(self, request):
@@ -484,4 +519,44 @@ class VotedBlogsAPI(APIView):
             }, status=status.HTTP_200_OK)
 
         except Exception as e:
-            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class DataExport(APIView):
+    """
+    Stream a whole collection as gzip-compressed NDJSON for admins. Pass
+    ?after=<_id> with the last exported document's id to resume a download.
+    Requests must carry EXPORT_TOKEN as a bearer token; the endpoint is
+    disabled while no token is configured.
+    """
+    def get(self, request, collection):
+        token = settings.EXPORT_TOKEN
+        if not token or not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return Response({"error": "A valid export token is required"}, status=status.HTTP_403_FORBIDDEN)
+
+        username = request.GET.get('username')
+        if not username:
+            return Response({"error": "Username is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        requesting_user = User.objects(username=username).only('role').first()
+        if not requesting_user:
+            return Response({"error": "Requesting user not found"}, status=status.HTTP_404_NOT_FOUND)
+        if requesting_user.role != 'admin':
+            return Response({"error": "Only admins can export data"}, status=status.HTTP_403_FORBIDDEN)
+
+        if collection not in exports.EXPORTS:
+            return Response({"error": f"Unknown collection '{collection}'"}, status=status.HTTP_404_NOT_FOUND)
+
+        after = request.GET.get('after')
+        if after and not ObjectId.is_valid(after):
+            return Response({"error": "Invalid 'after' id"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            batch_size = min(int(request.GET.get('batch_size', exports.DEFAULT_BATCH_SIZE)), 5000)
+        except ValueError:
+            return Response({"error": "batch_size must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+
+        chunks = (chunk for _, _, chunk in exports.iter_export_batches(collection, after, max(batch_size, 1)))
+        response = StreamingHttpResponse(stream_chunks(request, chunks), content_type='application/gzip')
+        response['Content-Disposition'] = f'attachment; filename="{collection}.ndjson.gz"'
+        return response